@@ -0,0 +1,105 @@
+"""
+Shared helpers for anthos-mcp benchmarks.
+
+Tools are called in-process through a FastMCP client, against a fake Bank of
+Anthos served by an `httpx.MockTransport` with a configurable per-request
+latency, so results don't depend on a cluster. Benchmarks print a table and can
+write a JSON report with `--output`, which `--compare` can diff against a report
+from another commit.
+"""
+
+import asyncio
+import base64
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import httpx
+from fastmcp import Client
+
+from anthos_mcp.banking_client import banking_client
+from anthos_mcp.main import mcp
+from shared_utils.benchmarks import (
+    add_report_arguments,
+    environment_info,
+    percentile,
+    print_comparison,
+    print_table,
+    write_report,
+)
+
+__all__ = [
+    "FakeBank",
+    "add_report_arguments",
+    "environment_info",
+    "make_token",
+    "mcp_client",
+    "percentile",
+    "print_comparison",
+    "print_table",
+    "write_report",
+]
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64_json(value: dict) -> str:
+    # Compact, like the JSON in a JWT the bank issues
+    return _b64(json.dumps(value, separators=(",", ":")).encode())
+
+
+def make_token(account_id: str = "1011226111", username: str = "testuser") -> str:
+    """
+    A JWT shaped like userservice's (RS256, 2048-bit key), valid for an hour.
+
+    Nothing here verifies the signature, so it is random bytes of an RS256
+    signature's length rather than needing a crypto library to sign it.
+    """
+    now = int(time.time())
+    header = {"alg": "RS256", "typ": "JWT"}
+    claims = {
+        "user": username,
+        "acct": account_id,
+        "name": "Test User",
+        "iat": now,
+        "exp": now + 3600,
+    }
+    return ".".join([_b64_json(header), _b64_json(claims), _b64(os.urandom(256))])
+
+
+class FakeBank:
+    """Answers userservice, balancereader and ledgerwriter requests after `latency_ms`"""
+
+    def __init__(self, latency_ms: float = 20.0, balance: int = 125_000):
+        self.latency = latency_ms / 1000
+        self.balance = balance
+        self.account_id = "1011226111"
+        self.token = make_token(self.account_id)
+        self.requests = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        path = request.url.path
+        if path.endswith("/login"):
+            return httpx.Response(200, json={"token": self.token})
+        if path.startswith("/balances/"):
+            return httpx.Response(200, json=self.balance)
+        if path.endswith("/transactions"):
+            transaction = json.loads(request.content)
+            if transaction["fromAccountNum"] == self.account_id:
+                self.balance -= transaction["amount"]
+            return httpx.Response(201, text="ok")
+        return httpx.Response(404)
+
+
+@asynccontextmanager
+async def mcp_client(bank: FakeBank) -> AsyncIterator[Client]:
+    """An in-process MCP client whose banking requests go to `bank`"""
+    banking_client.transport = httpx.MockTransport(bank.handle)
+    async with banking_client, Client(mcp) as client:
+        yield client
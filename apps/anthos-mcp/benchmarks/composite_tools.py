@@ -0,0 +1,150 @@
+"""
+Composite vs single-purpose banking tools benchmark.
+
+Replays the tool calls the agent makes for common requests, once with the
+single-purpose tools and once with the composite ones, against a fake bank with
+`--latency-ms` per backend request. Every tool call costs the live model a turn
+(and the caller a silence) before it can answer, so end-to-end latency is
+modelled as `model turns x --model-turn-ms` plus the measured tool time.
+
+Usage:
+```sh
+python apps/anthos-mcp/benchmarks/composite_tools.py --rounds 20 --model-turn-ms 700
+```
+"""
+
+import argparse
+import asyncio
+import re
+import time
+from typing import Any
+
+from anthos_mcp.cache import balance_cache, balance_key
+from common import (
+    FakeBank,
+    add_report_arguments,
+    environment_info,
+    mcp_client,
+    percentile,
+    print_comparison,
+    print_table,
+    write_report,
+)
+
+CREDENTIALS = {"username": "testuser", "password": "password"}
+TRANSFER = {"to_account": "1033623433", "amount": 25}
+
+# Scenario -> tool set -> tool calls, where "{handle}" is the session handle from login
+SCENARIOS: dict[str, dict[str, list[tuple[str, dict[str, Any]]]]] = {
+    "balance": {
+        "single": [
+            ("login_for_token", CREDENTIALS),
+            ("get_balance", {"session_handle": "{handle}"}),
+        ],
+        "composite": [
+            ("login_and_get_balance", CREDENTIALS),
+        ],
+    },
+    "transfer": {
+        "single": [
+            ("login_for_token", CREDENTIALS),
+            ("get_balance", {"session_handle": "{handle}"}),
+            ("add_transaction", {"session_handle": "{handle}", **TRANSFER}),
+            ("get_balance", {"session_handle": "{handle}"}),
+        ],
+        "composite": [
+            ("login_and_get_balance", CREDENTIALS),
+            ("transfer_with_balance_check", {"session_handle": "{handle}", **TRANSFER}),
+        ],
+    },
+}
+
+HANDLE = re.compile(r"(?:Session handle: )?([\w-]{8})(?![\w-])")
+
+
+async def run(
+    scenario: str, tools: str, rounds: int, latency_ms: float, model_turn_ms: float
+) -> dict:
+    bank = FakeBank(latency_ms=latency_ms)
+    calls = SCENARIOS[scenario][tools]
+    tool_ms: list[float] = []
+    async with mcp_client(bank) as client:
+        for _ in range(rounds):
+            # Each round is a new conversation
+            balance_cache.invalidate_prefix(balance_key(bank.account_id))
+            handle = ""
+            start = time.perf_counter()
+            for name, args in calls:
+                args = {
+                    k: v.format(handle=handle) if isinstance(v, str) else v
+                    for k, v in args.items()
+                }
+                result = (await client.call_tool(name, args)).data
+                if name.startswith("login"):
+                    handle = HANDLE.match(result).group(1)
+            tool_ms.append((time.perf_counter() - start) * 1000)
+
+    # One model turn per tool call, plus the turn that answers the caller
+    model_turns = len(calls) + 1
+    return {
+        "scenario": scenario,
+        "tools": tools,
+        "tool_calls": len(calls),
+        "model_turns": model_turns,
+        "backend_requests": bank.requests / rounds,
+        "tool_ms_p50": percentile(tool_ms, 50),
+        "e2e_ms_p50": model_turns * model_turn_ms + percentile(tool_ms, 50),
+        "e2e_ms_p99": model_turns * model_turn_ms + percentile(tool_ms, 99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument(
+        "--latency-ms", type=float, default=20, help="Fake bank latency"
+    )
+    parser.add_argument(
+        "--model-turn-ms", type=float, default=700, help="Live model latency per turn"
+    )
+    add_report_arguments(parser)
+    args = parser.parse_args()
+
+    results = []
+    for scenario, tool_sets in SCENARIOS.items():
+        for tools in tool_sets:
+            results.append(
+                asyncio.run(
+                    run(
+                        scenario,
+                        tools,
+                        args.rounds,
+                        args.latency_ms,
+                        args.model_turn_ms,
+                    )
+                )
+            )
+
+    print_table(results, list(results[0]))
+    print_comparison(
+        args.compare,
+        results,
+        key=lambda r: (r["scenario"], r["tools"]),
+        metrics=["backend_requests", "tool_ms_p50", "e2e_ms_p50"],
+    )
+    write_report(
+        args.output,
+        {
+            "benchmark": "composite_tools",
+            "environment": environment_info(
+                rounds=args.rounds,
+                latency_ms=args.latency_ms,
+                model_turn_ms=args.model_turn_ms,
+            ),
+            "results": results,
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Tool-call payload benchmark for the banking tools' access token handling.
+
+Runs a login, balance check and transfer through the MCP tools twice: once
+passing the raw JWT between tools (what `login_for_token` used to return), and
+once with the token vault's session handle. Reports the characters the model has
+to read (results) and generate (arguments) per tool call, an estimate of the
+tokens that costs, and in-process tool latency.
+
+Usage:
+```sh
+python apps/anthos-mcp/benchmarks/tool_payloads.py --rounds 50
+```
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from common import (
+    FakeBank,
+    add_report_arguments,
+    environment_info,
+    mcp_client,
+    percentile,
+    print_comparison,
+    print_table,
+    write_report,
+)
+
+# Rough average for JSON/base64-heavy text with Gemini tokenizers
+CHARS_PER_TOKEN = 4
+
+
+async def run(mode: str, rounds: int, latency_ms: float) -> list[dict]:
+    bank = FakeBank(latency_ms=latency_ms)
+    samples: dict[str, dict[str, list[float]]] = {}
+
+    def record(tool: str, args: dict, result: str, seconds: float) -> None:
+        s = samples.setdefault(tool, {"args": [], "result": [], "ms": []})
+        s["args"].append(len(json.dumps(args)))
+        s["result"].append(len(result))
+        s["ms"].append(seconds * 1000)
+
+    async with mcp_client(bank) as client:
+
+        async def call(tool: str, args: dict) -> str:
+            start = time.perf_counter()
+            result = (await client.call_tool(tool, args)).data
+            seconds = time.perf_counter() - start
+            if mode == "raw_token":
+                # The tools only take handles now; count what passing the JWT cost
+                args = {
+                    k: bank.token if k == "session_handle" else v
+                    for k, v in args.items()
+                }
+            record(tool, args, result, seconds)
+            return result
+
+        for _ in range(rounds):
+            handle = await call(
+                "login_for_token", {"username": "testuser", "password": "pw"}
+            )
+            # Before the vault the model received, and then repeated, the JWT itself
+            if mode == "raw_token":
+                samples["login_for_token"]["result"][-1] = len(bank.token)
+            await call("get_balance", {"session_handle": handle})
+            await call(
+                "add_transaction",
+                {"session_handle": handle, "to_account": "1033623433", "amount": 5},
+            )
+
+    rows = []
+    for tool, s in samples.items():
+        args, result = s["args"][-1], s["result"][-1]
+        rows.append(
+            {
+                "mode": mode,
+                "tool": tool,
+                "arg_chars": args,
+                "result_chars": result,
+                "est_tokens": (args + result) / CHARS_PER_TOKEN,
+                "p50_ms": percentile(s["ms"], 50),
+                "p99_ms": percentile(s["ms"], 99),
+            }
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=5, help="Fake bank latency")
+    add_report_arguments(parser)
+    args = parser.parse_args()
+
+    results = []
+    for mode in ("raw_token", "handle"):
+        results.extend(asyncio.run(run(mode, args.rounds, args.latency_ms)))
+
+    print_table(results, list(results[0]))
+    for mode in ("raw_token", "handle"):
+        tokens = sum(r["est_tokens"] for r in results if r["mode"] == mode)
+        print(
+            f"{mode}: ~{tokens:.0f} tokens of tool I/O per login + balance + transfer"
+        )
+    print_comparison(
+        args.compare,
+        results,
+        key=lambda r: (r["mode"], r["tool"]),
+        metrics=["est_tokens", "p50_ms"],
+    )
+    write_report(
+        args.output,
+        {
+            "benchmark": "tool_payloads",
+            "environment": environment_info(
+                rounds=args.rounds, latency_ms=args.latency_ms
+            ),
+            "results": results,
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+import time
+
+# Start of the app's own imports, for startup timing; see `anthos_mcp.startup`
+IMPORTED_AT = time.monotonic()
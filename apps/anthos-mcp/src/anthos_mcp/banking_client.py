@@ -0,0 +1,138 @@
+"""
+Shared async HTTP client for the Bank of Anthos services.
+
+One `httpx.AsyncClient` is opened in the app lifespan and reused by every tool
+call, so requests to userservice, balancereader and ledgerwriter reuse pooled
+keep-alive connections instead of opening a new TCP connection each time, and
+never block the event loop.
+"""
+
+import asyncio
+import os
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+BALANCE_SERVICE_URL = f"http://{os.getenv('BALANCEREADER_SERVICE_HOST', 'localhost')}:{os.getenv('BALANCEREADER_SERVICE_PORT', 8080)}/balances"
+USER_SERVICE_URL = f"http://{os.getenv('USERSERVICE_SERVICE_HOST', 'localhost')}:{os.getenv('USERSERVICE_SERVICE_PORT_HTTP', 8081)}/login"
+LEDGERWRITER_SERVICE_URL = f"http://{os.getenv('LEDGERWRITER_SERVICE_HOST', 'localhost')}:{os.getenv('LEDGERWRITER_SERVICE_PORT', 8082)}/transactions"
+
+
+@dataclass(slots=True)
+class BankingClientConfig:
+    connect_timeout: float = 2.0
+    read_timeout: float = 5.0
+    pool_timeout: float = 2.0
+    max_connections: int = 50
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "BankingClientConfig":
+        return cls(
+            connect_timeout=float(os.getenv("BANKING_CONNECT_TIMEOUT_S", 2.0)),
+            read_timeout=float(os.getenv("BANKING_READ_TIMEOUT_S", 5.0)),
+            pool_timeout=float(os.getenv("BANKING_POOL_TIMEOUT_S", 2.0)),
+            max_connections=int(os.getenv("BANKING_MAX_CONNECTIONS", 50)),
+            max_keepalive_connections=int(os.getenv("BANKING_MAX_KEEPALIVE", 20)),
+            keepalive_expiry=float(os.getenv("BANKING_KEEPALIVE_EXPIRY_S", 30.0)),
+        )
+
+
+class BankingClient:
+    """
+    Bank of Anthos API calls over one pooled connection per backend.
+
+    Usage:
+    ```python
+    async with banking_client:
+        balance = await banking_client.get_balance(account_id, token)
+    ```
+    """
+
+    def __init__(
+        self,
+        config: BankingClientConfig | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.config = config or BankingClientConfig.from_env()
+        # Overridable so benchmarks can run against an in-process fake bank
+        self.transport = transport
+        self._http: httpx.AsyncClient | None = None
+
+    async def __aenter__(self) -> "BankingClient":
+        config = self.config
+        self._http = httpx.AsyncClient(
+            transport=self.transport,
+            timeout=httpx.Timeout(
+                config.read_timeout,
+                connect=config.connect_timeout,
+                pool=config.pool_timeout,
+            ),
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        if self._http:
+            await self._http.aclose()
+            self._http = None
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        if self._http is None:
+            raise RuntimeError("BankingClient used outside of the app lifespan")
+        return self._http
+
+    async def warm_up(self) -> int:
+        """
+        Opens a pooled connection to each banking service with a request to its
+        `/ready` endpoint, so the first tool calls don't pay for connecting.
+        Returns how many services answered.
+        """
+
+        async def probe(url: str) -> bool:
+            try:
+                await self.http.get(httpx.URL(url).copy_with(path="/ready"))
+            except httpx.HTTPError:
+                return False
+            return True
+
+        urls = (USER_SERVICE_URL, BALANCE_SERVICE_URL, LEDGERWRITER_SERVICE_URL)
+        return sum(await asyncio.gather(*(probe(url) for url in urls)))
+
+    async def login(self, username: str, password: str) -> str | None:
+        """Returns a JWT for the user, or None if the login was rejected"""
+        response = await self.http.get(
+            USER_SERVICE_URL, params={"username": username, "password": password}
+        )
+        if response.status_code != 200:
+            return None
+        return response.json().get("token")
+
+    async def get_balance(self, account_id: str, access_token: str) -> int | None:
+        """Returns the account balance in cents, or None if the lookup failed"""
+        response = await self.http.get(
+            f"{BALANCE_SERVICE_URL}/{account_id}",
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        if response.status_code != 200:
+            return None
+        return response.json() or 0
+
+    async def add_transaction(
+        self, transaction: dict[str, Any], access_token: str
+    ) -> httpx.Response:
+        return await self.http.post(
+            LEDGERWRITER_SERVICE_URL,
+            json=transaction,
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+
+
+banking_client = BankingClient()
@@ -0,0 +1,126 @@
+"""
+Read-through TTL cache with single-flight loading.
+
+The agent often checks a balance several times in one conversation, e.g. before
+and after confirming a transfer. `balance_cache` serves repeat lookups for an
+account from memory for `ttl_seconds`, and concurrent misses for the same account
+share one upstream request instead of each calling balancereader. Balances are
+keyed by account and access token (see `balance_key`), so a cached balance is only
+served to a caller holding the token it was read with.
+"""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    upstream_calls: int = 0
+    invalidations: int = 0
+
+
+class TTLCache(Generic[T]):
+    """
+    Bounded in-memory cache whose misses are loaded once per key at a time.
+
+    Args:
+        ttl_seconds: How long a loaded value is served from memory.
+        max_entries: Expired, then oldest, entries are evicted beyond this.
+    """
+
+    def __init__(self, ttl_seconds: float = 10.0, max_entries: int = 10_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        # Key -> (expires at, value), oldest first
+        self._entries: dict[str, tuple[float, T]] = {}
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    async def get(self, key: str, load: Callable[[], Awaitable[T | None]]) -> T | None:
+        """Returns the cached value, or loads it; None results are not cached"""
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self.stats.hits += 1
+            return entry[1]
+
+        task = self._inflight.get(key)
+        if task:
+            self.stats.coalesced += 1
+        else:
+            self.stats.misses += 1
+            task = asyncio.create_task(self._load(key, load))
+            self._inflight[key] = task
+        # Shielded so one caller giving up doesn't cancel the load for the others
+        return await asyncio.shield(task)
+
+    def invalidate(self, key: str) -> None:
+        """Drops a key, including any load already in flight, e.g. after a write"""
+        self.stats.invalidations += 1
+        self._entries.pop(key, None)
+        self._inflight.pop(key, None)
+
+    def invalidate_prefix(self, prefix: str) -> None:
+        """Drops every key starting with `prefix`, e.g. all entries for one account"""
+        self.stats.invalidations += 1
+        for store in (self._entries, self._inflight):
+            for key in [k for k in store if k.startswith(prefix)]:
+                del store[key]
+
+    def snapshot(self) -> dict[str, float]:
+        lookups = self.stats.hits + self.stats.misses + self.stats.coalesced
+        return {
+            "entries": len(self._entries),
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "coalesced": self.stats.coalesced,
+            "upstream_calls": self.stats.upstream_calls,
+            "invalidations": self.stats.invalidations,
+            "hit_rate": (lookups - self.stats.misses) / lookups if lookups else 0.0,
+        }
+
+    async def _load(
+        self, key: str, load: Callable[[], Awaitable[T | None]]
+    ) -> T | None:
+        task = asyncio.current_task()
+        self.stats.upstream_calls += 1
+        try:
+            value = await load()
+        finally:
+            current = self._inflight.get(key) is task
+            if current:
+                del self._inflight[key]
+        # Invalidated while loading: the value may predate the write, so don't keep it
+        if value is not None and current:
+            self._store(key, value)
+        return value
+
+    def _store(self, key: str, value: T) -> None:
+        now = time.monotonic()
+        self._entries.pop(key, None)
+        self._entries[key] = (now + self.ttl_seconds, value)
+        if len(self._entries) <= self.max_entries:
+            return
+        for stale in [k for k, (expires, _) in self._entries.items() if expires <= now]:
+            del self._entries[stale]
+        while len(self._entries) > self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+
+def balance_key(account_id: str, token: str = "") -> str:
+    """Cache key for an account's balance as read with `token`; without it, the prefix
+    of every key for the account, for `invalidate_prefix`"""
+    return f"{account_id}:{token}"
+
+
+balance_cache: TTLCache[int] = TTLCache(
+    ttl_seconds=float(os.getenv("BALANCE_CACHE_TTL_S", 10)),
+    max_entries=int(os.getenv("BALANCE_CACHE_MAX_ENTRIES", 10_000)),
+)
@@ -1,20 +1,35 @@
 import os
+from contextlib import asynccontextmanager
+from importlib.metadata import PackageNotFoundError, version
 from typing import Annotated
 from uuid import uuid4
-import jwt
-import requests
-import time
+import httpx
 
 from fastmcp import FastMCP
+from starlette.applications import Starlette
 from starlette.requests import Request
-from starlette.responses import Response
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Mount
 
+from anthos_mcp.banking_client import banking_client
+from anthos_mcp.cache import balance_cache, balance_key
+from anthos_mcp.startup import logger, startup
+from anthos_mcp.tokens import TokenError, token_cache_stats
+from anthos_mcp.vault import VaultEntry, token_vault
 
-BALANCE_SERVICE_URL = f"http://{os.getenv('BALANCEREADER_SERVICE_HOST', 'localhost')}:{os.getenv('BALANCEREADER_SERVICE_PORT', 8080)}/balances"
-USER_SERVICE_URL = f"http://{os.getenv('USERSERVICE_SERVICE_HOST', 'localhost')}:{os.getenv('USERSERVICE_SERVICE_PORT_HTTP', 8081)}/login"
-LEDGERWRITER_SERVICE_URL = f"http://{os.getenv('LEDGERWRITER_SERVICE_HOST', 'localhost')}:{os.getenv('LEDGERWRITER_SERVICE_PORT', 8082)}/transactions"
 
-mcp = FastMCP("Anthos MCP")
+def _server_version() -> str:
+    # Clients cache tool schemas per server version: set it (e.g. to the image tag)
+    # so that changed tool signatures or descriptions reach them
+    try:
+        return os.getenv("MCP_SERVER_VERSION") or version("anthos-mcp")
+    except PackageNotFoundError:
+        return "dev"
+
+
+SERVER_VERSION = _server_version()
+
+mcp = FastMCP("Anthos MCP", version=SERVER_VERSION)
 
 
 @mcp.custom_route("/health", methods=["GET"])
@@ -22,89 +37,192 @@ async def health_check(request: Request) -> Response:
     return Response(status_code=200)
 
 
-@mcp.tool()
-async def login_for_token(username: str, password: str) -> str:
-    """Logs in the user and returns an access token which is used for authenticating to banking services."""
-    print(username, password)
-    response = requests.get(
-        USER_SERVICE_URL, params={"username": username, "password": password}
+@mcp.custom_route("/ready", methods=["GET"])
+async def readiness_check(request: Request) -> Response:
+    """Fails until the banking connections have been warmed up"""
+    return JSONResponse(startup.snapshot(), status_code=200 if startup.ready else 503)
+
+
+@mcp.custom_route("/stats", methods=["GET"])
+async def stats(request: Request) -> Response:
+    """Cache hit rates, upstream call counts and token vault size"""
+    return JSONResponse(
+        {
+            "balance_cache": balance_cache.snapshot(),
+            "token_cache": token_cache_stats(),
+            "token_vault": token_vault.snapshot(),
+            "startup": startup.snapshot(),
+        }
     )
-    if response.status_code != 200:
-        return "Login failed"
 
-    token = response.json().get("token")
-    return token
 
+class ToolFailure(Exception):
+    """A banking step failed; the message is returned to the agent"""
 
-@mcp.tool()
-def get_balance(access_token: str) -> str:
-    """Gets the current balance of the user. Must provide a valid access token from `login_for_token`."""
-    try:
-        payload = jwt.decode(
-            access_token, algorithms=["HS256"], options={"verify_signature": False}
-        )
-    except jwt.PyJWTError:
-        return "Invalid access token"
 
-    exp = payload.get("exp", 0)
-    if time.time() > exp:
-        return "Access token has expired. Please log in again."
+async def _login(username: str, password: str) -> str:
+    """Logs in and returns a session handle for the user's token"""
+    try:
+        token = await banking_client.login(username, password)
+    except httpx.HTTPError:
+        raise ToolFailure("Login failed")
+    if not token:
+        raise ToolFailure("Login failed")
 
-    account_id = payload.get("acct", "")
-    if not account_id:
-        return "Invalid access token"
+    # The JWT stays server-side; the model only ever sees the handle
+    try:
+        return token_vault.put(token)
+    except TokenError as ex:
+        raise ToolFailure(str(ex))
 
-    response = requests.get(
-        f"{BALANCE_SERVICE_URL}/{account_id}",
-        headers={"Authorization": f"Bearer {access_token}"},
-    )
-    if response.status_code != 200:
-        return "Failed to get balance"
 
-    balance = response.json() or 0
-    return f"Your balance is ${balance / 100:.2f} USD"
+def _session(session_handle: str) -> VaultEntry:
+    try:
+        return token_vault.resolve(session_handle)
+    except TokenError as ex:
+        raise ToolFailure(str(ex))
 
 
-@mcp.tool()
-def add_transaction(
-    access_token: Annotated[str, "Access token from login"],
-    to_account: Annotated[str, "Account number to send money to"],
-    amount: Annotated[float, "Amount to send, in US Dollars"],
-) -> str:
-    """Adds a transaction to the ledger. Must provide a valid access token from `login_for_token`."""
+async def _balance(session: VaultEntry, fresh: bool = False) -> int:
+    """The session's account balance in cents, from cache unless `fresh` is set"""
+    account_id = session.account_id
+    if fresh:
+        balance_cache.invalidate(balance_key(account_id, session.token))
     try:
-        payload = jwt.decode(
-            access_token, algorithms=["HS256"], options={"verify_signature": False}
+        balance = await balance_cache.get(
+            balance_key(account_id, session.token),
+            lambda: banking_client.get_balance(account_id, session.token),
         )
-    except jwt.PyJWTError:
-        return "Invalid access token"
+    except httpx.HTTPError:
+        raise ToolFailure("Failed to get balance")
+    if balance is None:
+        raise ToolFailure("Failed to get balance")
+    return balance
 
-    exp = payload.get("exp", 0)
-    if time.time() > exp:
-        return "Access token has expired. Please log in again."
-
-    account_id = payload.get("acct", "")
-    if not account_id:
-        return "Invalid access token"
 
+async def _transfer(session: VaultEntry, to_account: str, amount: float) -> None:
+    account_id = session.account_id
     transaction = {
         "fromAccountNum": account_id,
         "toAccountNum": to_account,
-        "amount": amount / 100,  # convert dollars to cents
+        "amount": round(amount * 100),  # convert dollars to cents
         "toRoutingNum": "883745000",  # Hardcoded fake routing number
         "fromRoutingNum": "883745000",  # Hardcoded fake routing number
         "uuid": uuid4().hex,
     }
 
-    response = requests.post(
-        LEDGERWRITER_SERVICE_URL,
-        json=transaction,
-        headers={"Authorization": f"Bearer {access_token}"},
-    )
-    if not response.ok:
-        return "Failed to add transaction: " + response.text
+    try:
+        response = await banking_client.add_transaction(transaction, session.token)
+    except httpx.HTTPError as ex:
+        raise ToolFailure(f"Failed to add transaction: {ex!r}")
+    if not response.is_success:
+        raise ToolFailure("Failed to add transaction: " + response.text)
+
+    balance_cache.invalidate_prefix(balance_key(account_id))
+    balance_cache.invalidate_prefix(balance_key(to_account))
+
+
+def _dollars(cents: int) -> str:
+    return f"${cents / 100:.2f} USD"
+
+
+@mcp.tool()
+async def login_for_token(username: str, password: str) -> str:
+    """Logs in the user and returns a short session handle which is used for authenticating to banking services."""
+    try:
+        return await _login(username, password)
+    except ToolFailure as ex:
+        return str(ex)
+
+
+@mcp.tool()
+async def get_balance(
+    session_handle: Annotated[str, "Session handle from login"],
+) -> str:
+    """Gets the current balance of the user. Must provide a valid session handle from `login_for_token`."""
+    try:
+        balance = await _balance(_session(session_handle))
+    except ToolFailure as ex:
+        return str(ex)
+
+    return f"Your balance is {_dollars(balance)}"
+
+
+@mcp.tool()
+async def add_transaction(
+    session_handle: Annotated[str, "Session handle from login"],
+    to_account: Annotated[str, "Account number to send money to"],
+    amount: Annotated[float, "Amount to send, in US Dollars"],
+) -> str:
+    """Adds a transaction to the ledger. Must provide a valid session handle from `login_for_token`."""
+    try:
+        await _transfer(_session(session_handle), to_account, amount)
+    except ToolFailure as ex:
+        return str(ex)
 
     return "Transaction added successfully"
 
 
-app = mcp.http_app()
+# Composite tools: each live-model tool call is a full round-trip the caller hears
+# as silence, so common sequences are offered as a single call.
+
+
+@mcp.tool()
+async def login_and_get_balance(username: str, password: str) -> str:
+    """Logs in the user and gets their current balance in one step. Returns the session handle for other banking tools and the balance. Prefer this over `login_for_token` followed by `get_balance`."""
+    try:
+        handle = await _login(username, password)
+        balance = await _balance(_session(handle))
+    except ToolFailure as ex:
+        return str(ex)
+
+    return f"Session handle: {handle}. Your balance is {_dollars(balance)}"
+
+
+@mcp.tool()
+async def transfer_with_balance_check(
+    session_handle: Annotated[str, "Session handle from login"],
+    to_account: Annotated[str, "Account number to send money to"],
+    amount: Annotated[float, "Amount to send, in US Dollars"],
+) -> str:
+    """Checks the user has enough money, sends it, and returns the balance after the transfer. Prefer this over `add_transaction` with separate `get_balance` calls."""
+    if amount <= 0:
+        return "The amount must be more than $0.00"
+    try:
+        session = _session(session_handle)
+        # Not from cache: a balance up to `BALANCE_CACHE_TTL_S` old could allow an overdraft
+        balance = await _balance(session, fresh=True)
+        if round(amount * 100) > balance:
+            return f"Insufficient funds: your balance is {_dollars(balance)}"
+        await _transfer(session, to_account, amount)
+        # `_transfer` invalidated the cached balance, so this reads it from the bank
+        new_balance = await _balance(session)
+    except ToolFailure as ex:
+        return str(ex)
+
+    return (
+        f"Transaction added successfully. Your new balance is {_dollars(new_balance)}"
+    )
+
+
+mcp_app = mcp.http_app()
+
+
+async def warm_up() -> None:
+    reachable = await banking_client.warm_up()
+    if reachable < 3:
+        logger.warning(
+            f"Only {reachable} of 3 banking services answered during warm-up"
+        )
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    """Opens the shared banking HTTP client alongside the MCP session manager"""
+    async with banking_client, mcp_app.lifespan(app):
+        startup.begin(warm_up())
+        yield
+        await startup.cancel()
+
+
+app = Starlette(routes=[Mount("/", app=mcp_app)], lifespan=lifespan)
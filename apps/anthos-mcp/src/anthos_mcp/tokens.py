@@ -0,0 +1,56 @@
+"""
+Access token checks for the banking tools.
+
+The agent never handles a JWT: `login_for_token` stores the one the bank returns
+in the `token_vault`, which checks it here and keeps its account and expiry next
+to it, and tool calls resolve the agent's short session handle to that entry
+without decoding the token again (see `anthos_mcp.vault`). Only claims are read
+(the banking services verify the signature), and decoded claims are memoized per
+token so storing one decodes it once.
+"""
+
+import functools
+import os
+import time
+from typing import Any
+
+import jwt
+
+
+class TokenError(Exception):
+    """The access token can't be used; the message is returned to the agent"""
+
+
+@functools.lru_cache(maxsize=int(os.getenv("TOKEN_DECODE_CACHE_SIZE", 1024)))
+def _decode(access_token: str) -> dict[str, Any] | None:
+    try:
+        return jwt.decode(
+            access_token, algorithms=["HS256"], options={"verify_signature": False}
+        )
+    except jwt.PyJWTError:
+        return None
+
+
+def account_for_token(access_token: str) -> str:
+    """Returns the account number of a valid, unexpired token or raises TokenError"""
+    payload = _decode(access_token)
+    if payload is None:
+        raise TokenError("Invalid access token")
+
+    if time.time() > payload.get("exp", 0):
+        raise TokenError("Access token has expired. Please log in again.")
+
+    account_id = payload.get("acct", "")
+    if not account_id:
+        raise TokenError("Invalid access token")
+    return account_id
+
+
+def token_claims(access_token: str) -> dict[str, Any]:
+    """Decoded (unverified) claims of a token, or an empty dict if it can't be decoded"""
+    return _decode(access_token) or {}
+
+
+def token_cache_stats() -> dict[str, int]:
+    info = _decode.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize}
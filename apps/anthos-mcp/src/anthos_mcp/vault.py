@@ -0,0 +1,109 @@
+"""
+Server-side store for banking access tokens.
+
+A Bank of Anthos JWT is several hundred characters. Handing it to the model means
+it is generated again as an argument of every banking tool call, which slows the
+live voice model and fills its context. `login_for_token` instead keeps the JWT in
+the `token_vault` and returns a short opaque handle that the tools resolve.
+
+Entries expire with their JWT's `exp`, and the vault evicts expired, then least
+recently used, entries beyond `max_entries`.
+
+Handles are not bound to the MCP session: agents share one MCP session across
+calls, so a session-scoped token would leak between callers. Tokens are only
+stored as they come back from the bank's login, so their claims can be trusted
+without verifying the signature here; a JWT passed in place of a handle is not.
+"""
+
+import os
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from anthos_mcp.tokens import TokenError, account_for_token, token_claims
+
+
+@dataclass(slots=True)
+class VaultEntry:
+    token: str
+    account_id: str
+    expires_at: float
+
+
+@dataclass(slots=True)
+class VaultStats:
+    issued: int = 0
+    resolved: int = 0
+    unknown: int = 0
+    expired: int = 0
+    evicted: int = 0
+
+
+class TokenVault:
+    """
+    Bounded map of short handles to access tokens.
+
+    Args:
+        max_entries: Max tokens held at once.
+        handle_bytes: Random bytes per handle (URL-safe base64 encoded).
+    """
+
+    def __init__(self, max_entries: int = 10_000, handle_bytes: int = 6):
+        self.max_entries = max_entries
+        self.handle_bytes = handle_bytes
+        self.stats = VaultStats()
+        self._entries: OrderedDict[str, VaultEntry] = OrderedDict()
+
+    def put(self, token: str) -> str:
+        """Stores a token and returns its handle; raises TokenError for unusable tokens"""
+        account_id = account_for_token(token)
+        expires_at = float(token_claims(token).get("exp", 0))
+        handle = secrets.token_urlsafe(self.handle_bytes)
+        while handle in self._entries:
+            handle = secrets.token_urlsafe(self.handle_bytes)
+        self._entries[handle] = VaultEntry(token, account_id, expires_at)
+        self.stats.issued += 1
+        self._evict()
+        return handle
+
+    def resolve(self, handle: str) -> VaultEntry:
+        """Returns the token behind a handle or raises TokenError"""
+        entry = self._entries.get(handle.strip())
+        if entry is None:
+            self.stats.unknown += 1
+            raise TokenError("Unknown session handle. Please log in again.")
+        if time.time() > entry.expires_at:
+            del self._entries[handle.strip()]
+            self.stats.expired += 1
+            raise TokenError("Access token has expired. Please log in again.")
+        self._entries.move_to_end(handle.strip())
+        self.stats.resolved += 1
+        return entry
+
+    def revoke(self, handle: str) -> None:
+        self._entries.pop(handle, None)
+
+    def snapshot(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "issued": self.stats.issued,
+            "resolved": self.stats.resolved,
+            "unknown": self.stats.unknown,
+            "expired": self.stats.expired,
+            "evicted": self.stats.evicted,
+        }
+
+    def _evict(self) -> None:
+        if len(self._entries) <= self.max_entries:
+            return
+        now = time.time()
+        for handle in [h for h, e in self._entries.items() if e.expires_at < now]:
+            del self._entries[handle]
+            self.stats.expired += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evicted += 1
+
+
+token_vault = TokenVault(max_entries=int(os.getenv("TOKEN_VAULT_MAX_ENTRIES", 10_000)))
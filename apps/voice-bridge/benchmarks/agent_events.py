@@ -0,0 +1,147 @@
+"""
+Agent event pipeline micro-benchmark.
+
+Replays a synthetic stream of ADK live events (audio events with one or more
+PCM parts, partial and final transcriptions, turn boundaries) through both
+delivery paths in `adk_agents.runtime.live_messaging`: the Pydantic
+`agent_to_client_messaging` (one callback per audio part) and the lean
+`agent_to_client_batches` (one callback per ADK event). Reports per-event
+latency, callbacks and transient bytes allocated per event.
+
+Usage:
+```sh
+python apps/voice-bridge/benchmarks/agent_events.py --events 20000 --parts 1 3
+```
+"""
+
+import argparse
+import random
+
+from google.adk.events import Event
+from google.genai import types
+
+from common import (
+    add_report_arguments,
+    environment_info,
+    measure_allocations,
+    measure_frames,
+    print_comparison,
+    print_table,
+    write_report,
+)
+from adk_agents.runtime.live_messaging import (
+    agent_to_client_batches,
+    agent_to_client_messaging,
+)
+
+# 20ms of 16-bit 24kHz PCM, about what Gemini sends per audio part
+CHUNK_BYTES = 960
+
+
+def synthetic_events(count: int, parts: int, seed: int = 1) -> list[Event]:
+    """A call's worth of agent events: mostly audio, some transcription and turn ends"""
+    rng = random.Random(seed)
+    audio = types.Content(
+        role="model",
+        parts=[
+            types.Part(
+                inline_data=types.Blob(data=bytes(CHUNK_BYTES), mime_type="audio/pcm")
+            )
+            for _ in range(parts)
+        ],
+    )
+    events = []
+    for i in range(count):
+        roll = rng.random()
+        if roll < 0.80:
+            events.append(Event(author="agent", content=audio))
+        elif roll < 0.95:
+            text = types.Content(
+                role="model", parts=[types.Part(text="Your balance is")]
+            )
+            events.append(Event(author="agent", content=text, partial=roll < 0.93))
+        else:
+            events.append(Event(author="agent", turn_complete=True))
+    return events
+
+
+def pipeline(mode: str):
+    """A per-event processing function for `measure_frames`, plus its callback counter"""
+    callbacks = [0]
+
+    async def on_event(event) -> None:
+        callbacks[0] += 1
+
+    deliver = (
+        agent_to_client_messaging if mode == "pydantic" else agent_to_client_batches
+    )
+
+    async def one(event: Event):
+        yield event
+
+    def process(event: Event) -> None:
+        # The callback never suspends, so the coroutine runs to completion in one step
+        try:
+            deliver(on_event, one(event)).send(None)
+        except StopIteration:
+            pass
+
+    return process, callbacks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument(
+        "--parts",
+        type=int,
+        nargs="+",
+        default=[1, 3],
+        help="Audio parts per audio event",
+    )
+    add_report_arguments(parser)
+    args = parser.parse_args()
+
+    results = []
+    for parts in args.parts:
+        events = synthetic_events(args.events, parts)
+        for mode in ("pydantic", "lean"):
+            row = {"mode": mode, "parts": parts}
+            row |= measure_frames(pipeline(mode)[0], events)
+            row |= measure_allocations(pipeline(mode)[0], events[:2000])
+            process, callbacks = pipeline(mode)
+            for event in events:
+                process(event)
+            row["callbacks_per_event"] = callbacks[0] / len(events)
+            results.append(row)
+
+    print_table(
+        results,
+        [
+            "mode",
+            "parts",
+            "p50_us",
+            "p99_us",
+            "cpu_us_per_frame",
+            "callbacks_per_event",
+            "alloc_bytes_per_frame",
+        ],
+    )
+    print_comparison(
+        args.compare,
+        results,
+        key=lambda r: (r["mode"], r["parts"]),
+        metrics=["p50_us", "cpu_us_per_frame", "alloc_bytes_per_frame"],
+    )
+    write_report(
+        args.output,
+        {
+            "benchmark": "agent_events",
+            "environment": environment_info(events=args.events),
+            "results": results,
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Audio transcoding micro-benchmark.
+
+Feeds μ-law (Twilio -> agent) and 24kHz PCM (agent -> Twilio) traces through
+`voice_bridge.utils.audio` at several frame sizes and reports per-frame latency,
+CPU cost and how many realtime calls one core can transcode.
+
+Usage:
+```sh
+python apps/voice-bridge/benchmarks/audio_transcoding.py --output bench/audio.json
+python apps/voice-bridge/benchmarks/audio_transcoding.py --compare bench/audio.json
+```
+
+Traces can be raw μ-law @ 8kHz / raw 16-bit PCM @ 24kHz, or WAV files with the
+same encoding. Without traces, a deterministic speech-like signal is generated.
+"""
+
+import argparse
+import wave
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from common import (
+    add_report_arguments,
+    environment_info,
+    measure_allocations,
+    measure_frames,
+    print_comparison,
+    print_table,
+    write_report,
+)
+from voice_bridge.utils.audio import (
+    ADK_OUTPUT_SAMPLE_RATE,
+    TWILIO_SAMPLE_RATE,
+    CallAudioCodec,
+    adk_pcm24k_to_twilio_ulaw8k,
+    pcm_to_ulaw,
+    twilio_ulaw8k_to_adk_pcm16k,
+)
+
+FRAME_SIZES_MS = [20, 40, 100, 250, 500, 1000]
+
+
+def synthetic_speech(seconds: float, sample_rate: int, seed: int = 7) -> np.ndarray:
+    """Voiced harmonics with a syllable-rate envelope and pauses, as int16 PCM"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 12))
+    syllables = np.clip(np.sin(2 * np.pi * 4 * t), 0, None)
+    pauses = (np.sin(2 * np.pi * 0.25 * t) > -0.5).astype(np.float64)
+    signal = voiced * syllables * pauses + 0.02 * rng.standard_normal(len(t))
+    return (signal / np.abs(signal).max() * 12000).astype(np.int16)
+
+
+def load_trace(path: Path, sample_rate: int, sample_width: int) -> bytes:
+    if path.suffix.lower() != ".wav":
+        return path.read_bytes()
+    with wave.open(str(path), "rb") as wav:
+        if wav.getframerate() != sample_rate or wav.getnchannels() != 1:
+            raise SystemExit(f"{path}: expected mono {sample_rate}Hz audio")
+        if wav.getsampwidth() != sample_width:
+            raise SystemExit(f"{path}: expected {sample_width * 8}-bit samples")
+        return wav.readframes(wav.getnframes())
+
+
+def split_frames(trace: bytes, frame_bytes: int, min_frames: int) -> list[bytes]:
+    repeats = -(-min_frames * frame_bytes // len(trace))
+    data = trace * max(repeats, 1)
+    usable = len(data) - len(data) % frame_bytes
+    return [data[i : i + frame_bytes] for i in range(0, usable, frame_bytes)]
+
+
+def variants() -> dict[str, dict[str, Callable[[], Callable[[bytes], object]]]]:
+    """Implementations per direction; each factory returns a fresh per-call processor"""
+    return {
+        "inbound": {
+            "stateless": lambda: twilio_ulaw8k_to_adk_pcm16k,
+            "codec": lambda: CallAudioCodec().twilio_to_adk,
+        },
+        "outbound": {
+            "stateless": lambda: adk_pcm24k_to_twilio_ulaw8k,
+            "codec": lambda: CallAudioCodec().adk_to_twilio,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ulaw", type=Path, help="μ-law 8kHz trace (raw or .wav)")
+    parser.add_argument(
+        "--pcm24", type=Path, help="16-bit 24kHz PCM trace (raw or .wav)"
+    )
+    parser.add_argument("--seconds", type=float, default=60, help="Audio per run")
+    parser.add_argument(
+        "--frame-ms", type=int, nargs="+", default=FRAME_SIZES_MS, help="Frame sizes"
+    )
+    add_report_arguments(parser)
+    args = parser.parse_args()
+
+    if args.ulaw:
+        ulaw_trace = load_trace(args.ulaw, TWILIO_SAMPLE_RATE, 1)
+    else:
+        speech8k = synthetic_speech(args.seconds, TWILIO_SAMPLE_RATE)
+        ulaw_trace = pcm_to_ulaw(speech8k).tobytes()
+    if args.pcm24:
+        pcm24_trace = load_trace(args.pcm24, ADK_OUTPUT_SAMPLE_RATE, 2)
+    else:
+        pcm24_trace = synthetic_speech(args.seconds, ADK_OUTPUT_SAMPLE_RATE).tobytes()
+
+    traces = {
+        "inbound": (ulaw_trace, TWILIO_SAMPLE_RATE * 1),
+        "outbound": (pcm24_trace, ADK_OUTPUT_SAMPLE_RATE * 2),
+    }
+
+    results = []
+    for direction, implementations in variants().items():
+        trace, bytes_per_second = traces[direction]
+        for frame_ms in args.frame_ms:
+            frame_bytes = bytes_per_second * frame_ms // 1000
+            min_frames = max(int(args.seconds * 1000 / frame_ms), 50)
+            frames = split_frames(trace, frame_bytes, min_frames)
+            for name, factory in implementations.items():
+                row = {"direction": direction, "impl": name, "frame_ms": frame_ms}
+                row |= measure_frames(factory(), frames)
+                row |= measure_allocations(factory(), frames[:200])
+                audio_seconds = len(frames) * frame_ms / 1000
+                cpu_seconds = row["cpu_us_per_frame"] * len(frames) / 1e6
+                row["realtime_calls_per_core"] = (
+                    audio_seconds / cpu_seconds if cpu_seconds else 0.0
+                )
+                results.append(row)
+
+    print_table(
+        results,
+        [
+            "direction",
+            "impl",
+            "frame_ms",
+            "p50_us",
+            "p99_us",
+            "frames_per_sec_per_core",
+            "alloc_bytes_per_frame",
+            "realtime_calls_per_core",
+        ],
+    )
+    print_comparison(
+        args.compare,
+        results,
+        key=lambda r: (r["direction"], r["impl"], r["frame_ms"]),
+        metrics=[
+            "p50_us",
+            "p99_us",
+            "frames_per_sec_per_core",
+            "alloc_bytes_per_frame",
+        ],
+    )
+    write_report(
+        args.output,
+        {
+            "benchmark": "audio_transcoding",
+            "environment": environment_info(seconds=args.seconds),
+            "results": results,
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,444 @@
+"""
+Concurrent-call load generator that plays the part of Twilio.
+
+Each simulated call POSTs the `/twilio/connect` webhook (signed with
+`--auth-token` if given), opens the Media Stream WebSocket from the returned
+TwiML, sends `connected` and `start` with the TwiML's custom parameters, then
+streams caller audio at realtime pace as 20ms `media` frames. Keypad presses are
+sent as `dtmf` events on a schedule and the call ends with `stop`. Agent audio is
+"played" on a per-call clock, so `mark`s are echoed when their audio would have
+finished playing and `clear` empties the playback buffer, as Twilio does.
+
+Calls start evenly over `--ramp-seconds`. For every concurrency level the report
+has percentiles of:
+- time to first audio: webhook POST to the first agent `media` frame;
+- jitter: how late agent frames arrive for the playback clock (0 while audio is
+  buffered ahead, the length of the gap the caller hears otherwise);
+- barge-in: caller speech starting while the agent is talking, to the `clear`;
+- and counts of calls turned away by the webhook and of dropped connections.
+
+Usage:
+```sh
+python apps/voice-bridge/benchmarks/call_load.py --url http://localhost:8000 --calls 10 25 50
+```
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import time
+import uuid
+import xml.etree.ElementTree as ET
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import httpx
+import numpy as np
+from twilio.request_validator import RequestValidator
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosed
+
+from audio_transcoding import load_trace, synthetic_speech
+from common import (
+    add_report_arguments,
+    environment_info,
+    percentile,
+    print_comparison,
+    print_table,
+    write_report,
+)
+from voice_bridge.services.inbound_audio import packet_levels
+from voice_bridge.utils.audio import (
+    TWILIO_FRAME_BYTES,
+    TWILIO_SAMPLE_RATE,
+    pcm_to_ulaw,
+    ulaw_to_pcm,
+)
+
+FRAME_SECONDS = 0.02
+SILENCE = b"\xff" * TWILIO_FRAME_BYTES  # μ-law zero
+SPEECH_DBFS = -45.0  # Same threshold as the bridge's inbound VAD
+# An arrival this long after playback ran dry starts a new agent utterance
+UTTERANCE_GAP_SECONDS = 0.2
+
+
+def caller_script(speech_seconds: float, listen_seconds: float) -> bytes:
+    """Silence while the agent talks (the greeting first), then caller speech, as μ-law"""
+    speech = pcm_to_ulaw(synthetic_speech(speech_seconds, TWILIO_SAMPLE_RATE)).tobytes()
+    return SILENCE * int(listen_seconds / FRAME_SECONDS) + speech
+
+
+def speech_starts(audio: bytes, min_pause_frames: int = 15) -> set[int]:
+    """Frame indexes where the caller starts talking after a pause"""
+    starts = set()
+    quiet = min_pause_frames
+    for index in range(len(audio) // TWILIO_FRAME_BYTES):
+        frame = audio[index * TWILIO_FRAME_BYTES : (index + 1) * TWILIO_FRAME_BYTES]
+        pcm = ulaw_to_pcm(np.frombuffer(frame, dtype=np.uint8))
+        if packet_levels(pcm)[0] > SPEECH_DBFS:
+            if quiet >= min_pause_frames:
+                starts.add(index)
+            quiet = 0
+        else:
+            quiet += 1
+    return starts
+
+
+def parse_dtmf(schedule: list[str]) -> list[tuple[float, str]]:
+    """`SECONDS:DIGITS` entries, e.g. `12:1234#`"""
+    presses = []
+    for entry in schedule:
+        at, digits = entry.split(":", 1)
+        presses.extend((float(at) + i * 0.15, digit) for i, digit in enumerate(digits))
+    return sorted(presses)
+
+
+@dataclass(slots=True)
+class CallResult:
+    outcome: str = "ok"  # ok, rejected, dropped, failed
+    connect_ms: float | None = None
+    first_audio_ms: float | None = None
+    jitter_ms: list[float] = field(default_factory=list)
+    barge_in_ms: list[float] = field(default_factory=list)
+    barge_ins: int = 0
+    frames_received: int = 0
+    error: str = ""
+
+
+class FakeTwilioCall:
+    """One caller: the webhook, then the Media Stream until `stop`"""
+
+    def __init__(
+        self, args: argparse.Namespace, index: int, audio: bytes, starts: set[int]
+    ):
+        self.args = args
+        self.index = index
+        self.audio = audio
+        self.starts = starts
+        self.call_sid = "CA" + uuid.uuid4().hex
+        self.stream_sid = "MZ" + uuid.uuid4().hex
+        self.result = CallResult()
+        self.sequence = 0
+        self.posted_at = 0.0
+        self.playback_end = 0.0  # When the agent audio received so far finishes playing
+        self.marks: deque[tuple[float, str]] = deque()
+        self.barge_in_at: float | None = None  # Caller started talking over the agent
+        self.stopped = False
+
+    async def run(self, http: httpx.AsyncClient) -> CallResult:
+        try:
+            twiml = await self.webhook(http)
+            stream = twiml.find(".//Stream")
+            if stream is None:
+                self.result.outcome = "rejected"
+                return self.result
+            parameters = {
+                p.get("name"): p.get("value") for p in stream.iter("Parameter")
+            }
+            url = self.stream_url(stream.get("url"))
+            async with connect(url, max_size=None, open_timeout=30) as ws:
+                await self.stream(ws, parameters)
+        except ConnectionClosed as ex:
+            self.result.outcome = "dropped"
+            self.result.error = repr(ex)
+        except Exception as ex:
+            self.result.outcome = "failed"
+            self.result.error = repr(ex)
+        return self.result
+
+    def stream_url(self, twiml_url: str) -> str:
+        """The TwiML's stream URL, on `--stream-url`'s host if given"""
+        if not self.args.stream_url:
+            return twiml_url
+        # Keep the TwiML's path, which may name the worker that took the webhook
+        override = urlsplit(self.args.stream_url)
+        url = urlsplit(twiml_url)._replace(
+            scheme=override.scheme, netloc=override.netloc
+        )
+        return url.geturl()
+
+    async def webhook(self, http: httpx.AsyncClient) -> ET.Element:
+        url = f"{self.args.url}/twilio/connect"
+        form = {
+            "CallSid": self.call_sid,
+            "AccountSid": "AC" + "0" * 32,
+            "From": f"+1555{self.index:07d}",
+            "To": self.args.to,
+            "Direction": "inbound",
+            "ApiVersion": "2010-04-01",
+        }
+        headers = {}
+        if self.args.auth_token:
+            validator = RequestValidator(self.args.auth_token)
+            headers["X-Twilio-Signature"] = validator.compute_signature(url, form)
+        self.posted_at = time.perf_counter()
+        response = await http.post(url, data=form, headers=headers)
+        response.raise_for_status()
+        self.result.connect_ms = (time.perf_counter() - self.posted_at) * 1000
+        return ET.fromstring(response.text)
+
+    async def stream(self, ws, parameters: dict[str, str]) -> None:
+        await ws.send(
+            json.dumps({"event": "connected", "protocol": "Call", "version": "1.0.0"})
+        )
+        await self.send(
+            ws,
+            "start",
+            start={
+                "accountSid": "AC" + "0" * 32,
+                "streamSid": self.stream_sid,
+                "callSid": self.call_sid,
+                "tracks": ["inbound"],
+                "mediaFormat": {
+                    "encoding": "audio/x-mulaw",
+                    "sampleRate": 8000,
+                    "channels": 1,
+                },
+                "customParameters": parameters,
+            },
+        )
+        receiver = asyncio.create_task(self.receive(ws))
+        try:
+            await self.send_audio(ws, receiver)
+            if not receiver.done():
+                self.stopped = True
+                await self.send(
+                    ws, "stop", stop={"accountSid": "", "callSid": self.call_sid}
+                )
+                await asyncio.wait_for(receiver, timeout=5)
+        finally:
+            receiver.cancel()
+            await asyncio.gather(receiver, return_exceptions=True)
+
+    async def send(self, ws, event: str, **body) -> None:
+        self.sequence += 1
+        message = {
+            "event": event,
+            "sequenceNumber": str(self.sequence),
+            "streamSid": self.stream_sid,
+        }
+        await ws.send(json.dumps(message | body))
+
+    async def send_audio(self, ws, receiver: asyncio.Task) -> None:
+        presses = deque(parse_dtmf(self.args.dtmf))
+        total = int(self.args.call_seconds / FRAME_SECONDS)
+        frames = len(self.audio) // TWILIO_FRAME_BYTES
+        started = next_tick = time.perf_counter()
+        for index in range(total):
+            if receiver.done():
+                return
+            offset = index % frames
+            if offset in self.starts and self.playback_end > time.perf_counter():
+                self.barge_in_at = time.perf_counter()
+                self.result.barge_ins += 1
+            frame = self.audio[
+                offset * TWILIO_FRAME_BYTES : (offset + 1) * TWILIO_FRAME_BYTES
+            ]
+            await ws.send(self.media_message(index, frame))
+            while presses and presses[0][0] <= index * FRAME_SECONDS:
+                await self.send(
+                    ws,
+                    "dtmf",
+                    dtmf={"track": "inbound_track", "digit": presses.popleft()[1]},
+                )
+            await self.echo_marks(ws, time.perf_counter())
+            next_tick = started + (index + 1) * FRAME_SECONDS
+            await asyncio.sleep(max(0.0, next_tick - time.perf_counter()))
+
+    def media_message(self, index: int, frame: bytes) -> str:
+        """An inbound `media` message as Twilio formats it"""
+        self.sequence += 1
+        payload = base64.b64encode(frame).decode("ascii")
+        return (
+            f'{{"event":"media","sequenceNumber":"{self.sequence}","media":{{"track":"inbound",'
+            f'"chunk":"{index + 1}","timestamp":"{index * 20}","payload":"{payload}"}},'
+            f'"streamSid":"{self.stream_sid}"}}'
+        )
+
+    async def echo_marks(self, ws, now: float) -> None:
+        while self.marks and self.marks[0][0] <= now:
+            await self.send(ws, "mark", mark={"name": self.marks.popleft()[1]})
+
+    async def receive(self, ws) -> None:
+        try:
+            async for text in ws:
+                message = json.loads(text)
+                event = message.get("event")
+                now = time.perf_counter()
+                if event == "media":
+                    self.on_media(now)
+                elif event == "mark":
+                    self.marks.append(
+                        (max(now, self.playback_end), message["mark"]["name"])
+                    )
+                elif event == "clear":
+                    self.on_clear(now)
+                    await self.echo_marks(ws, float("inf"))
+        except ConnectionClosed:
+            pass
+        if not self.stopped:
+            self.result.outcome = "dropped"
+            self.result.error = f"Stream closed by the server ({ws.close_code})"
+
+    def on_media(self, now: float) -> None:
+        result = self.result
+        result.frames_received += 1
+        if result.first_audio_ms is None:
+            result.first_audio_ms = (now - self.posted_at) * 1000
+        if self.playback_end >= now:
+            result.jitter_ms.append(0.0)
+        elif now - self.playback_end < UTTERANCE_GAP_SECONDS:
+            result.jitter_ms.append((now - self.playback_end) * 1000)
+        self.playback_end = max(self.playback_end, now) + FRAME_SECONDS
+
+    def on_clear(self, now: float) -> None:
+        if self.barge_in_at is not None:
+            self.result.barge_in_ms.append((now - self.barge_in_at) * 1000)
+            self.barge_in_at = None
+        self.playback_end = now
+
+
+async def place_calls(
+    args: argparse.Namespace, indices: range, calls: int, audio: bytes, starts: set[int]
+) -> list[CallResult]:
+    """Places the calls numbered `indices` out of `calls`, each at its slot in the ramp"""
+    limits = httpx.Limits(max_connections=max(len(indices), 1))
+    async with httpx.AsyncClient(timeout=30, limits=limits) as http:
+
+        async def place(index: int) -> CallResult:
+            await asyncio.sleep(index * args.ramp_seconds / calls)
+            return await FakeTwilioCall(args, index, audio, starts).run(http)
+
+        return await asyncio.gather(*(place(i) for i in indices))
+
+
+async def run(
+    args: argparse.Namespace, calls: int, audio: bytes, starts: set[int]
+) -> dict:
+    return summarize(calls, await place_calls(args, range(calls), calls, audio, starts))
+
+
+def summarize(calls: int, results: list[CallResult]) -> dict:
+    errors = {r.error for r in results if r.error}
+    for error in list(errors)[:5]:
+        print(f"  {error}")
+
+    def collect(name: str) -> list[float]:
+        values = []
+        for r in results:
+            value = getattr(r, name)
+            if isinstance(value, list):
+                values.extend(value)
+            elif value is not None:
+                values.append(value)
+        return values
+
+    ttfa = collect("first_audio_ms")
+    jitter = collect("jitter_ms")
+    barge_in = collect("barge_in_ms")
+    return {
+        "calls": calls,
+        "ok": sum(r.outcome == "ok" for r in results),
+        "rejected": sum(r.outcome == "rejected" for r in results),
+        "dropped": sum(r.outcome in ("dropped", "failed") for r in results),
+        "no_audio": sum(r.outcome == "ok" and not r.frames_received for r in results),
+        "connect_p50_ms": percentile(collect("connect_ms"), 50),
+        "ttfa_p50_ms": percentile(ttfa, 50),
+        "ttfa_p95_ms": percentile(ttfa, 95),
+        "ttfa_p99_ms": percentile(ttfa, 99),
+        "jitter_p50_ms": percentile(jitter, 50),
+        "jitter_p99_ms": percentile(jitter, 99),
+        "barge_ins": sum(r.barge_ins for r in results),
+        "barge_in_p50_ms": percentile(barge_in, 50),
+        "barge_in_p99_ms": percentile(barge_in, 99),
+    }
+
+
+def add_call_arguments(parser: argparse.ArgumentParser) -> None:
+    """Options shaping each simulated call, shared with `worker_scaling.py`"""
+    parser.add_argument(
+        "--stream-url", help="Media Stream URL whose host to use instead of the TwiML's"
+    )
+    parser.add_argument("--auth-token", default=os.getenv("TWILIO_AUTH_TOKEN", ""))
+    parser.add_argument("--to", default="+15550000000", help="Called number")
+    parser.add_argument(
+        "--ramp-seconds", type=float, default=10, help="Time to start all calls"
+    )
+    parser.add_argument(
+        "--call-seconds", type=float, default=60, help="Length of each call"
+    )
+    parser.add_argument(
+        "--pause-seconds", type=float, default=10, help="Wait between levels"
+    )
+    parser.add_argument(
+        "--audio", type=Path, help="Caller audio, μ-law @ 8kHz (raw or .wav), looped"
+    )
+    parser.add_argument(
+        "--speech-seconds", type=float, default=3, help="Synthetic caller turn"
+    )
+    parser.add_argument(
+        "--listen-seconds", type=float, default=7, help="Silence after each turn"
+    )
+    parser.add_argument(
+        "--dtmf", nargs="*", default=[], metavar="SECONDS:DIGITS", help="e.g. 20:1234#"
+    )
+
+
+def caller_audio(args: argparse.Namespace) -> tuple[bytes, set[int]]:
+    """The looped caller audio, in whole frames, and the frames where the caller starts talking"""
+    if args.audio:
+        audio = load_trace(args.audio, TWILIO_SAMPLE_RATE, 1)
+    else:
+        audio = caller_script(args.speech_seconds, args.listen_seconds)
+    audio = audio[: len(audio) - len(audio) % TWILIO_FRAME_BYTES]
+    return audio, speech_starts(audio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--url", default="http://localhost:8000", help="voice-bridge base URL"
+    )
+    parser.add_argument("--calls", type=int, nargs="+", default=[1, 10, 25])
+    add_call_arguments(parser)
+    add_report_arguments(parser)
+    args = parser.parse_args()
+    args.url = args.url.rstrip("/")
+    audio, starts = caller_audio(args)
+
+    results = []
+    for level, calls in enumerate(args.calls):
+        if level:
+            time.sleep(args.pause_seconds)
+        results.append(asyncio.run(run(args, calls, audio, starts)))
+        print(f"{calls:5} calls done", flush=True)
+
+    print()
+    print_table(results, list(results[0]))
+    print_comparison(
+        args.compare,
+        results,
+        key=lambda r: (r["calls"],),
+        metrics=["ttfa_p95_ms", "jitter_p99_ms", "barge_in_p99_ms", "dropped"],
+    )
+    write_report(
+        args.output,
+        {
+            "benchmark": "call_load",
+            "environment": environment_info(
+                url=args.url,
+                ramp_seconds=args.ramp_seconds,
+                call_seconds=args.call_seconds,
+                audio=str(args.audio or "synthetic"),
+            ),
+            "results": results,
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Shared helpers for voice-bridge benchmarks.
+
+Benchmarks print a human readable table and can write a JSON report with
+`--output`, which `--compare` can diff against a report from another commit.
+"""
+
+import time
+import tracemalloc
+from typing import Callable
+
+# The report helpers are shared with the anthos-mcp benchmarks
+from shared_utils.benchmarks import (
+    add_report_arguments,
+    environment_info,
+    percentile,
+    print_comparison,
+    print_table,
+    write_report,
+)
+
+__all__ = [
+    "add_report_arguments",
+    "environment_info",
+    "measure_allocations",
+    "measure_frames",
+    "percentile",
+    "print_comparison",
+    "print_table",
+    "write_report",
+]
+
+
+def measure_frames(
+    process: Callable[[bytes], object], frames: list[bytes], warmup: int = 10
+) -> dict[str, float]:
+    """
+    Runs `process` over every frame and reports per-frame latency and CPU cost.
+
+    Wall latency is measured per frame; CPU time is measured over the whole run
+    so that frames/sec per core is not skewed by timer resolution.
+    """
+    for frame in frames[:warmup]:
+        process(frame)
+
+    latencies: list[float] = []
+    cpu_start = time.process_time()
+    for frame in frames:
+        start = time.perf_counter_ns()
+        process(frame)
+        latencies.append((time.perf_counter_ns() - start) / 1000)
+    cpu_seconds = time.process_time() - cpu_start
+
+    return {
+        "frames": len(frames),
+        "p50_us": percentile(latencies, 50),
+        "p99_us": percentile(latencies, 99),
+        "max_us": max(latencies, default=0.0),
+        "cpu_us_per_frame": cpu_seconds / len(frames) * 1e6 if frames else 0.0,
+        "frames_per_sec_per_core": len(frames) / cpu_seconds if cpu_seconds else 0.0,
+    }
+
+
+def measure_allocations(
+    process: Callable[[bytes], object], frames: list[bytes]
+) -> dict[str, float]:
+    """
+    Average transient heap high-water mark per frame, in bytes.
+
+    Traced separately from the timing run because tracemalloc slows allocation down.
+    """
+    tracemalloc.start()
+    try:
+        peak_bytes = 0
+        for frame in frames:
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            process(frame)
+            _, peak = tracemalloc.get_traced_memory()
+            peak_bytes += peak - current
+    finally:
+        tracemalloc.stop()
+    return {"alloc_bytes_per_frame": peak_bytes / max(len(frames), 1)}
@@ -0,0 +1,128 @@
+"""
+Import time budget report for voice-bridge startup.
+
+Imports each module in a fresh interpreter with `python -X importtime` and
+reports its cumulative import time (the best of `--repeat` runs) against a
+budget, plus the top-level packages that took the most time. By default it
+checks `voice_bridge.main`, which has to load before the server answers health
+checks, and `voice_bridge.calls`, which the startup warm-up imports in the
+background. Exits with status 1 when a module is over its budget, so it can
+guard startup time in CI.
+
+Usage:
+```sh
+python apps/voice-bridge/benchmarks/import_time.py --budget voice_bridge.main=1000
+```
+"""
+
+import argparse
+import subprocess
+import sys
+from collections import Counter
+
+from common import (
+    add_report_arguments,
+    environment_info,
+    print_comparison,
+    print_table,
+    write_report,
+)
+
+DEFAULT_BUDGETS_MS = {"voice_bridge.main": 1000.0, "voice_bridge.calls": 6000.0}
+
+
+def import_times(module: str) -> tuple[float, Counter[str]]:
+    """Cumulative import time of `module` and self time per top-level package, in ms"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0.0
+    packages: Counter[str] = Counter()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        packages[package_of(name.strip())] += int(self_us) / 1000
+        if name.strip() == module:
+            total = int(cumulative_us) / 1000
+    return total, packages
+
+
+def package_of(name: str) -> str:
+    parts = name.split(".")
+    # `google` is a namespace shared by unrelated distributions, e.g. google.adk and google.genai
+    return ".".join(parts[:2]) if parts[0] == "google" else parts[0]
+
+
+def parse_budget(value: str) -> tuple[str, float]:
+    module, _, ms = value.partition("=")
+    return module, float(ms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--modules", nargs="+", default=list(DEFAULT_BUDGETS_MS))
+    parser.add_argument(
+        "--budget",
+        type=parse_budget,
+        action="append",
+        default=[],
+        metavar="MODULE=MS",
+        help="Import time budget for a module, overriding the default",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8, help="Packages listed per module")
+    add_report_arguments(parser)
+    args = parser.parse_args()
+    budgets = DEFAULT_BUDGETS_MS | dict(args.budget)
+
+    results = []
+    packages = []
+    for module in args.modules:
+        # The fastest run has the least noise from the rest of the machine
+        total, by_package = min(
+            (import_times(module) for _ in range(args.repeat)), key=lambda run: run[0]
+        )
+        budget = budgets.get(module)
+        results.append(
+            {
+                "module": module,
+                "import_ms": total,
+                "budget_ms": budget,
+                "over_budget": budget is not None and total > budget,
+            }
+        )
+        for package, ms in by_package.most_common(args.top):
+            packages.append(
+                {
+                    "module": module,
+                    "package": package,
+                    "self_ms": ms,
+                    "share_pct": ms / total * 100 if total else 0.0,
+                }
+            )
+
+    print_table(results, ["module", "import_ms", "budget_ms", "over_budget"])
+    print()
+    print_table(packages, ["module", "package", "self_ms", "share_pct"])
+    print_comparison(
+        args.compare, results, key=lambda r: (r["module"],), metrics=["import_ms"]
+    )
+    write_report(
+        args.output,
+        {
+            "benchmark": "import_time",
+            "environment": environment_info(repeat=args.repeat),
+            "results": results,
+            "packages": packages,
+        },
+    )
+    if any(r["over_budget"] for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Concurrent-call transcoding benchmark for `voice_bridge.services.transcoding`.
+
+Simulates N calls on one event loop. Every 20ms each call transcodes one inbound
+μ-law frame and one outbound 24kHz PCM frame, and a probe task measures how late
+the event loop wakes up (which is what delays every other call's WebSocket I/O).
+
+Usage:
+```sh
+python apps/voice-bridge/benchmarks/transcoding_executor.py --calls 10 50 100 --modes inline thread
+```
+"""
+
+import argparse
+import asyncio
+import time
+
+from audio_transcoding import synthetic_speech
+from common import (
+    add_report_arguments,
+    environment_info,
+    percentile,
+    print_comparison,
+    print_table,
+    write_report,
+)
+from voice_bridge.services.transcoding import TranscodingExecutor
+from voice_bridge.utils.audio import (
+    ADK_OUTPUT_SAMPLE_RATE,
+    TWILIO_SAMPLE_RATE,
+    pcm_to_ulaw,
+)
+
+FRAME_SECONDS = 0.02
+
+
+async def simulate_call(
+    executor: TranscodingExecutor,
+    call_id: str,
+    inbound: bytes,
+    outbound: bytes,
+    until: float,
+    latencies: list[float],
+) -> int:
+    codec = executor.open_call(call_id)
+    frames = 0
+    next_tick = time.perf_counter()
+    while next_tick < until:
+        start = time.perf_counter()
+        await codec.twilio_to_adk(inbound)
+        await codec.adk_to_twilio(outbound)
+        latencies.append((time.perf_counter() - start) * 1e6)
+        frames += 1
+        next_tick += FRAME_SECONDS
+        await asyncio.sleep(max(0.0, next_tick - time.perf_counter()))
+    await codec.close()
+    return frames
+
+
+async def probe_loop_lag(until: float, lags: list[float]) -> None:
+    while time.perf_counter() < until:
+        start = time.perf_counter()
+        await asyncio.sleep(0.005)
+        lags.append((time.perf_counter() - start - 0.005) * 1e6)
+
+
+async def run(mode: str, calls: int, seconds: float, workers: int) -> dict:
+    executor = TranscodingExecutor(mode=mode, workers=workers)  # type: ignore[arg-type]
+    executor.start()
+    inbound = pcm_to_ulaw(synthetic_speech(FRAME_SECONDS, TWILIO_SAMPLE_RATE)).tobytes()
+    outbound = synthetic_speech(FRAME_SECONDS, ADK_OUTPUT_SAMPLE_RATE).tobytes()
+
+    # Warm up workers (process pools import NumPy/soxr on first use)
+    await asyncio.gather(
+        *(
+            executor.open_call(f"warmup-{i}").twilio_to_adk(inbound)
+            for i in range(workers)
+        )
+    )
+
+    latencies: list[float] = []
+    lags: list[float] = []
+    until = time.perf_counter() + seconds
+    cpu_start = time.process_time()
+    results = await asyncio.gather(
+        probe_loop_lag(until, lags),
+        *(
+            simulate_call(executor, f"call-{i}", inbound, outbound, until, latencies)
+            for i in range(calls)
+        ),
+    )
+    cpu_seconds = time.process_time() - cpu_start
+    stats = executor.stats()
+    executor.shutdown()
+
+    frames = sum(results[1:])
+    expected = calls * seconds / FRAME_SECONDS
+    return {
+        "mode": mode,
+        "calls": calls,
+        "frame_p50_us": percentile(latencies, 50),
+        "frame_p99_us": percentile(latencies, 99),
+        "loop_lag_p50_us": percentile(lags, 50),
+        "loop_lag_p99_us": percentile(lags, 99),
+        "realtime_ratio": frames / expected if expected else 0.0,
+        "mean_batch_size": stats["mean_batch_size"],
+        "main_process_cpu_pct": cpu_seconds / seconds * 100,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--modes", nargs="+", default=["inline", "thread", "process"])
+    parser.add_argument("--workers", type=int, default=2, help="Shards per executor")
+    parser.add_argument("--seconds", type=float, default=10, help="Duration per run")
+    add_report_arguments(parser)
+    args = parser.parse_args()
+
+    results = []
+    for calls in args.calls:
+        for mode in args.modes:
+            results.append(asyncio.run(run(mode, calls, args.seconds, args.workers)))
+            print(f"{mode:8} {calls:5} calls done", flush=True)
+
+    print()
+    print_table(results, list(results[0]))
+    print_comparison(
+        args.compare,
+        results,
+        key=lambda r: (r["mode"], r["calls"]),
+        metrics=["frame_p99_us", "loop_lag_p99_us", "realtime_ratio"],
+    )
+    write_report(
+        args.output,
+        {
+            "benchmark": "transcoding_executor",
+            "environment": environment_info(seconds=args.seconds, workers=args.workers),
+            "results": results,
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Twilio Media Streams message codec benchmark.
+
+Compares handling one 20ms `media` message each way with the generic path the
+WebSocket handler used to take (`json.loads` into dicts plus `base64` inbound,
+a dict serialized like Starlette's `send_json` outbound) against
+`voice_bridge.services.media_stream`. Reports per-message latency, messages/sec
+per core and transient bytes allocated per message.
+
+Usage:
+```sh
+python apps/voice-bridge/benchmarks/twilio_frames.py --messages 50000
+```
+"""
+
+import argparse
+import base64
+import json
+
+from common import (
+    add_report_arguments,
+    environment_info,
+    measure_allocations,
+    measure_frames,
+    print_comparison,
+    print_table,
+    write_report,
+)
+from voice_bridge.services.media_stream import MediaStreamEncoder, parse_frame
+from voice_bridge.utils.audio import TWILIO_FRAME_BYTES
+
+STREAM_SID = "MZ18ad3ab5a668481ce02b83e7395059f0"
+
+
+def inbound_messages(count: int) -> list[str]:
+    """`media` messages as Twilio sends them, with varying payloads"""
+    messages = []
+    for i in range(count):
+        payload = bytes((i + j) % 256 for j in range(TWILIO_FRAME_BYTES))
+        message = {
+            "event": "media",
+            "sequenceNumber": str(i + 2),
+            "media": {
+                "track": "inbound",
+                "chunk": str(i + 1),
+                "timestamp": str(i * 20),
+                "payload": base64.b64encode(payload).decode("ascii"),
+            },
+            "streamSid": STREAM_SID,
+        }
+        messages.append(json.dumps(message, separators=(",", ":")))
+    return messages
+
+
+def generic_inbound(text: str) -> bytes:
+    event = json.loads(text)
+    if event["event"] == "media":
+        return base64.b64decode(event["media"]["payload"])
+    return b""
+
+
+def codec_inbound(text: str) -> bytes:
+    return parse_frame(text).payload
+
+
+def generic_outbound(frame: bytes) -> str:
+    message = {
+        "event": "media",
+        "streamSid": STREAM_SID,
+        "media": {"payload": base64.b64encode(frame).decode("ascii")},
+    }
+    # What Starlette's `WebSocket.send_json` does before sending
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=50_000)
+    add_report_arguments(parser)
+    args = parser.parse_args()
+
+    inbound = inbound_messages(args.messages)
+    outbound = [parse_frame(m).payload for m in inbound]
+    encoder = MediaStreamEncoder(STREAM_SID)
+    assert all(codec_inbound(m) == generic_inbound(m) for m in inbound[:100])
+    assert all(
+        json.loads(encoder.media(f)) == json.loads(generic_outbound(f))
+        for f in outbound[:100]
+    )
+
+    variants = {
+        ("inbound", "generic"): (generic_inbound, inbound),
+        ("inbound", "codec"): (codec_inbound, inbound),
+        ("outbound", "generic"): (generic_outbound, outbound),
+        ("outbound", "codec"): (encoder.media, outbound),
+    }
+    results = []
+    for (direction, impl), (process, messages) in variants.items():
+        row = {"direction": direction, "impl": impl}
+        row |= measure_frames(process, messages)
+        row |= measure_allocations(process, messages[:2000])
+        results.append(row)
+
+    print_table(
+        results,
+        [
+            "direction",
+            "impl",
+            "p50_us",
+            "p99_us",
+            "frames_per_sec_per_core",
+            "alloc_bytes_per_frame",
+        ],
+    )
+    print_comparison(
+        args.compare,
+        results,
+        key=lambda r: (r["direction"], r["impl"]),
+        metrics=["p50_us", "frames_per_sec_per_core", "alloc_bytes_per_frame"],
+    )
+    write_report(
+        args.output,
+        {
+            "benchmark": "twilio_frames",
+            "environment": environment_info(messages=args.messages),
+            "results": results,
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
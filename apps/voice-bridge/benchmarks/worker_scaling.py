@@ -0,0 +1,217 @@
+"""
+Concurrent call capacity of one node as the number of voice-bridge workers grows.
+
+For every `--workers` count it starts `voice_bridge.supervisor` on a free port
+(with the fake live backend unless `LIVE_BACKEND` says otherwise), waits for
+`/health/ready`, then places `--calls` levels of simulated calls with the
+`call_load.py` caller, in increasing order. A level is healthy when no call was
+rejected, dropped or got no audio, time to first audio p95 is within
+`--max-ttfa-ms` and jitter p99 within `--max-jitter-ms`; the capacity for a
+worker count is its largest healthy level. The report has every level plus the
+capacity, capacity per worker, speedup over the smallest worker count and
+scaling efficiency.
+
+Calls can be placed by `--clients` load generator processes, so the generator
+does not become the bottleneck before the server does. Run it on a node with at
+least as many cores as the largest worker count, plus some for the clients.
+
+Usage:
+```sh
+python apps/voice-bridge/benchmarks/worker_scaling.py --workers 1 2 4 --calls 10 20 40 80
+```
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+
+from call_load import (
+    CallResult,
+    add_call_arguments,
+    caller_audio,
+    place_calls,
+    summarize,
+)
+from common import (
+    add_report_arguments,
+    environment_info,
+    print_comparison,
+    print_table,
+    write_report,
+)
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def start_server(workers: int, port: int, args: argparse.Namespace) -> subprocess.Popen:
+    env = os.environ | {
+        "LIVE_BACKEND": os.getenv("LIVE_BACKEND", "fake"),
+        "APP_ENVIRONMENT": os.getenv("APP_ENVIRONMENT", "LOCAL"),
+    }
+    command = [
+        sys.executable,
+        "-m",
+        "voice_bridge.supervisor",
+        "--workers",
+        str(workers),
+    ]
+    command += ["--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+    with open(args.server_log, "a") as log:
+        server = subprocess.Popen(command, env=env, stdout=log, stderr=log)
+    deadline = time.monotonic() + args.startup_timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(
+                f"Server exited with {server.returncode}, see {args.server_log}"
+            )
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health/ready").status_code == 200:
+                return server
+        except httpx.TransportError:
+            pass
+        time.sleep(0.5)
+    stop_server(server)
+    raise RuntimeError(
+        f"Server not ready after {args.startup_timeout}s, see {args.server_log}"
+    )
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.send_signal(signal.SIGTERM)
+    try:
+        server.wait(timeout=60)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+def place_share(
+    args: argparse.Namespace, indices: range, calls: int, audio: bytes, starts: set[int]
+) -> list[CallResult]:
+    """One load generator process's calls"""
+    return asyncio.run(place_calls(args, indices, calls, audio, starts))
+
+
+def run_level(
+    pool: ProcessPoolExecutor,
+    args: argparse.Namespace,
+    calls: int,
+    audio: bytes,
+    starts: set[int],
+) -> dict:
+    # Every client takes every `clients`th call, so together they keep the ramp even
+    shares = [range(client, calls, args.clients) for client in range(args.clients)]
+    futures = [
+        pool.submit(place_share, args, share, calls, audio, starts) for share in shares
+    ]
+    results = [result for future in futures for result in future.result()]
+    return summarize(calls, results)
+
+
+def healthy(level: dict, args: argparse.Namespace) -> bool:
+    return (
+        level["rejected"] == 0
+        and level["dropped"] == 0
+        and level["no_audio"] == 0
+        and level["ttfa_p95_ms"] <= args.max_ttfa_ms
+        and level["jitter_p99_ms"] <= args.max_jitter_ms
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--calls", type=int, nargs="+", default=[10, 20, 40, 80, 160])
+    parser.add_argument(
+        "--clients", type=int, default=2, help="Load generator processes"
+    )
+    parser.add_argument("--max-ttfa-ms", type=float, default=1500)
+    parser.add_argument("--max-jitter-ms", type=float, default=60)
+    parser.add_argument("--startup-timeout", type=float, default=120)
+    parser.add_argument(
+        "--server-log", default=os.devnull, help="Where the servers log to"
+    )
+    add_call_arguments(parser)
+    parser.set_defaults(call_seconds=30, pause_seconds=5)
+    add_report_arguments(parser)
+    args = parser.parse_args()
+    audio, starts = caller_audio(args)
+    stream_url = args.stream_url
+
+    levels = []
+    capacities = []
+    with ProcessPoolExecutor(max_workers=args.clients) as pool:
+        for workers in sorted(args.workers):
+            port = free_port()
+            args.url = f"http://127.0.0.1:{port}"
+            # The TwiML's stream URL has no port, see `routers/twilio.py`
+            args.stream_url = stream_url or f"ws://127.0.0.1:{port}/twilio/stream"
+            server = start_server(workers, port, args)
+            capacity = 0
+            try:
+                for level, calls in enumerate(sorted(args.calls)):
+                    if level:
+                        time.sleep(args.pause_seconds)
+                    result = {"workers": workers} | run_level(
+                        pool, args, calls, audio, starts
+                    )
+                    result["healthy"] = healthy(result, args)
+                    levels.append(result)
+                    print(f"{workers:3} workers {calls:5} calls done", flush=True)
+                    if not result["healthy"]:
+                        break
+                    capacity = calls
+            finally:
+                stop_server(server)
+            capacities.append({"workers": workers, "capacity_calls": capacity})
+
+    baseline = capacities[0]
+    for row in capacities:
+        row["calls_per_worker"] = row["capacity_calls"] / row["workers"]
+        speedup = row["capacity_calls"] / max(baseline["capacity_calls"], 1)
+        row["speedup"] = speedup
+        row["efficiency_pct"] = speedup * baseline["workers"] / row["workers"] * 100
+
+    print()
+    columns = ["workers", "calls", "healthy", "ok", "rejected", "dropped", "no_audio"]
+    print_table(levels, columns + ["ttfa_p95_ms", "jitter_p99_ms"])
+    print()
+    print_table(capacities, list(capacities[0]))
+    print_comparison(
+        args.compare,
+        capacities,
+        key=lambda r: (r["workers"],),
+        metrics=["capacity_calls", "speedup"],
+    )
+    write_report(
+        args.output,
+        {
+            "benchmark": "worker_scaling",
+            "environment": environment_info(
+                clients=args.clients,
+                call_seconds=args.call_seconds,
+                ramp_seconds=args.ramp_seconds,
+                max_ttfa_ms=args.max_ttfa_ms,
+                max_jitter_ms=args.max_jitter_ms,
+                live_backend=os.getenv("LIVE_BACKEND", "fake"),
+            ),
+            "results": capacities,
+            "levels": levels,
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Everything that needs google-adk: the call routers and the services behind them.
+
+google-adk takes seconds to import, so `main` only imports this module in its
+background warm-up, once the server is already answering health checks.
+"""
+
+import asyncio
+import os
+
+from adk_agents.agents.banking_agent.agent import mcp_connection
+from adk_agents.runtime.live_messaging import agent_runtime
+from .routers import metrics, sessions, twilio
+from .services.adk_session_service import session_registry
+from .services.metrics import observe_tool_call
+from .services.startup import startup
+from .utils.logging import logger
+
+routers = [metrics.router, sessions.router, twilio.router]
+
+
+async def connect_mcp() -> None:
+    async with startup.phase("mcp"):
+        # In its own task: a failed MCP connect can leak a cancellation from its cancel scope
+        connect = asyncio.create_task(mcp_connection.create_session())
+        (result,) = await asyncio.gather(connect, return_exceptions=True)
+        if isinstance(result, BaseException):
+            logger.warning(f"MCP connection not ready at startup: {result!r}")
+
+
+async def prewarm_agent() -> None:
+    async with startup.phase("agent"):
+        await agent_runtime.prewarm()
+
+
+async def warm_up() -> None:
+    """Opens the MCP connection and pre-warms the agent runtime, then starts taking calls"""
+    mcp_connection.on_tool_call = observe_tool_call
+    if os.getenv("AGENT_PREWARM", "true").lower() in ("1", "true", "yes"):
+        # The model clients are created while MCP connects. The fake backend never
+        # calls tools, so there may be no MCP server to connect to.
+        if agent_runtime.fake_live:
+            await prewarm_agent()
+        else:
+            await asyncio.gather(connect_mcp(), prewarm_agent())
+    session_registry.start()
+
+
+async def shutdown() -> None:
+    await session_registry.shutdown()
+    await agent_runtime.close()
@@ -1,11 +1,65 @@
+import asyncio
+import importlib
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from .routers import health, twilio
+from .routers import health
+from .services.capacity import call_capacity
+from .services.metrics import registry
+from .services.recording import call_recorder
+from .services.startup import startup
+from .services.transcoding import transcoding_executor
+from .services.transcripts import transcript_sink
+from .services.workers import close_connections, worker_table
+
+
+async def warm_up_transcoder() -> None:
+    async with startup.phase("transcoder"):
+        await transcoding_executor.warm_up()
+
+
+async def warm_up(app: FastAPI) -> None:
+    """Loads and pre-warms everything calls need; the pod is ready once this returns"""
+    # The codec warms up, e.g. spawning worker processes, while google-adk is imported on a thread
+    transcoder = asyncio.create_task(warm_up_transcoder())
+    async with startup.phase("imports"):
+        calls = await asyncio.to_thread(importlib.import_module, "voice_bridge.calls")
+    await transcoder
+    app.state.calls = calls
+    for router in calls.routers:
+        app.include_router(router)
+    await calls.warm_up()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    transcoding_executor.start()
+    transcript_sink.start()
+    call_recorder.start()
+    if worker_table.enabled:
+        call_capacity.on_change = worker_table.update
+        worker_table.share("metrics", registry.export)
+        worker_table.share("startup", startup.snapshot)
+        worker_table.start()
+    call_capacity.install_drain_on_sigterm()
+    startup.begin(warm_up(app))
+    yield
+    call_capacity.uninstall_drain_on_sigterm()
+    await worker_table.shutdown()
+    await startup.cancel()
+    if calls := getattr(app.state, "calls", None):
+        await calls.shutdown()
+    transcoding_executor.shutdown()
+    await transcript_sink.shutdown()
+    await call_recorder.shutdown()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Voice Bridge")
+    app = FastAPI(title="Voice Bridge", lifespan=lifespan)
+    # The call routers are added by `warm_up`, see `services/startup.py`
     app.include_router(health.router)
-    app.include_router(twilio.router)
+    if worker_table.enabled:
+        app.add_middleware(close_connections)
 
     return app
 
@@ -1,5 +1,11 @@
 from fastapi import APIRouter, Response
+from fastapi.responses import JSONResponse
 
+from voice_bridge.services.capacity import call_capacity
+from voice_bridge.services.startup import startup
+from voice_bridge.services.workers import worker_table
+
+# Served before the call stack is imported, so only light modules here; see `services/startup.py`
 router = APIRouter(prefix="/health", tags=["Health Check"], redirect_slashes=False)
 
 
@@ -7,3 +13,34 @@ router = APIRouter(prefix="/health", tags=["Health Check"], redirect_slashes=Fal
 async def health_check():
     """Health check endpoint"""
     return Response(status_code=200)
+
+
+@router.get("/ready", status_code=200)
+async def readiness_check():
+    """Readiness probe: fails until warmed up and while draining, with the call capacity"""
+    if worker_table.enabled:
+        body = worker_table.pod_snapshot()
+    else:
+        body = {**call_capacity.snapshot(), "warmed_up": startup.ready}
+    # A full pod stays ready: it still answers webhooks with the overflow TwiML and
+    # has to take the WebSockets of the calls it reserved slots for
+    ready = body["warmed_up"] and not body["draining"]
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+
+@router.get("/startup", status_code=200)
+async def startup_stats():
+    """Time from process start to ready, by startup phase"""
+    if not worker_table.enabled:
+        return startup.snapshot()
+    workers = worker_table.gather("startup")
+    ready = len(workers) == worker_table.workers and all(
+        w["ready"] for w in workers.values()
+    )
+    return {
+        "ready": ready,
+        "ready_seconds": max(w["ready_seconds"] for w in workers.values())
+        if ready
+        else None,
+        "workers": workers,
+    }
@@ -0,0 +1,68 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from adk_agents.agents.banking_agent.agent import mcp_connection
+from adk_agents.runtime.live_messaging import agent_runtime
+from voice_bridge.services.adk_session_service import session_registry
+from voice_bridge.services.capacity import call_capacity
+from voice_bridge.services.metrics import Gauge, registry
+from voice_bridge.services.startup import startup
+from voice_bridge.services.workers import worker_table
+
+router = APIRouter(tags=["Metrics"])
+
+registry.add(
+    Gauge(
+        "voice_bridge_calls_in_use",
+        "Active calls plus slots reserved by `/twilio/connect`, for autoscaling",
+        lambda: call_capacity.in_use,
+    )
+)
+registry.add(
+    Gauge(
+        "voice_bridge_call_capacity_remaining",
+        "Calls this pod can still take on, -1 without a limit",
+        lambda: -1 if call_capacity.remaining is None else call_capacity.remaining,
+        # Summed over workers, except that -1 stays -1
+        aggregate="sum" if call_capacity.max_calls else "min",
+    )
+)
+registry.add(
+    Gauge(
+        "voice_bridge_agent_sessions_active",
+        "Agent sessions started and not yet ended, including pre-started ones",
+        lambda: len(agent_runtime.active_sessions),
+    )
+)
+registry.add(
+    Gauge(
+        "voice_bridge_prestarted_sessions_pending",
+        "Pre-started sessions waiting for their WebSocket",
+        lambda: session_registry.snapshot()["pending"],
+    )
+)
+registry.add(
+    Gauge(
+        "voice_bridge_mcp_connected",
+        "Whether the shared MCP session is connected, in every worker",
+        lambda: float(mcp_connection.connected),
+        aggregate="min",
+    )
+)
+registry.add(
+    Gauge(
+        "voice_bridge_startup_seconds",
+        "Time from process start until the pod was warmed up and ready, for tuning autoscaling",
+        lambda: startup.ready_seconds or 0.0,
+        aggregate="max",
+    )
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Call, agent and audio metrics in the Prometheus text format, summed over every worker"""
+    peers = list(worker_table.peers("metrics").values())
+    return PlainTextResponse(
+        registry.render(peers), media_type="text/plain; version=0.0.4"
+    )
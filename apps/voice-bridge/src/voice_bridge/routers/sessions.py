@@ -0,0 +1,39 @@
+from fastapi import APIRouter
+
+from adk_agents.agents.banking_agent.agent import mcp_connection
+from adk_agents.runtime.live_messaging import agent_runtime
+from voice_bridge.services.adk_session_service import session_registry
+from voice_bridge.services.capacity import call_capacity
+from voice_bridge.services.greeting_cache import greeting_cache
+from voice_bridge.services.recording import call_recorder
+from voice_bridge.services.transcripts import transcript_sink
+from voice_bridge.services.workers import worker_table
+
+router = APIRouter(prefix="/health", tags=["Health Check"], redirect_slashes=False)
+
+
+def worker_stats() -> dict:
+    return {
+        "capacity": call_capacity.snapshot(),
+        "runtime": agent_runtime.stats(),
+        "live": agent_runtime.resumption_stats.snapshot(),
+        "prestart": session_registry.snapshot(),
+        "greeting": greeting_cache.snapshot(),
+        "transcripts": transcript_sink.snapshot(),
+        "recording": call_recorder.snapshot(),
+        "mcp": mcp_connection.snapshot(),
+    }
+
+
+worker_table.share("sessions", worker_stats)
+
+
+@router.get("/sessions", status_code=200)
+async def session_stats():
+    """Capacity, runtime, live reconnect, pre-start, greeting, transcript, recording and MCP stats"""
+    if not worker_table.enabled:
+        return worker_stats()
+    return {
+        "pod": worker_table.pod_snapshot(),
+        "workers": worker_table.gather("sessions"),
+    }
@@ -1,5 +1,5 @@
 import asyncio
-import base64
+import time
 from typing import Annotated
 
 from fastapi import APIRouter, Form, Request, Response, WebSocket, WebSocketDisconnect
@@ -8,21 +8,32 @@ from fastapi.responses import HTMLResponse
 from twilio.twiml.voice_response import Connect, Stream, VoiceResponse
 
 from adk_agents.runtime.live_messaging import (
-    AgentEvent,
-    agent_to_client_messaging,
+    LeanAgentEvent,
+    agent_to_client_batches,
+    end_agent_session,
     send_pcm_to_agent,
-    start_agent_session,
-    text_to_content,
 )
 
 from voice_bridge.entities.twilio import (
     TwilioStreamCallbackPayload,
     TwilioVoiceWebhookPayload,
 )
-from voice_bridge.utils.audio import (
-    adk_pcm24k_to_twilio_ulaw8k,
-    twilio_ulaw8k_to_adk_pcm16k,
+from voice_bridge.services.adk_session_service import (
+    current_greeting_key,
+    open_agent_session,
+    session_registry,
 )
+from voice_bridge.services.capacity import call_capacity
+from voice_bridge.services.dtmf import DtmfHandler
+from voice_bridge.services.greeting_cache import greeting_cache
+from voice_bridge.services.inbound_audio import InboundAudioGate
+from voice_bridge.services.media_stream import StartFrame, parse_frame
+from voice_bridge.services.metrics import CallTimeline
+from voice_bridge.services.outbound_audio import OutboundAudioWriter
+from voice_bridge.services.recording import call_recorder
+from voice_bridge.services.transcoding import transcoding_executor
+from voice_bridge.services.transcripts import transcript_sink
+from voice_bridge.services.workers import worker_table
 from voice_bridge.utils.env import is_local
 from voice_bridge.utils.logging import logger
 from voice_bridge.utils.security import validate_twilio
@@ -35,13 +46,28 @@ router = APIRouter(prefix=twilio_path, tags=["Twilio Webhooks"])
 
 
 @router.post("/connect", dependencies=[Depends(validate_twilio)])
-def create_call(req: Request, payload: Annotated[TwilioVoiceWebhookPayload, Form()]):
+async def create_call(
+    req: Request, payload: Annotated[TwilioVoiceWebhookPayload, Form()]
+):
     """Generate TwiML to connect a call to a Twilio Media Stream"""
 
+    if not call_capacity.reserve(payload.CallSid):
+        response = call_capacity.overflow_response()
+        logger.warning(
+            f"Turning away call {payload.CallSid}: {call_capacity.snapshot()}"
+        )
+        return HTMLResponse(content=str(response), media_type="application/xml")
+
+    # Connect to the model while Twilio is still setting up the media stream
+    await session_registry.prestart(payload.CallSid, payload.From)
+
     host = req.url.hostname
     ws_protocol = "ws" if is_local else "wss"
     http_protocol = "http" if is_local else "https"
     ws_url = f"{ws_protocol}://{host}{twilio_path}{stream_path}"
+    if worker_table.enabled:
+        # The supervisor sends the stream to this worker, which holds the call's slot and session
+        ws_url += f"/{worker_table.worker_id}"
     callback_url = f"{http_protocol}://{host}{twilio_path}{callback_path}"
 
     stream = Stream(url=ws_url, statusCallback=callback_url)
@@ -72,90 +98,170 @@ def twilio_callback(payload: Annotated[TwilioStreamCallbackPayload, Form()]):
 
 
 @router.websocket(stream_path)
+@router.websocket(stream_path + "/{worker}")
 async def twilio_websocket(ws: WebSocket):
     """Handle Twilio Media Stream WebSocket connection"""
 
     await ws.accept()
-    await ws.receive_json()  # throw away `connected` event
-
-    start_event = await ws.receive_json()
-    assert start_event["event"] == "start"
-
-    # account_sid = start_event["start"]["accountSid"]
-    call_sid = start_event["start"]["callSid"]
-    # encoding = start_event["start"]["mediaFormat"]["encoding"]
-    # sample_rate = start_event["start"]["mediaFormat"]["sampleRate"]
-    # channels = start_event["start"]["mediaFormat"]["channels"]
-    from_phone = start_event["start"]["customParameters"]["from_phone"]
-    # to_phone = start_event["start"]["customParameters"]["to_phone"]
-    stream_sid = start_event["streamSid"]
-
-    live_events, live_request_queue = await start_agent_session(from_phone, call_sid)
+    accepted_at = time.monotonic()
+    await ws.receive_text()  # throw away `connected` event
 
-    initial_message = text_to_content(
-        "You're a customer service chatbot. Introduce yourself.", "user"
-    )
-    live_request_queue.send_content(initial_message)
-
-    async def handle_agent_event(event: AgentEvent):
-        """Handle outgoing AgentEvent to Twilio WebSocket"""
+    message = await ws.receive_text()
+    try:
+        start_event = parse_frame(message)
+    except (ValueError, KeyError, TypeError):
+        start_event = None
+    if (
+        not isinstance(start_event, StartFrame)
+        or "from_phone" not in start_event.custom_parameters
+    ):
+        # A reservation and pre-started session for the call expire on their own
+        logger.error(f"Expected a Media Stream start event, got: {message[:200]}")
+        await ws.close(code=1008)
+        return
+
+    call_sid = start_event.call_sid
+    from_phone = start_event.custom_parameters["from_phone"]
+    # to_phone = start_event.custom_parameters["to_phone"]
+    stream_sid = start_event.stream_sid
+    timeline = CallTimeline(call_sid, accepted_at)
+    timeline.mark("start")
+    call_capacity.acquire(call_sid)
+    recording = prestarted = live_request_queue = codec = dtmf = None
+    try:
+        recording = call_recorder.open(call_sid)
+        prestarted = session_registry.claim(call_sid)
+        if prestarted:
+            live_events = prestarted.events()
+            live_request_queue = prestarted.live_request_queue
+            greeting = prestarted.greeting
+        else:
+            live_events, live_request_queue, greeting = await open_agent_session(
+                call_sid, from_phone
+            )
+        timeline.mark("session_ready")
+        codec = transcoding_executor.open_call(call_sid)
+        inbound_gate = InboundAudioGate()
+        dtmf = DtmfHandler(call_sid, from_phone, live_request_queue)
+        outbound = OutboundAudioWriter(stream_sid, codec, ws.send_text)
+        if recording:
+            outbound.on_sent = recording.on_outbound
+            outbound.on_clear = recording.on_clear
+
+        # Record the agent's first turn on a cache miss, play the recording on a hit
+        greeting_recorder = (
+            None if greeting else greeting_cache.recorder(current_greeting_key())
+        )
+        if greeting_recorder:
+            outbound.tap = greeting_recorder.on_audio
+        playing_cached_greeting = greeting is not None
+    except BaseException:
+        # The call never got going; give back everything taken so far
+        if prestarted:
+            await prestarted.close()
+        elif live_request_queue:
+            live_request_queue.close()
+            await end_agent_session(from_phone, call_sid)
+        if dtmf:
+            await dtmf.close()
+        if codec:
+            await codec.close()
+        call_recorder.finish(recording)
+        call_capacity.release(call_sid)
+        timeline.close()
+        raise
+
+    def stop_recording_greeting():
+        nonlocal greeting_recorder
+        outbound.tap = None
+        greeting_recorder = None
+
+    async def handle_agent_event(event: LeanAgentEvent):
+        """Handle outgoing LeanAgentEvent to Twilio WebSocket"""
+        nonlocal playing_cached_greeting
 
         if event.type == "complete":
             logger.info(f"Agent turn complete at {event.timestamp}")
-            # https://www.twilio.com/docs/voice/media-streams/websocket-messages#mark-message
+            timeline.on_turn_end()
+            transcript_sink.end_turn(call_sid)
+            outbound.end_turn()
+            if greeting_recorder:
+                greeting_recorder.finish()
+                stop_recording_greeting()
             return
 
         if event.type == "interrupted":
-            logger.info(f"Agent interrupted at {event.timestamp}")
-            # https://www.twilio.com/docs/voice/media-streams/websocket-messages#send-a-clear-message
-            return await ws.send_json({"event": "clear", "streamSid": stream_sid})
-
-        ulaw_bytes = adk_pcm24k_to_twilio_ulaw8k(event.payload)
-        payload = base64.b64encode(ulaw_bytes).decode("ascii")
-
-        await ws.send_json(
-            {
-                "event": "media",
-                "streamSid": stream_sid,
-                "media": {"payload": payload},
-            }
-        )
+            logger.info(
+                f"Agent interrupted at {event.timestamp}, dropping {outbound.queued_ms}ms queued audio"
+            )
+            timeline.on_turn_end(interrupted=True)
+            if greeting_recorder:
+                greeting_recorder.discard("interrupted")
+                stop_recording_greeting()
+            return await outbound.interrupt()
+
+        if event.type == "transcript":
+            transcript_sink.record(call_sid, event.role, event.text)
+            if greeting_recorder and event.role == "model":
+                greeting_recorder.on_transcript(event.text)
+            return
+
+        if playing_cached_greeting:
+            # The agent only speaks after the caller did, so they talked over the greeting
+            playing_cached_greeting = False
+            if outbound.queued_ms:
+                logger.info(
+                    f"Caller spoke over the greeting, dropping {outbound.queued_ms}ms"
+                )
+                await outbound.interrupt()
+
+        timeline.on_agent_audio()
+        # All audio parts of one agent event are transcoded together
+        chunks = event.chunks
+        await outbound.put(chunks[0] if len(chunks) == 1 else b"".join(chunks))
 
     async def websocket_loop():
         """
         Handle incoming WebSocket messages to Agent.
         """
         while True:
-            event = await ws.receive_json()
-            event_type = event["event"]
-
-            if event_type == "stop":
+            frame = parse_frame(await ws.receive_text())
+            frame_type = frame.type
+
+            if frame_type == "media":
+                if recording:
+                    recording.on_inbound(frame.payload, frame.timestamp)
+                pcm_bytes = await codec.twilio_to_adk(frame.payload)
+                for packet in inbound_gate.push(pcm_bytes):
+                    send_pcm_to_agent(packet, live_request_queue)
+                if inbound_gate.speaking:
+                    timeline.on_caller_speech()
+
+            elif frame_type == "mark":
+                outbound.on_mark(frame.name)
+
+            elif frame_type == "dtmf":
+                logger.debug(f"DTMF: {frame.digit}")
+                dtmf.on_digit(frame.digit)
+
+            elif frame_type == "stop":
                 logger.debug(f"Call ended by Twilio. Stream SID: {stream_sid}")
+                for packet in inbound_gate.flush():
+                    send_pcm_to_agent(packet, live_request_queue)
                 break
 
-            if event_type == "start" or event_type == "connected":
-                logger.warning(f"Unexpected Twilio Initialization event: {event}")
-                continue
-
-            elif event_type == "dtmf":
-                digit = event["dtmf"]["digit"]
-                logger.info(f"DTMF: {digit}")
-                continue
-
-            elif event_type == "mark":
-                logger.info(f"Twilio sent a Mark Event: {event}")
-                continue
-
-            elif event_type == "media":
-                payload = event["media"]["payload"]
-                mulaw_bytes = base64.b64decode(payload)
-                pcm_bytes = twilio_ulaw8k_to_adk_pcm16k(mulaw_bytes)
-                send_pcm_to_agent(pcm_bytes, live_request_queue)
+            else:
+                logger.warning(f"Unexpected Twilio event: {frame}")
 
     try:
+        outbound.start()
+        if greeting:
+            outbound.put_ulaw(greeting.audio)
+            transcript_sink.record(call_sid, "model", greeting.transcript)
+            timeline.mark("first_audio")
         websocket_coro = websocket_loop()
         websocket_task = asyncio.create_task(websocket_coro)
-        messaging_coro = agent_to_client_messaging(handle_agent_event, live_events)
+        messaging_coro = agent_to_client_batches(handle_agent_event, live_events)
         messaging_task = asyncio.create_task(messaging_coro)
         tasks = [websocket_task, messaging_task]
         done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
@@ -173,7 +279,22 @@ async def twilio_websocket(ws: WebSocket):
     except Exception as ex:
         logger.exception(f"Unexpected Error: {ex}")
     finally:
-        live_request_queue.close()
+        if prestarted:
+            await prestarted.close()
+        else:
+            live_request_queue.close()
+            await end_agent_session(from_phone, call_sid)
+        await dtmf.close()
+        await outbound.close()
+        await codec.close()
+        logger.info(f"Outbound audio for {call_sid}: {outbound.stats}")
+        logger.info(f"Inbound audio for {call_sid}: {inbound_gate.stats}")
+        logger.info(f"DTMF for {call_sid}: {dtmf.stats}")
+        inbound_gate.close()
+        timeline.close()
+        transcript_sink.end_call(call_sid)
+        call_recorder.finish(recording)
+        call_capacity.release(call_sid)
         try:
             await ws.close()
         except Exception as ex:
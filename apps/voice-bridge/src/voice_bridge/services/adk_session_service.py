@@ -0,0 +1,215 @@
+"""
+Starts agent sessions from the `/connect` webhook, before Twilio opens the media WebSocket.
+
+`run_live` only connects to Gemini once its events are iterated, so a pre-started
+session runs a pump task that drives the live run and buffers its events until
+the WebSocket handler claims the session by CallSid. By then the model handshake
+is done and the greeting is usually already generated.
+
+When the greeting is in the `greeting_cache`, the prompt is not sent at all: the
+session starts with the prompt and greeting as history and the call plays the
+cached audio instead.
+
+Sessions that are never claimed (caller hung up, WebSocket went to another pod)
+are closed after `ttl_seconds`.
+"""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+
+from google.adk.agents.live_request_queue import LiveRequestQueue
+
+from adk_agents.runtime.live_messaging import (
+    LiveEvents,
+    agent_runtime,
+    end_agent_session,
+    start_agent_session,
+    text_to_content,
+)
+from voice_bridge.services.greeting_cache import Greeting, greeting_cache, greeting_key
+from voice_bridge.utils.logging import logger
+
+GREETING_PROMPT = "You're a customer service chatbot. Introduce yourself."
+
+
+def send_greeting_prompt(live_request_queue: LiveRequestQueue) -> None:
+    """Asks the agent to introduce itself at the start of a call"""
+    live_request_queue.send_content(text_to_content(GREETING_PROMPT, "user"))
+
+
+def current_greeting_key() -> str | None:
+    """Greeting cache key for the running agent and voice"""
+    return greeting_key(agent_runtime.agent, agent_runtime.run_config, GREETING_PROMPT)
+
+
+async def open_agent_session(
+    call_sid: str, user_id: str
+) -> tuple[LiveEvents, LiveRequestQueue, Greeting | None]:
+    """
+    Starts a call's agent session and its greeting. Returns the cached greeting
+    to play if there is one; otherwise the agent has been prompted to greet.
+    """
+    greeting = greeting_cache.get(current_greeting_key())
+    history = greeting.history(GREETING_PROMPT) if greeting else None
+    live_events, live_request_queue = await start_agent_session(
+        user_id, call_sid, history=history
+    )
+    if greeting is None:
+        send_greeting_prompt(live_request_queue)
+    return live_events, live_request_queue, greeting
+
+
+class PrestartedSession:
+    """A live agent session running ahead of its call's WebSocket"""
+
+    def __init__(
+        self,
+        call_sid: str,
+        user_id: str,
+        live_events: LiveEvents,
+        live_request_queue: LiveRequestQueue,
+        greeting: Greeting | None = None,
+    ):
+        self.call_sid = call_sid
+        self.user_id = user_id
+        self.live_request_queue = live_request_queue
+        self.greeting = greeting
+        self.created_at = time.monotonic()
+        self._live_events = live_events
+        self._buffer: asyncio.Queue = asyncio.Queue()
+        self._pump_task = asyncio.create_task(self._pump())
+
+    async def _pump(self) -> None:
+        try:
+            async for event in self._live_events:
+                self._buffer.put_nowait(event)
+        except BaseException as ex:
+            self._buffer.put_nowait(ex)
+            raise
+        finally:
+            self._buffer.put_nowait(None)
+
+    async def events(self) -> LiveEvents:
+        """Buffered events followed by the rest of the live run"""
+        while True:
+            item = await self._buffer.get()
+            if item is None:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+    @property
+    def buffered_events(self) -> int:
+        return self._buffer.qsize()
+
+    async def close(self) -> None:
+        self.live_request_queue.close()
+        self._pump_task.cancel()
+        await asyncio.gather(self._pump_task, return_exceptions=True)
+        await end_agent_session(self.user_id, self.call_sid)
+
+
+@dataclass(slots=True)
+class SessionRegistryStats:
+    prestarted: int = 0
+    hits: int = 0
+    misses: int = 0
+    expired: int = 0
+    failed: int = 0
+
+
+class SessionRegistry:
+    """
+    Pre-started sessions keyed by CallSid, with a TTL for unclaimed ones.
+
+    Args:
+        ttl_seconds: How long a session waits for its WebSocket before it is closed.
+        enabled: When False, `prestart` is a no-op and every call starts cold.
+    """
+
+    def __init__(self, ttl_seconds: float = 30.0, enabled: bool = True):
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.stats = SessionRegistryStats()
+        self._sessions: dict[str, PrestartedSession] = {}
+        self._reaper: asyncio.Task | None = None
+
+    @classmethod
+    def from_env(cls) -> "SessionRegistry":
+        return cls(
+            ttl_seconds=float(os.getenv("SESSION_PRESTART_TTL_S", 30)),
+            enabled=os.getenv("SESSION_PRESTART", "true").lower()
+            in ("1", "true", "yes"),
+        )
+
+    def start(self) -> None:
+        if self.enabled and self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_forever())
+
+    async def shutdown(self) -> None:
+        if self._reaper:
+            self._reaper.cancel()
+            await asyncio.gather(self._reaper, return_exceptions=True)
+            self._reaper = None
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        await asyncio.gather(*(s.close() for s in sessions), return_exceptions=True)
+
+    async def prestart(self, call_sid: str, user_id: str) -> None:
+        """Starts a session for a call that is about to connect its media stream"""
+        if not self.enabled or not call_sid or call_sid in self._sessions:
+            return
+        try:
+            live_events, live_request_queue, greeting = await open_agent_session(
+                call_sid, user_id
+            )
+        except Exception as ex:
+            self.stats.failed += 1
+            logger.warning(f"Failed to pre-start session for {call_sid}: {ex}")
+            return
+        self._sessions[call_sid] = PrestartedSession(
+            call_sid, user_id, live_events, live_request_queue, greeting
+        )
+        self.stats.prestarted += 1
+
+    def claim(self, call_sid: str) -> PrestartedSession | None:
+        """Hands a pre-started session over to the call's WebSocket, if there is one"""
+        session = self._sessions.pop(call_sid, None)
+        if session is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return session
+
+    def snapshot(self) -> dict[str, float]:
+        total = self.stats.hits + self.stats.misses
+        return {
+            "pending": len(self._sessions),
+            "prestarted": self.stats.prestarted,
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "expired": self.stats.expired,
+            "failed": self.stats.failed,
+            "hit_rate": self.stats.hits / total if total else 0.0,
+        }
+
+    async def _reap_forever(self) -> None:
+        while True:
+            await asyncio.sleep(min(self.ttl_seconds, 5.0))
+            await self.reap()
+
+    async def reap(self) -> None:
+        """Closes sessions whose WebSocket never arrived"""
+        deadline = time.monotonic() - self.ttl_seconds
+        expired = [s for s in self._sessions.values() if s.created_at < deadline]
+        for session in expired:
+            del self._sessions[session.call_sid]
+            self.stats.expired += 1
+            logger.info(f"Closing orphaned pre-started session {session.call_sid}")
+        await asyncio.gather(*(s.close() for s in expired), return_exceptions=True)
+
+
+session_registry = SessionRegistry.from_env()
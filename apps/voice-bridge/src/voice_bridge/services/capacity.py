@@ -0,0 +1,239 @@
+"""
+Per-pod call admission, readiness and draining.
+
+Every call costs a pod a steady share of CPU for transcoding and the agent
+session, so past a certain number of calls they all degrade together.
+`CallCapacity` caps the calls a pod takes on. The `/twilio/connect` webhook
+reserves a slot for the CallSid, and the slot becomes an active call when the
+media WebSocket starts. Once `max_calls` slots are in use, new calls are turned
+away in TwiML: they are redirected to `overflow_url` if there is one, otherwise
+rejected as busy. A media WebSocket is always accepted, because by then Twilio
+has already answered the call. A full pod stays ready, so that Twilio can still
+reach it for the overflow TwiML and for the WebSockets of calls it has reserved;
+`voice_bridge_call_capacity_remaining` shows when it is full.
+
+Reservations whose WebSocket never arrives (it went to another pod, or the
+caller hung up) are released after `reservation_ttl_seconds`.
+
+On SIGTERM the pod drains: `/health/ready` fails so it stops getting new calls,
+new webhooks are turned away, and shutdown waits up to `drain_grace_seconds` for
+the calls in progress to end before the server is stopped.
+
+With several worker processes (see `voice_bridge.supervisor`), each one has its
+own `CallCapacity` with an even share of the pod's `MAX_CALLS`.
+"""
+
+import asyncio
+import os
+import signal
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from twilio.twiml.voice_response import VoiceResponse
+
+from voice_bridge.services.metrics import call_admissions
+from voice_bridge.utils.logging import logger
+
+
+@dataclass(slots=True)
+class CallCapacityStats:
+    webhooks: int = 0
+    admitted: int = 0
+    rejected: int = 0
+    redirected: int = 0
+    expired: int = 0
+
+
+class CallCapacity:
+    """
+    Calls in use on this pod, with a limit and a draining state.
+
+    Args:
+        max_calls: Calls this process takes on at once, 0 for no limit.
+        overflow_url: TwiML URL to redirect calls to when this pod is full or draining.
+        reservation_ttl_seconds: How long a slot reserved by `/connect` waits for its WebSocket.
+        drain_grace_seconds: How long shutdown waits for calls in progress to end.
+        pod_max_calls: Calls the whole pod takes on, when this process is one of its workers.
+    """
+
+    def __init__(
+        self,
+        max_calls: int = 0,
+        overflow_url: str = "",
+        reservation_ttl_seconds: float = 30.0,
+        drain_grace_seconds: float = 300.0,
+        pod_max_calls: int | None = None,
+    ):
+        self.max_calls = max_calls
+        self.pod_max_calls = max_calls if pod_max_calls is None else pod_max_calls
+        self.overflow_url = overflow_url
+        self.reservation_ttl_seconds = reservation_ttl_seconds
+        self.drain_grace_seconds = drain_grace_seconds
+        self.stats = CallCapacityStats()
+        self.draining = False
+        self._reserved: dict[str, float] = {}
+        self._active: set[str] = set()
+        self._previous_sigterm = None
+        # Called after every admission decision and change in calls, e.g. to share the counts
+        self.on_change: Callable[[], None] | None = None
+
+    @classmethod
+    def from_env(cls) -> "CallCapacity":
+        pod_max_calls = int(os.getenv("MAX_CALLS", 0))
+        # Set by the supervisor for each of its worker processes
+        workers = int(os.getenv("VOICE_BRIDGE_WORKERS", 1))
+        worker_id = int(os.getenv("VOICE_BRIDGE_WORKER_ID", 0))
+        max_calls = pod_max_calls // workers + (worker_id < pod_max_calls % workers)
+        if pod_max_calls and not max_calls:
+            logger.warning(
+                f"MAX_CALLS={pod_max_calls} is below {workers} workers, taking 1 call"
+            )
+            max_calls = 1
+        return cls(
+            max_calls=max_calls,
+            pod_max_calls=pod_max_calls,
+            overflow_url=os.getenv("OVERFLOW_TWIML_URL", ""),
+            reservation_ttl_seconds=float(os.getenv("CALL_RESERVATION_TTL_S", 30)),
+            drain_grace_seconds=float(os.getenv("DRAIN_GRACE_S", 300)),
+        )
+
+    @property
+    def in_use(self) -> int:
+        self._expire()
+        return len(self._reserved) + len(self._active)
+
+    @property
+    def remaining(self) -> int | None:
+        """Calls this pod can still take on, None without a limit"""
+        if self.draining:
+            return 0
+        if not self.max_calls:
+            return None
+        return max(self.max_calls - self.in_use, 0)
+
+    @property
+    def full(self) -> bool:
+        """No slot left for a new call, or draining"""
+        return self.remaining == 0
+
+    def reserve(self, call_sid: str) -> bool:
+        """Holds a slot for a call from its `/connect` webhook; False if there is none"""
+        self.stats.webhooks += 1
+        try:
+            return self._reserve(call_sid)
+        finally:
+            self._changed()
+
+    def _reserve(self, call_sid: str) -> bool:
+        if call_sid in self._reserved or call_sid in self._active:
+            return True
+        if self.full:
+            if self.overflow_url:
+                self.stats.redirected += 1
+                call_admissions.inc("redirected")
+            else:
+                self.stats.rejected += 1
+                call_admissions.inc("rejected")
+            return False
+        self._reserved[call_sid] = time.monotonic()
+        self.stats.admitted += 1
+        call_admissions.inc("admitted")
+        return True
+
+    def overflow_response(self) -> VoiceResponse:
+        """TwiML for a call this pod won't take"""
+        response = VoiceResponse()
+        if self.overflow_url:
+            response.redirect(self.overflow_url)
+        else:
+            response.reject(reason="busy")
+        return response
+
+    def acquire(self, call_sid: str) -> None:
+        """Marks a call's media stream as started, with or without a reservation"""
+        self._reserved.pop(call_sid, None)
+        self._active.add(call_sid)
+        self._changed()
+
+    def release(self, call_sid: str) -> None:
+        self._reserved.pop(call_sid, None)
+        self._active.discard(call_sid)
+        self._changed()
+
+    def _changed(self) -> None:
+        if self.on_change:
+            self.on_change()
+
+    def snapshot(self) -> dict[str, float | bool | None]:
+        return {
+            "max_calls": self.max_calls or None,
+            "active": len(self._active),
+            "reserved": len(self._reserved),
+            "remaining": self.remaining,
+            "draining": self.draining,
+            "admitted": self.stats.admitted,
+            "rejected": self.stats.rejected,
+            "redirected": self.stats.redirected,
+            "expired": self.stats.expired,
+        }
+
+    def _expire(self) -> None:
+        deadline = time.monotonic() - self.reservation_ttl_seconds
+        expired = [sid for sid, at in self._reserved.items() if at < deadline]
+        for call_sid in expired:
+            del self._reserved[call_sid]
+            self.stats.expired += 1
+
+    async def drain(self) -> None:
+        """Stops taking calls and waits for the ones in progress to end"""
+        self.draining = True
+        self._changed()
+        deadline = time.monotonic() + self.drain_grace_seconds
+        logger.info(
+            f"Draining {self.in_use} calls, up to {self.drain_grace_seconds:.0f}s"
+        )
+        while self.in_use and time.monotonic() < deadline:
+            await asyncio.sleep(0.5)
+        if self.in_use:
+            logger.warning(
+                f"Drain grace period over, {self.in_use} calls still in progress"
+            )
+        else:
+            logger.info("Drained all calls")
+
+    def install_drain_on_sigterm(self) -> None:
+        """
+        Drains before the server's own SIGTERM handling runs. A second SIGTERM
+        skips the rest of the drain.
+        """
+        loop = asyncio.get_running_loop()
+
+        def on_sigterm(signum, frame):
+            if self.draining:
+                return self._stop_server()
+            self.draining = True
+            loop.call_soon_threadsafe(lambda: asyncio.ensure_future(drain_then_stop()))
+
+        async def drain_then_stop():
+            await self.drain()
+            self._stop_server()
+
+        try:
+            self._previous_sigterm = signal.signal(signal.SIGTERM, on_sigterm)
+        except ValueError:
+            logger.warning("Not in the main thread, calls won't be drained on SIGTERM")
+
+    def uninstall_drain_on_sigterm(self) -> None:
+        if self._previous_sigterm is not None:
+            signal.signal(signal.SIGTERM, self._previous_sigterm)
+            self._previous_sigterm = None
+
+    def _stop_server(self) -> None:
+        # Hand the signal to whoever handled it before, e.g. uvicorn's graceful shutdown
+        if self._previous_sigterm is not None:
+            self.uninstall_drain_on_sigterm()
+            signal.raise_signal(signal.SIGTERM)
+
+
+call_capacity = CallCapacity.from_env()
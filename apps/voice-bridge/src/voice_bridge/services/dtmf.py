@@ -0,0 +1,175 @@
+"""
+Handles caller keypad (DTMF) entry without a model round-trip per digit.
+
+Digits are collected into a sequence that ends on a terminator key (`#` by
+default), after `timeout_ms` without a new digit, or at `max_digits`. Then:
+
+- a sequence configured as a menu entry (e.g. `*1` for the balance) calls its
+  anthos-mcp tool directly with the caller's session handle, and the result is
+  handed to the agent to read out, so the model skips its tool-call turns;
+- any other sequence (an account number, an amount) is sent to the agent as one
+  structured `[keypad]` message instead of being read back digit by digit.
+"""
+
+import asyncio
+import json
+import os
+import re
+from dataclasses import dataclass, field
+
+from google.adk.agents.live_request_queue import LiveRequestQueue
+
+from adk_agents.agents.banking_agent.agent import mcp_connection
+from adk_agents.runtime.live_messaging import agent_runtime, text_to_content
+from voice_bridge.utils.logging import logger
+
+KEYPAD_PREFIX = "[keypad]"
+
+# Tools whose results carry the caller's session handle
+LOGIN_TOOLS = ("login_for_token", "login_and_get_balance")
+SESSION_HANDLE = re.compile(r"^(?:Session handle: )?([\w-]{6,32})(?:\.|$)")
+
+
+def parse_menu(spec: str) -> dict[str, str]:
+    """Parses `DTMF_MENU`, e.g. `*1=get_balance,*2=...`, into sequence -> tool name"""
+    menu = {}
+    for entry in filter(None, (e.strip() for e in spec.split(","))):
+        digits, _, tool = entry.partition("=")
+        if digits and tool:
+            menu[digits.strip()] = tool.strip()
+    return menu
+
+
+@dataclass(slots=True)
+class DtmfConfig:
+    enabled: bool = True
+    terminators: str = "#"
+    timeout_ms: int = 3000
+    max_digits: int = 20
+    menu: dict[str, str] = field(default_factory=lambda: {"*1": "get_balance"})
+
+    @classmethod
+    def from_env(cls) -> "DtmfConfig":
+        return cls(
+            enabled=os.getenv("DTMF", "true").lower() in ("1", "true", "yes"),
+            terminators=os.getenv("DTMF_TERMINATORS", "#"),
+            timeout_ms=int(os.getenv("DTMF_TIMEOUT_MS", 3000)),
+            max_digits=int(os.getenv("DTMF_MAX_DIGITS", 20)),
+            menu=parse_menu(os.getenv("DTMF_MENU", "*1=get_balance")),
+        )
+
+
+dtmf_config = DtmfConfig.from_env()
+
+
+@dataclass(slots=True)
+class DtmfStats:
+    digits: int = 0
+    sequences: int = 0
+    menu_calls: int = 0
+    menu_failures: int = 0
+
+
+async def latest_session_handle(user_id: str, session_id: str) -> str | None:
+    """The banking session handle from the call's most recent login tool result"""
+    session = await agent_runtime.session_service.get_session(
+        app_name=agent_runtime.app_name, user_id=user_id, session_id=session_id
+    )
+    for event in reversed(session.events if session else []):
+        for response in event.get_function_responses():
+            if response.name not in LOGIN_TOOLS:
+                continue
+            for content in (response.response or {}).get("content", []):
+                match = SESSION_HANDLE.match(content.get("text", ""))
+                if match:
+                    return match.group(1)
+    return None
+
+
+class DtmfHandler:
+    """
+    Per-call keypad sequence collector.
+
+    Args:
+        call_sid: Twilio CallSid, which is also the agent session id.
+        user_id: Agent session user id (the caller's phone number).
+        live_request_queue: Where keypad messages for the agent are sent.
+    """
+
+    def __init__(
+        self,
+        call_sid: str,
+        user_id: str,
+        live_request_queue: LiveRequestQueue,
+        config: DtmfConfig | None = None,
+    ):
+        self.call_sid = call_sid
+        self.user_id = user_id
+        self.live_request_queue = live_request_queue
+        self.config = config or dtmf_config
+        self.stats = DtmfStats()
+        self._digits: list[str] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    def on_digit(self, digit: str) -> None:
+        """Handles one Twilio `dtmf` event"""
+        if not self.config.enabled:
+            return
+        self.stats.digits += 1
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        if digit in self.config.terminators:
+            return self._finish(ended_by=digit)
+        self._digits.append(digit)
+        if len(self._digits) >= self.config.max_digits:
+            return self._finish(ended_by="max_digits")
+        self._timer = asyncio.get_running_loop().call_later(
+            self.config.timeout_ms / 1000, self._finish, "timeout"
+        )
+
+    async def close(self) -> None:
+        if self._timer:
+            self._timer.cancel()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _finish(self, ended_by: str) -> None:
+        self._timer = None
+        digits = "".join(self._digits)
+        self._digits.clear()
+        if not digits:
+            return
+        self.stats.sequences += 1
+        task = asyncio.create_task(self._handle(digits, ended_by))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _handle(self, digits: str, ended_by: str) -> None:
+        logger.info(f"DTMF sequence {digits!r} ({ended_by}) on {self.call_sid}")
+        message: dict[str, str] = {"digits": digits, "ended_by": ended_by}
+        tool = self.config.menu.get(digits)
+        if tool:
+            message["menu"] = tool
+            message["result"] = await self._run_menu(tool)
+        self._send(message)
+
+    async def _run_menu(self, tool: str) -> str:
+        self.stats.menu_calls += 1
+        try:
+            handle = await latest_session_handle(self.user_id, self.call_sid)
+            if handle is None:
+                return "The caller is not logged in yet."
+            result = await mcp_connection.call_tool(tool, {"session_handle": handle})
+            return " ".join(c.text for c in result.content if getattr(c, "text", None))
+        except Exception as ex:
+            self.stats.menu_failures += 1
+            logger.warning(f"DTMF menu {tool} failed on {self.call_sid}: {ex!r}")
+            return f"{tool} is unavailable right now."
+
+    def _send(self, message: dict[str, str]) -> None:
+        text = f"{KEYPAD_PREFIX} {json.dumps(message)}"
+        self.live_request_queue.send_content(text_to_content(text, "user"))
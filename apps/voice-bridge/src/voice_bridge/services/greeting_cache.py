@@ -0,0 +1,239 @@
+"""
+Caches the agent's spoken greeting as ready-to-send μ-law audio.
+
+Every call opens with the same greeting prompt, so the caller would otherwise hear
+silence for a full model round-trip before the intro starts. The first call for a
+given agent and voice records the intro (20ms μ-law frames plus its transcript)
+and stores it in memory and under `directory`. Later calls play the recording
+straight to Twilio while the live session is still connecting, and start the
+session with the prompt and the greeting transcript as history, so the model
+knows it has already introduced itself and waits for the caller.
+
+Entries are keyed by a hash of everything that shapes the greeting (agent name,
+model, instruction, voice, language and prompt), so changing any of them starts
+a fresh recording instead of replaying a stale one.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from google.adk.agents import LlmAgent
+from google.adk.agents.run_config import RunConfig
+from google.genai.types import Content
+
+from adk_agents.runtime.live_messaging import text_to_content
+from voice_bridge.utils.audio import TWILIO_FRAME_BYTES, TWILIO_SAMPLE_RATE
+from voice_bridge.utils.logging import logger
+
+# Bump when the stored audio format changes
+FORMAT_VERSION = 1
+
+
+def greeting_key(agent: LlmAgent, run_config: RunConfig, prompt: str) -> str | None:
+    """Cache key for an agent's greeting, or None if it can't be cached"""
+    if not isinstance(agent.instruction, str):
+        return None  # Instruction providers can change per call
+    model = (
+        agent.model
+        if isinstance(agent.model, str)
+        else getattr(agent.model, "model", "")
+    )
+    voice = language = None
+    if run_config.speech_config:
+        language = run_config.speech_config.language_code
+        voice_config = run_config.speech_config.voice_config
+        if voice_config and voice_config.prebuilt_voice_config:
+            voice = voice_config.prebuilt_voice_config.voice_name
+    fields = [
+        FORMAT_VERSION,
+        agent.name,
+        model,
+        agent.instruction,
+        voice,
+        language,
+        prompt,
+    ]
+    return hashlib.sha256(json.dumps(fields).encode()).hexdigest()[:16]
+
+
+@dataclass(slots=True)
+class Greeting:
+    audio: bytes  # 8kHz μ-law, whole 20ms frames
+    transcript: str
+
+    @property
+    def duration_ms(self) -> int:
+        return len(self.audio) * 1000 // TWILIO_SAMPLE_RATE
+
+    def history(self, prompt: str) -> list[Content]:
+        """The prompt and the greeting, as if the model had just spoken it"""
+        return [
+            text_to_content(prompt, "user"),
+            text_to_content(self.transcript, "model"),
+        ]
+
+
+@dataclass(slots=True)
+class GreetingCacheStats:
+    hits: int = 0
+    misses: int = 0
+    recorded: int = 0
+    discarded: int = 0
+
+
+class GreetingRecorder:
+    """Collects the agent's first turn of a call as a greeting for the cache"""
+
+    def __init__(self, cache: "GreetingCache", key: str):
+        self._cache = cache
+        self._key = key
+        self._audio = bytearray()
+        self._transcript: list[str] = []
+        self._done = False
+
+    def on_audio(self, ulaw: bytes) -> None:
+        if self._done:
+            return
+        self._audio += ulaw
+        if len(self._audio) > self._cache.max_seconds * TWILIO_SAMPLE_RATE:
+            self.discard("greeting too long")
+
+    def on_transcript(self, text: str) -> None:
+        if not self._done:
+            self._transcript.append(text)
+
+    def finish(self) -> None:
+        """Stores the greeting once the agent's turn has completed"""
+        if self._done:
+            return
+        transcript = " ".join(t.strip() for t in self._transcript if t.strip())
+        # Without a transcript the history would not show the greeting, and the
+        # model would greet the caller a second time
+        if not self._audio or not transcript:
+            return self.discard("no audio or transcript")
+        self._done = True
+        self._cache.put(self._key, Greeting(bytes(self._audio), transcript))
+
+    def discard(self, reason: str) -> None:
+        if self._done:
+            return
+        self._done = True
+        self._cache.stats.discarded += 1
+        logger.info(f"Not caching greeting {self._key}: {reason}")
+
+
+class GreetingCache:
+    """
+    In-memory greeting cache backed by files in `directory`.
+
+    Args:
+        directory: Where `<key>.ulaw` and `<key>.json` files are kept; None for memory only.
+        enabled: When False, nothing is recorded or played.
+        max_seconds: Longer first turns are not cached.
+    """
+
+    def __init__(
+        self,
+        directory: Path | None = None,
+        enabled: bool = True,
+        max_seconds: float = 20.0,
+    ):
+        self.directory = directory
+        self.enabled = enabled
+        self.max_seconds = max_seconds
+        self.stats = GreetingCacheStats()
+        self._greetings: dict[str, Greeting] = {}
+
+    @classmethod
+    def from_env(cls) -> "GreetingCache":
+        directory = os.getenv("GREETING_CACHE_DIR") or os.path.join(
+            tempfile.gettempdir(), "voice-bridge-greetings"
+        )
+        return cls(
+            directory=Path(directory),
+            enabled=os.getenv("GREETING_CACHE", "true").lower() in ("1", "true", "yes"),
+            max_seconds=float(os.getenv("GREETING_CACHE_MAX_SECONDS", 20)),
+        )
+
+    def get(self, key: str | None) -> Greeting | None:
+        if not self.enabled or key is None:
+            return None
+        greeting = self._greetings.get(key)
+        if greeting is None:
+            greeting = self._load(key)
+            if greeting is not None:
+                self._greetings[key] = greeting
+        if greeting is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return greeting
+
+    def recorder(self, key: str | None) -> GreetingRecorder | None:
+        """A recorder for a call that missed the cache, if the greeting can be cached"""
+        if not self.enabled or key is None:
+            return None
+        return GreetingRecorder(self, key)
+
+    def put(self, key: str, greeting: Greeting) -> None:
+        self._greetings[key] = greeting
+        self.stats.recorded += 1
+        logger.info(
+            f"Cached {greeting.duration_ms}ms greeting {key}: {greeting.transcript!r}"
+        )
+        try:
+            self._save(key, greeting)
+        except OSError as ex:
+            logger.warning(f"Failed to save greeting {key}: {ex}")
+
+    def snapshot(self) -> dict[str, float]:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._greetings),
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "recorded": self.stats.recorded,
+            "discarded": self.stats.discarded,
+        }
+
+    def _load(self, key: str) -> Greeting | None:
+        if self.directory is None:
+            return None
+        try:
+            meta = json.loads((self.directory / f"{key}.json").read_text())
+            audio = (self.directory / f"{key}.ulaw").read_bytes()
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as ex:
+            logger.warning(f"Ignoring unreadable greeting {key}: {ex}")
+            return None
+        if len(audio) != meta.get("bytes") or len(audio) % TWILIO_FRAME_BYTES:
+            logger.warning(f"Ignoring truncated greeting {key}")
+            return None
+        return Greeting(audio, meta["transcript"])
+
+    def _save(self, key: str, greeting: Greeting) -> None:
+        if self.directory is None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "transcript": greeting.transcript,
+            "bytes": len(greeting.audio),
+            "created_at": time.time(),
+        }
+        # Audio first, metadata last: a reader only trusts entries with both
+        for name, data in (
+            (f"{key}.ulaw", greeting.audio),
+            (f"{key}.json", json.dumps(meta).encode()),
+        ):
+            tmp = self.directory / f".{name}.{os.getpid()}.tmp"
+            tmp.write_bytes(data)
+            os.replace(tmp, self.directory / name)
+
+
+greeting_cache = GreetingCache.from_env()
@@ -0,0 +1,179 @@
+"""
+Coalesces inbound caller audio into larger packets and thins out line silence
+before it is sent to the agent.
+
+Twilio sends 20ms frames, so sending each one costs ~50 realtime messages per
+second per call, most of them silence. `InboundAudioGate` buffers PCM up to
+`packet_ms` and runs a cheap energy / zero-crossing VAD on each packet:
+
+- speech packets are always sent, preceded by `preroll_ms` of buffered audio so
+  the model's `prefix_padding_ms` still sees the onset;
+- after speech, silence keeps flowing for `hangover_ms` so the model's automatic
+  activity detection (`silence_duration_ms`) can detect the end of the turn;
+- during long silences only one comfort packet is sent every `comfort_interval_ms`.
+
+With `vad` off every packet is sent, but the VAD still runs so that `speaking`
+can mark the end of caller speech for the response latency metric.
+"""
+
+import os
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+
+from voice_bridge.services.metrics import inbound_bytes, inbound_packets
+from voice_bridge.utils.audio import ADK_INPUT_SAMPLE_RATE
+
+BYTES_PER_MS = ADK_INPUT_SAMPLE_RATE * 2 // 1000  # 16-bit PCM @ 16kHz
+
+
+@dataclass(slots=True)
+class InboundAudioStats:
+    frames_in: int = 0
+    packets_sent: int = 0
+    packets_suppressed: int = 0
+    bytes_in: int = 0
+    bytes_sent: int = 0
+
+
+@dataclass(slots=True)
+class InboundAudioConfig:
+    packet_ms: int = 60
+    vad: bool = True
+    speech_dbfs: float = -45.0
+    noise_margin_db: float = 10.0
+    hangover_ms: int = 800
+    preroll_ms: int = 240
+    comfort_interval_ms: int = 500
+
+    @classmethod
+    def from_env(cls) -> "InboundAudioConfig":
+        return cls(
+            packet_ms=int(os.getenv("INBOUND_PACKET_MS", 60)),
+            vad=os.getenv("INBOUND_VAD", "true").lower() in ("1", "true", "yes"),
+            speech_dbfs=float(os.getenv("INBOUND_VAD_SPEECH_DBFS", -45.0)),
+            noise_margin_db=float(os.getenv("INBOUND_VAD_NOISE_MARGIN_DB", 10.0)),
+            hangover_ms=int(os.getenv("INBOUND_VAD_HANGOVER_MS", 800)),
+            preroll_ms=int(os.getenv("INBOUND_VAD_PREROLL_MS", 240)),
+            comfort_interval_ms=int(os.getenv("INBOUND_VAD_COMFORT_MS", 500)),
+        )
+
+
+inbound_audio_config = InboundAudioConfig.from_env()
+
+
+def packet_levels(pcm: np.ndarray) -> tuple[float, float]:
+    """Mean energy in dBFS and zero-crossing rate (crossings per sample) of int16 PCM"""
+    x = pcm.astype(np.float32)
+    energy = float(np.dot(x, x)) / max(len(x), 1) / (32768.0 * 32768.0)
+    dbfs = 10 * np.log10(energy) if energy > 0 else -120.0
+    crossings = np.count_nonzero(np.signbit(x[1:]) != np.signbit(x[:-1]))
+    return float(dbfs), crossings / max(len(x) - 1, 1)
+
+
+class InboundAudioGate:
+    """
+    Per-call coalescing and silence suppression for 16kHz PCM headed to the agent.
+
+    Usage:
+    ```python
+    for packet in gate.push(pcm16):
+        send_pcm_to_agent(packet, live_request_queue)
+    ```
+    """
+
+    def __init__(self, config: InboundAudioConfig | None = None):
+        self.config = config or inbound_audio_config
+        self.stats = InboundAudioStats()
+        self._packet_bytes = max(self.config.packet_ms, 1) * BYTES_PER_MS
+        self._buffer = bytearray()
+        self._preroll: deque[bytes] = deque(
+            maxlen=max(1, self.config.preroll_ms // max(self.config.packet_ms, 1))
+        )
+        self._noise_dbfs = self.config.speech_dbfs - self.config.noise_margin_db
+        self._since_speech_ms = self.config.hangover_ms  # start out "in silence"
+        self._since_sent_ms = 0
+
+    def push(self, pcm: bytes) -> list[bytes]:
+        """Adds a frame and returns the packets (possibly none) to send now"""
+        self.stats.frames_in += 1
+        self.stats.bytes_in += len(pcm)
+        self._buffer += pcm
+        packets: list[bytes] = []
+        while len(self._buffer) >= self._packet_bytes:
+            packet = bytes(self._buffer[: self._packet_bytes])
+            del self._buffer[: self._packet_bytes]
+            packets.extend(self._gate(packet))
+        for packet in packets:
+            self.stats.packets_sent += 1
+            self.stats.bytes_sent += len(packet)
+        return packets
+
+    def flush(self) -> list[bytes]:
+        """Returns any buffered partial packet, for when the stream stops"""
+        if not self._buffer:
+            return []
+        packet = bytes(self._buffer)
+        self._buffer.clear()
+        self.stats.packets_sent += 1
+        self.stats.bytes_sent += len(packet)
+        return [packet]
+
+    def close(self) -> None:
+        """Adds this call's counts to the `/metrics` counters"""
+        inbound_packets.inc("sent", amount=self.stats.packets_sent)
+        inbound_packets.inc("suppressed", amount=self.stats.packets_suppressed)
+        inbound_bytes.inc("received", amount=self.stats.bytes_in)
+        inbound_bytes.inc("sent", amount=self.stats.bytes_sent)
+        self.stats = InboundAudioStats()
+
+    def _gate(self, packet: bytes) -> list[bytes]:
+        config = self.config
+        dbfs, zcr = packet_levels(np.frombuffer(packet, dtype=np.int16))
+        threshold = max(config.speech_dbfs, self._noise_dbfs + config.noise_margin_db)
+        # Voiced speech is loud; unvoiced fricatives are quieter but cross zero often
+        is_speech = dbfs > threshold or (
+            dbfs > threshold - config.noise_margin_db / 2 and zcr > 0.3
+        )
+
+        if not config.vad:
+            # Nothing is held back, but `speaking` still follows the caller
+            if is_speech:
+                self._since_speech_ms = 0
+            else:
+                self._noise_dbfs += 0.05 * (dbfs - self._noise_dbfs)
+                self._since_speech_ms += config.packet_ms
+            return [packet]
+
+        if is_speech:
+            packets = [*self._preroll, packet] if self._in_silence else [packet]
+            self._preroll.clear()
+            self._since_speech_ms = 0
+            self._since_sent_ms = 0
+            return packets
+
+        # Track the line's noise floor on non-speech packets
+        self._noise_dbfs += 0.05 * (dbfs - self._noise_dbfs)
+        self._since_speech_ms += config.packet_ms
+        self._since_sent_ms += config.packet_ms
+
+        if not self._in_silence or self._since_sent_ms >= config.comfort_interval_ms:
+            self.stats.packets_suppressed += len(self._preroll)
+            self._preroll.clear()
+            self._since_sent_ms = 0
+            return [packet]
+
+        if len(self._preroll) == self._preroll.maxlen:
+            self.stats.packets_suppressed += 1
+        self._preroll.append(packet)
+        return []
+
+    @property
+    def speaking(self) -> bool:
+        """Whether the last packet pushed was speech, also with `vad` off"""
+        return self._since_speech_ms == 0
+
+    @property
+    def _in_silence(self) -> bool:
+        return self._since_speech_ms >= self.config.hangover_ms
@@ -0,0 +1,156 @@
+"""
+Twilio Media Streams message codec.
+
+Nearly every message on a call's WebSocket is a 20ms `media` frame, in and out.
+Parsing each one into nested dicts and building each reply as a dict for
+`send_json` costs more than the audio itself. `parse_frame` instead slices the
+base64 payload straight out of inbound `media` text and only falls back to a full
+JSON parse for the rare other events. `MediaStreamEncoder` formats outbound
+`media`, `mark` and `clear` messages from templates prepared once per stream.
+
+Messages: https://www.twilio.com/docs/voice/media-streams/websocket-messages
+"""
+
+import binascii
+import json
+from dataclasses import dataclass, field
+from typing import Any
+
+# Twilio sends `event` first, and `payload` contains no escapes
+_MEDIA_PREFIX = '{"event":"media"'
+_PAYLOAD_KEY = '"payload":"'
+_TIMESTAMP_KEY = '"timestamp":"'
+
+
+@dataclass(slots=True)
+class MediaFrame:
+    payload: bytes  # μ-law @ 8kHz
+    timestamp: int = 0  # ms since the stream started
+    type = "media"
+
+
+@dataclass(slots=True)
+class MarkFrame:
+    name: str
+    type = "mark"
+
+
+@dataclass(slots=True)
+class DtmfFrame:
+    digit: str
+    type = "dtmf"
+
+
+@dataclass(slots=True)
+class StartFrame:
+    call_sid: str
+    stream_sid: str
+    custom_parameters: dict[str, str] = field(default_factory=dict)
+    type = "start"
+
+
+@dataclass(slots=True)
+class StopFrame:
+    type = "stop"
+
+
+@dataclass(slots=True)
+class OtherFrame:
+    """`connected` and any event this codec doesn't model"""
+
+    event: str
+    message: dict[str, Any]
+
+    @property
+    def type(self) -> str:
+        return self.event
+
+
+TwilioFrame = MediaFrame | MarkFrame | DtmfFrame | StartFrame | StopFrame | OtherFrame
+
+
+def parse_frame(text: str) -> TwilioFrame:
+    """
+    Parses one Twilio WebSocket text message.
+
+    A `media` payload is decoded into a new 160-byte `bytes` rather than a reused
+    per-call buffer: `binascii` can't decode into an existing buffer, and decoding
+    and then copying into one costs more than the small allocation it saves.
+    """
+    if text.startswith(_MEDIA_PREFIX):
+        start = text.find(_PAYLOAD_KEY)
+        if start != -1:
+            start += len(_PAYLOAD_KEY)
+            end = text.find('"', start)
+            if end != -1 and text.find("\\", start, end) == -1:
+                return MediaFrame(
+                    binascii.a2b_base64(text[start:end]), _timestamp(text)
+                )
+    return parse_message(json.loads(text))
+
+
+def _timestamp(text: str) -> int:
+    start = text.find(_TIMESTAMP_KEY)
+    if start == -1:
+        return 0
+    start += len(_TIMESTAMP_KEY)
+    end = text.find('"', start)
+    try:
+        return int(text[start:end])
+    except ValueError:
+        return 0
+
+
+def parse_message(message: dict[str, Any]) -> TwilioFrame:
+    """Typed frame for an already-decoded Twilio message"""
+    event = message.get("event", "")
+    if event == "media":
+        media = message["media"]
+        return MediaFrame(
+            binascii.a2b_base64(media["payload"]), int(media.get("timestamp", 0))
+        )
+    if event == "mark":
+        return MarkFrame(message["mark"]["name"])
+    if event == "dtmf":
+        return DtmfFrame(message["dtmf"]["digit"])
+    if event == "stop":
+        return StopFrame()
+    if event == "start":
+        start = message["start"]
+        return StartFrame(
+            call_sid=start["callSid"],
+            stream_sid=message.get("streamSid") or start.get("streamSid", ""),
+            custom_parameters=start.get("customParameters") or {},
+        )
+    return OtherFrame(event, message)
+
+
+class MediaStreamEncoder:
+    """
+    Outbound messages for one Media Stream, formatted from per-stream templates.
+
+    Args:
+        stream_sid: Twilio Media Stream SID.
+    """
+
+    def __init__(self, stream_sid: str):
+        self.stream_sid = stream_sid
+        sid = json.dumps(stream_sid)
+        self._media_prefix = (
+            f'{{"event":"media","streamSid":{sid},"media":{{"payload":"'
+        )
+        self._mark_prefix = f'{{"event":"mark","streamSid":{sid},"mark":{{"name":'
+        self._clear = f'{{"event":"clear","streamSid":{sid}}}'
+
+    def media(self, ulaw: bytes) -> str:
+        return (
+            self._media_prefix
+            + binascii.b2a_base64(ulaw, newline=False).decode("ascii")
+            + '"}}'
+        )
+
+    def mark(self, name: str) -> str:
+        return self._mark_prefix + json.dumps(name) + "}}"
+
+    def clear(self) -> str:
+        return self._clear
@@ -0,0 +1,339 @@
+"""
+In-process call metrics, served in the Prometheus text format on `/metrics`.
+
+Recording is a dict lookup and a few integer increments (histograms keep fixed
+bucket counts, not samples), so it is cheap enough for per-frame paths; all
+formatting happens when `/metrics` is scraped. With several worker processes,
+each one `export`s its metrics and the worker serving `/metrics` renders them
+merged: counters and histograms are summed, gauges combined by their `aggregate`.
+
+`CallTimeline` follows one call: time from WebSocket accept to the `start`
+event, a ready agent session and the first agent audio, and for every turn the
+time from the end of the caller's speech to the first byte of the agent's reply.
+With `CALL_SUMMARY_LOG` on, each call's timeline is logged as one JSON line when
+it ends.
+"""
+
+import json
+import os
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Literal, Sequence, TypeVar
+
+from voice_bridge.utils.logging import logger
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 3, 5, 10)
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+QUEUE_MS_BUCKETS = (0, 20, 60, 100, 200, 500, 1000, 2000, 5000, 10_000)
+DURATION_BUCKETS = (5, 15, 30, 60, 120, 300, 600, 1200, 3600)
+
+Labels = tuple[str, ...]
+
+
+def _format_labels(names: tuple[str, ...], values: Labels, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def export(self) -> dict[str, Any]:
+        return {
+            "values": [[list(labels), value] for labels, value in self._values.items()]
+        }
+
+    def render(self, peers: Sequence[dict[str, Any]] = ()) -> list[str]:
+        values = dict(self._values)
+        for peer in peers:
+            for labels, value in peer["values"]:
+                values[tuple(labels)] = values.get(tuple(labels), 0.0) + value
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in values.items():
+            lines.append(f"{self.name}{_format_labels(self.labels, labels)} {value}")
+        return lines
+
+
+class Gauge:
+    """
+    A gauge set by the caller, or read from `read` at scrape time. `aggregate`
+    combines the values of several worker processes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        read: Callable[[], float] | None = None,
+        aggregate: Literal["sum", "min", "max"] = "sum",
+    ):
+        self.name = name
+        self.help = help
+        self.value = 0.0
+        self.aggregate = aggregate
+        self._read = read
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def export(self) -> dict[str, Any]:
+        return {"value": self._read() if self._read else self.value}
+
+    def render(self, peers: Sequence[dict[str, Any]] = ()) -> list[str]:
+        values = [self.export()["value"], *(peer["value"] for peer in peers)]
+        value = {"sum": sum, "min": min, "max": max}[self.aggregate](values)
+        return [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {value}",
+        ]
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+        labels: tuple[str, ...] = (),
+    ):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.labels = labels
+        # Labels -> [count per bucket (+Inf last), sum]
+        self._series: dict[Labels, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    def export(self) -> dict[str, Any]:
+        return {
+            "series": [
+                [list(labels), counts, total[0]]
+                for labels, (counts, total) in self._series.items()
+            ]
+        }
+
+    def render(self, peers: Sequence[dict[str, Any]] = ()) -> list[str]:
+        series = {labels: (list(c), [t[0]]) for labels, (c, t) in self._series.items()}
+        for peer in peers:
+            for labels, counts, total in peer["series"]:
+                merged = series.setdefault(tuple(labels), ([0] * len(counts), [0.0]))
+                for i, count in enumerate(counts):
+                    merged[0][i] += count
+                merged[1][0] += total
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = _format_labels(self.labels, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            suffix = _format_labels(self.labels, labels)
+            lines.append(f"{self.name}_sum{suffix} {total[0]}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+M = TypeVar("M", Counter, Gauge, Histogram)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: list[Counter | Gauge | Histogram] = []
+
+    def add(self, metric: M) -> M:
+        self._metrics.append(metric)
+        return metric
+
+    def export(self) -> dict[str, dict[str, Any]]:
+        """Every metric's current state, for another worker process to merge"""
+        return {metric.name: metric.export() for metric in self._metrics}
+
+    def render(self, peers: Sequence[dict[str, dict[str, Any]]] = ()) -> str:
+        """The metrics in the Prometheus text format, merged with other workers' `export`s"""
+        lines = []
+        for metric in self._metrics:
+            exports = [peer[metric.name] for peer in peers if metric.name in peer]
+            lines.extend(metric.render(exports))
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+calls_total = registry.add(
+    Counter("voice_bridge_calls_total", "Media Stream calls accepted")
+)
+calls_active = registry.add(Gauge("voice_bridge_calls_active", "Calls in progress"))
+call_admissions = registry.add(
+    Counter(
+        "voice_bridge_call_admissions_total",
+        "`/twilio/connect` webhooks by whether this pod took the call",
+        ("outcome",),
+    )
+)
+call_duration = registry.add(
+    Histogram("voice_bridge_call_duration_seconds", "Call length", DURATION_BUCKETS)
+)
+call_setup = registry.add(
+    Histogram(
+        "voice_bridge_call_setup_seconds",
+        "Time from WebSocket accept to each call milestone",
+        labels=("milestone",),
+    )
+)
+response_latency = registry.add(
+    Histogram(
+        "voice_bridge_response_latency_seconds",
+        "Time from the end of caller speech to the first byte of agent audio",
+    )
+)
+agent_turns = registry.add(
+    Counter(
+        "voice_bridge_agent_turns_total", "Agent turns by how they ended", ("outcome",)
+    )
+)
+tool_calls = registry.add(
+    Histogram(
+        "voice_bridge_tool_call_seconds",
+        "MCP tool call duration",
+        labels=("tool", "outcome"),
+    )
+)
+transcode_seconds = registry.add(
+    Histogram(
+        "voice_bridge_transcode_seconds",
+        "Time to transcode one chunk of audio, including executor queueing",
+        FAST_BUCKETS,
+        ("direction",),
+    )
+)
+outbound_queue = registry.add(
+    Histogram(
+        "voice_bridge_outbound_queue_ms",
+        "Agent audio queued locally for a call, sampled as audio is added",
+        QUEUE_MS_BUCKETS,
+    )
+)
+
+inbound_packets = registry.add(
+    Counter(
+        "voice_bridge_inbound_packets_total",
+        "Caller audio packets by whether the inbound VAD sent them to the agent",
+        ("outcome",),
+    )
+)
+inbound_bytes = registry.add(
+    Counter(
+        "voice_bridge_inbound_bytes_total",
+        "Caller audio bytes received from Twilio and sent on to the agent",
+        ("stage",),
+    )
+)
+
+
+def observe_tool_call(tool: str, seconds: float, ok: bool) -> None:
+    tool_calls.observe(seconds, tool, "ok" if ok else "error")
+
+
+call_summary_log = os.getenv("CALL_SUMMARY_LOG", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+
+class CallTimeline:
+    """
+    Milestones and per-turn response latency for one call, in monotonic time.
+
+    Args:
+        call_sid: Twilio CallSid, for the summary log line.
+        accepted_at: `time.monotonic()` when the WebSocket was accepted, defaults to now.
+    """
+
+    def __init__(self, call_sid: str = "", accepted_at: float | None = None):
+        self.call_sid = call_sid
+        self.accepted_at = time.monotonic() if accepted_at is None else accepted_at
+        self.milestones: dict[str, float] = {}
+        self.response_latencies: list[float] = []
+        self.turns = 0
+        self.interruptions = 0
+        self._speech_at = 0.0
+        self._responding = False
+        self._response_started_at = 0.0
+        calls_total.inc()
+        calls_active.inc()
+
+    def mark(self, milestone: str) -> None:
+        """Records the first time the call reaches `milestone`"""
+        if milestone in self.milestones:
+            return
+        elapsed = time.monotonic() - self.accepted_at
+        self.milestones[milestone] = elapsed
+        call_setup.observe(elapsed, milestone)
+
+    def on_caller_speech(self) -> None:
+        """Called for every caller audio packet classified as speech"""
+        self._speech_at = time.monotonic()
+
+    def on_agent_audio(self) -> None:
+        if self._responding:
+            return
+        now = time.monotonic()
+        self._responding = True
+        self.mark("first_audio")
+        # Only replies to something the caller said, not the greeting
+        if self._speech_at > self._response_started_at:
+            latency = now - self._speech_at
+            self.response_latencies.append(latency)
+            response_latency.observe(latency)
+        self._response_started_at = now
+
+    def on_turn_end(self, interrupted: bool = False) -> None:
+        self._responding = False
+        self.turns += 1
+        if interrupted:
+            self.interruptions += 1
+        agent_turns.inc("interrupted" if interrupted else "complete")
+
+    def summary(self) -> dict:
+        latencies = sorted(self.response_latencies)
+        return {
+            "call_sid": self.call_sid,
+            "duration_s": round(time.monotonic() - self.accepted_at, 3),
+            "milestones_ms": {k: round(v * 1000) for k, v in self.milestones.items()},
+            "turns": self.turns,
+            "interruptions": self.interruptions,
+            "response_p50_ms": round(latencies[len(latencies) // 2] * 1000)
+            if latencies
+            else None,
+            "response_max_ms": round(latencies[-1] * 1000) if latencies else None,
+        }
+
+    def close(self) -> None:
+        calls_active.dec()
+        call_duration.observe(time.monotonic() - self.accepted_at)
+        if call_summary_log:
+            logger.info(f"Call summary {json.dumps(self.summary())}")
@@ -0,0 +1,232 @@
+"""
+Paces agent audio out to Twilio.
+
+Gemini produces speech in bursts much faster than realtime. Sending it as it
+arrives parks seconds of audio in Twilio's buffer, which the caller keeps hearing
+after they interrupt. `OutboundAudioWriter` instead re-chunks agent audio into
+20ms μ-law frames in a bounded local queue and sends them only `lead_ms` ahead
+of realtime, so on barge-in almost everything is still local and can be dropped.
+
+Twilio `mark` messages are sent every `mark_interval_ms` and echoed back when
+the audio before them has played, which tells us what the caller actually heard.
+"""
+
+import asyncio
+import os
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from voice_bridge.services.media_stream import MediaStreamEncoder
+from voice_bridge.services.metrics import outbound_queue
+from voice_bridge.services.transcoding import CallTranscoder
+from voice_bridge.utils.audio import TWILIO_FRAME_BYTES
+from voice_bridge.utils.logging import logger
+
+FRAME_SECONDS = 0.02
+ULAW_SILENCE = b"\xff"
+
+SendText = Callable[[str], Awaitable[None]]
+
+
+@dataclass(slots=True)
+class OutboundAudioConfig:
+    lead_ms: int = 200
+    max_buffer_ms: int = 10_000
+    mark_interval_ms: int = 200
+
+    @classmethod
+    def from_env(cls) -> "OutboundAudioConfig":
+        return cls(
+            lead_ms=int(os.getenv("OUTBOUND_LEAD_MS", 200)),
+            max_buffer_ms=int(os.getenv("OUTBOUND_MAX_BUFFER_MS", 10_000)),
+            mark_interval_ms=int(os.getenv("OUTBOUND_MARK_INTERVAL_MS", 200)),
+        )
+
+
+outbound_audio_config = OutboundAudioConfig.from_env()
+
+
+@dataclass(slots=True)
+class OutboundAudioStats:
+    frames_sent: int = 0
+    frames_played: int = 0
+    frames_dropped: int = 0
+    max_queue_frames: int = 0
+    interruptions: int = 0
+
+
+class OutboundAudioWriter:
+    """
+    Per-call outbound audio queue and paced sender task.
+
+    Args:
+        stream_sid: Twilio Media Stream SID.
+        codec: The call's transcoder, used to turn agent PCM into μ-law.
+        send_text: Sends a text message on the Twilio WebSocket.
+    """
+
+    def __init__(
+        self,
+        stream_sid: str,
+        codec: CallTranscoder,
+        send_text: SendText,
+        config: OutboundAudioConfig | None = None,
+    ):
+        self.stream_sid = stream_sid
+        self.config = config or outbound_audio_config
+        self.stats = OutboundAudioStats()
+        self._codec = codec
+        self._send_text = send_text
+        self._encoder = MediaStreamEncoder(stream_sid)
+        self._max_frames = max(1, self.config.max_buffer_ms // 20)
+        self._lead = self.config.lead_ms / 1000
+        self._mark_every = max(1, self.config.mark_interval_ms // 20)
+        self._frames: deque[bytes] = deque()
+        self._partial = b""
+        self._has_frames = asyncio.Event()
+        self._has_space = asyncio.Event()
+        self._has_space.set()
+        # Loop time at which the audio sent so far finishes playing
+        self._playhead = 0.0
+        # Mark name -> frames sent when the mark was sent
+        self._marks: dict[str, int] = {}
+        self._task: asyncio.Task | None = None
+        # Set once the sender has stopped, after a failed send or `close`; audio put
+        # after that is dropped rather than waiting for space that never frees up
+        self.stopped = False
+        # Called with every μ-law frame as it is queued, e.g. to record a greeting
+        self.tap: Callable[[bytes], None] | None = None
+        # Called with every μ-law frame sent and the loop time it starts playing,
+        # and with the loop time of a `clear`, e.g. to record the call
+        self.on_sent: Callable[[bytes, float], None] | None = None
+        self.on_clear: Callable[[float], None] | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    @property
+    def queued_ms(self) -> int:
+        """Audio waiting locally, not yet sent to Twilio"""
+        return len(self._frames) * 20
+
+    @property
+    def unplayed_ms(self) -> int:
+        """Audio sent to Twilio that it has not confirmed playing yet"""
+        return (self.stats.frames_sent - self.stats.frames_played) * 20
+
+    async def put(self, pcm24: bytes) -> None:
+        """Queues agent PCM (16-bit, 24kHz), waiting while the queue is full"""
+        ulaw = self._partial + await self._codec.adk_to_twilio(pcm24)
+        usable = len(ulaw) - len(ulaw) % TWILIO_FRAME_BYTES
+        self._partial = ulaw[usable:]
+        for i in range(0, usable, TWILIO_FRAME_BYTES):
+            while len(self._frames) >= self._max_frames and not self.stopped:
+                self._has_space.clear()
+                await self._has_space.wait()
+            if self.stopped:
+                self.stats.frames_dropped += (usable - i) // TWILIO_FRAME_BYTES
+                self._partial = b""
+                return
+            self._append(ulaw[i : i + TWILIO_FRAME_BYTES])
+        if usable:
+            self._has_frames.set()
+        outbound_queue.observe(self.queued_ms)
+
+    def put_ulaw(self, ulaw: bytes) -> None:
+        """
+        Queues already-encoded μ-law (whole 20ms frames), such as a cached greeting.
+        Not bounded by `max_buffer_ms`: callers only pass short, known clips.
+        """
+        for i in range(
+            0, len(ulaw) - len(ulaw) % TWILIO_FRAME_BYTES, TWILIO_FRAME_BYTES
+        ):
+            self._append(ulaw[i : i + TWILIO_FRAME_BYTES])
+        self._has_frames.set()
+
+    def end_turn(self) -> None:
+        """Pads and queues the last partial frame of an agent turn"""
+        if not self._partial:
+            return
+        self._append(self._partial.ljust(TWILIO_FRAME_BYTES, ULAW_SILENCE))
+        self._partial = b""
+        self._has_frames.set()
+
+    def _append(self, frame: bytes) -> None:
+        self._frames.append(frame)
+        self.stats.max_queue_frames = max(
+            self.stats.max_queue_frames, len(self._frames)
+        )
+        if self.tap:
+            self.tap(frame)
+
+    async def interrupt(self) -> None:
+        """Drops all queued agent audio and tells Twilio to clear its buffer"""
+        self.stats.interruptions += 1
+        self.stats.frames_dropped += len(self._frames)
+        self._frames.clear()
+        self._partial = b""
+        self._has_space.set()
+        await self._codec.reset_outbound()
+        # https://www.twilio.com/docs/voice/media-streams/websocket-messages#send-a-clear-message
+        await self._send_text(self._encoder.clear())
+        self._playhead = asyncio.get_running_loop().time()
+        if self.on_clear:
+            self.on_clear(self._playhead)
+
+    def on_mark(self, name: str) -> None:
+        """Records a `mark` echoed by Twilio once the audio before it has played (or was cleared)"""
+        frames = self._marks.pop(name, None)
+        if frames is not None:
+            self.stats.frames_played = max(self.stats.frames_played, frames)
+
+    async def _run(self) -> None:
+        try:
+            await self._send_forever()
+        finally:
+            self.stopped = True
+            self._has_space.set()
+
+    async def _send_forever(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._frames:
+                self._has_frames.clear()
+                await self._has_frames.wait()
+                continue
+
+            now = loop.time()
+            if self._playhead < now:  # Twilio ran dry, restart the clock
+                self._playhead = now
+            ahead = self._playhead - now
+            if ahead > self._lead:
+                await asyncio.sleep(ahead - self._lead)
+                continue
+
+            frame = self._frames.popleft()
+            self._has_space.set()
+            try:
+                await self._send_media(frame)
+            except Exception as ex:
+                logger.warning(f"Failed to send audio to Twilio: {ex}")
+                return
+            if self.on_sent:
+                self.on_sent(frame, self._playhead)
+            self._playhead += FRAME_SECONDS
+            self.stats.frames_sent += 1
+            if self.stats.frames_sent % self._mark_every == 0:
+                await self._send_mark()
+
+    async def _send_media(self, frame: bytes) -> None:
+        await self._send_text(self._encoder.media(frame))
+
+    async def _send_mark(self) -> None:
+        # https://www.twilio.com/docs/voice/media-streams/websocket-messages#send-a-mark-message
+        name = str(self.stats.frames_sent)
+        self._marks[name] = self.stats.frames_sent
+        await self._send_text(self._encoder.mark(name))
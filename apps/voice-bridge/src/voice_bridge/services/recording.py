@@ -0,0 +1,329 @@
+"""
+Dual-channel call recordings, written to local disk off the audio path.
+
+Each recorded call gets one preallocated ring buffer of interleaved stereo
+8kHz μ-law: caller on the left channel, agent on the right. The buffer holds
+`buffer_seconds` of audio, so memory per call is fixed however long the call
+runs. Frames are copied straight into their place in the ring; nothing is
+allocated per frame.
+
+Both channels share one timeline, measured in samples from the start of the
+media stream:
+- caller frames are placed by their Twilio media `timestamp`, so gaps stay
+  silent;
+- agent frames are placed at the time they start playing, as worked out from
+  their send times by `OutboundAudioWriter`;
+- a `clear` silences the agent audio that had been sent but not played.
+
+A single background task flushes every call's finished audio (everything older
+than `settle_seconds`) every `flush_seconds`. Each flush is one sequential write
+per call, on a worker thread, into `<CallSid>.wav`. Audio that arrives too late
+for its flushed position, or too far ahead for the ring, is dropped and counted.
+"""
+
+import asyncio
+import os
+import struct
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+from voice_bridge.utils.audio import TWILIO_SAMPLE_RATE
+from voice_bridge.utils.logging import logger
+
+ULAW_SILENCE = 0xFF
+WAVE_FORMAT_MULAW = 7
+# RIFF + fmt (18 byte body) + fact + data chunk headers
+WAV_HEADER_BYTES = 12 + 26 + 12 + 8
+
+
+def wav_header(frames: int) -> bytes:
+    """Header of a stereo 8kHz μ-law WAV file with `frames` sample frames"""
+    data = frames * 2
+    return b"".join(
+        [
+            struct.pack("<4sI4s", b"RIFF", WAV_HEADER_BYTES - 8 + data, b"WAVE"),
+            struct.pack(
+                "<4sIHHIIHHH",
+                b"fmt ",
+                18,
+                WAVE_FORMAT_MULAW,
+                2,
+                TWILIO_SAMPLE_RATE,
+                TWILIO_SAMPLE_RATE * 2,
+                2,
+                8,
+                0,
+            ),
+            struct.pack("<4sII", b"fact", 4, frames),
+            struct.pack("<4sI", b"data", data),
+        ]
+    )
+
+
+@dataclass(slots=True)
+class CallRecordingStats:
+    recordings: int = 0
+    bytes_written: int = 0
+    flushes: int = 0
+    late_frames: int = 0
+    overrun_frames: int = 0
+    write_errors: int = 0
+
+
+class CallRecording:
+    """
+    One call's ring buffer. Positions are sample frames since the stream started.
+
+    Only positions in `[_final, _reset + capacity)` can be written: below
+    `_final` the audio is being or has been written to disk, and above that the
+    ring slots are still holding audio that is being written.
+    """
+
+    def __init__(
+        self,
+        call_sid: str,
+        path: Path,
+        origin: float,
+        buffer_seconds: float,
+        silence: memoryview,
+    ):
+        self.call_sid = call_sid
+        self.path = path
+        self.capacity = int(buffer_seconds * TWILIO_SAMPLE_RATE)
+        self.closing = False
+        self._ring = bytearray(silence[: self.capacity * 2])
+        self._silence = silence
+        self._origin = origin  # Loop time of stream position 0
+        self._final = 0  # Everything before this is on its way to disk
+        self._reset = 0  # Ring slots before this are free for reuse
+        self._end = 0  # Highest position written so far
+        self._file: BinaryIO | None = None
+        self._frames_written = 0
+        self.late_frames = 0
+        self.overrun_frames = 0
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self._ring)
+
+    def on_inbound(self, ulaw: bytes, timestamp_ms: int) -> None:
+        """A caller frame, placed by its Twilio media timestamp"""
+        self._put(timestamp_ms * TWILIO_SAMPLE_RATE // 1000, ulaw, 0)
+
+    def on_outbound(self, ulaw: bytes, play_at: float) -> None:
+        """An agent frame, placed at the loop time it starts playing"""
+        self._put(round((play_at - self._origin) * TWILIO_SAMPLE_RATE), ulaw, 1)
+
+    def on_clear(self, now: float) -> None:
+        """Silences agent audio that was sent but will not be played"""
+        start = max(round((now - self._origin) * TWILIO_SAMPLE_RATE), self._final)
+        end = min(self._end, self._reset + self.capacity)
+        if end > start:
+            self._fill(start, end, 1)
+
+    def _put(self, position: int, frame: bytes, channel: int) -> None:
+        size = len(frame)
+        if position < self._final:
+            self.late_frames += 1
+            return
+        if position + size > self._reset + self.capacity:
+            self.overrun_frames += 1
+            return
+        start = position % self.capacity
+        if start + size <= self.capacity:
+            self._ring[start * 2 + channel : (start + size) * 2 : 2] = frame
+        else:
+            split = self.capacity - start
+            view = memoryview(frame)
+            self._ring[start * 2 + channel :: 2] = view[:split]
+            self._ring[channel : (size - split) * 2 : 2] = view[split:]
+        self._end = max(self._end, position + size)
+
+    def _fill(self, start: int, end: int, channel: int) -> None:
+        for a, b in self._spans(start, end):
+            self._ring[a * 2 + channel : b * 2 : 2] = self._silence[: b - a]
+
+    def _spans(self, start: int, end: int) -> list[tuple[int, int]]:
+        """Ring index ranges for positions `[start, end)`"""
+        a, b = start % self.capacity, (end - 1) % self.capacity + 1
+        return [(a, b)] if a < b else [(a, self.capacity), (0, b)]
+
+    def settle(self, now: float, settle_seconds: float) -> tuple[int, int] | None:
+        """Freezes the audio that is ready to write, returning its positions"""
+        if self.closing:
+            ready = self._end
+        else:
+            ready = min(
+                int((now - self._origin - settle_seconds) * TWILIO_SAMPLE_RATE),
+                self._end,
+            )
+        if ready <= self._final:
+            return None
+        start, self._final = self._final, ready
+        return start, ready
+
+    def write(self, start: int, end: int) -> int:
+        """Appends positions `[start, end)` to the WAV file; runs on a worker thread"""
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "wb")
+            self._file.write(wav_header(0))
+        written = 0
+        for a, b in self._spans(start, end):
+            written += self._file.write(memoryview(self._ring)[a * 2 : b * 2])
+        self._frames_written += end - start
+        return written
+
+    def release(self, start: int, end: int) -> None:
+        """Frees ring slots once their audio is on disk"""
+        for a, b in self._spans(start, end):
+            self._ring[a * 2 : b * 2] = self._silence[: (b - a) * 2]
+        self._reset = end
+
+    def close_file(self) -> None:
+        """Fills in the WAV sizes and closes the file; runs on a worker thread"""
+        if self._file is None:
+            return
+        self._file.seek(0)
+        self._file.write(wav_header(self._frames_written))
+        self._file.close()
+        self._file = None
+
+
+class CallRecorder:
+    """
+    Opt-in recordings of every call in the process, flushed by one background task.
+
+    Args:
+        directory: Where `<CallSid>.wav` files are written.
+        enabled: When False, `open` returns None and nothing is recorded.
+        buffer_seconds: Ring buffer length per call; sets the memory per call.
+        flush_seconds: How often finished audio is written to disk.
+        settle_seconds: How long audio may still arrive for a position before it is written.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        enabled: bool = False,
+        buffer_seconds: float = 10.0,
+        flush_seconds: float = 2.0,
+        settle_seconds: float = 1.0,
+    ):
+        self.directory = directory
+        self.enabled = enabled
+        self.buffer_seconds = max(buffer_seconds, flush_seconds + settle_seconds + 1)
+        self.flush_seconds = flush_seconds
+        self.settle_seconds = settle_seconds
+        self.stats = CallRecordingStats()
+        self._silence = memoryview(
+            bytes([ULAW_SILENCE]) * int(self.buffer_seconds * TWILIO_SAMPLE_RATE * 2)
+        )
+        self._recordings: dict[str, CallRecording] = {}
+        self._writer: asyncio.Task | None = None
+        self._flushing: asyncio.Task | None = None
+
+    @classmethod
+    def from_env(cls) -> "CallRecorder":
+        directory = os.getenv("CALL_RECORDING_DIR") or os.path.join(
+            tempfile.gettempdir(), "voice-bridge-recordings"
+        )
+        return cls(
+            directory=Path(directory),
+            enabled=os.getenv("CALL_RECORDING", "false").lower()
+            in ("1", "true", "yes"),
+            buffer_seconds=float(os.getenv("CALL_RECORDING_BUFFER_S", 10)),
+        )
+
+    def start(self) -> None:
+        if self.enabled and self._writer is None:
+            self._writer = asyncio.create_task(self._flush_forever())
+
+    async def shutdown(self) -> None:
+        """Writes out and closes every recording"""
+        if self._writer:
+            self._writer.cancel()
+            await asyncio.gather(self._writer, return_exceptions=True)
+            self._writer = None
+        if self._flushing:
+            await self._flushing
+        for recording in self._recordings.values():
+            recording.closing = True
+        await self.flush()
+
+    def open(self, call_sid: str) -> CallRecording | None:
+        """Starts recording a call whose media stream starts now"""
+        if not self.enabled:
+            return None
+        path = self.directory / f"{call_sid}-{int(time.time())}.wav"
+        origin = asyncio.get_running_loop().time()
+        recording = CallRecording(
+            call_sid, path, origin, self.buffer_seconds, self._silence
+        )
+        self._recordings[call_sid] = recording
+        self.stats.recordings += 1
+        return recording
+
+    def finish(self, recording: CallRecording | None) -> None:
+        """Ends a call's recording; the rest of it is written by the next flush"""
+        if recording:
+            recording.closing = True
+
+    def snapshot(self) -> dict[str, float]:
+        return {
+            "enabled": self.enabled,
+            "active": len(self._recordings),
+            "memory_bytes": sum(r.memory_bytes for r in self._recordings.values()),
+            "recordings": self.stats.recordings,
+            "bytes_written": self.stats.bytes_written,
+            "flushes": self.stats.flushes,
+            "late_frames": self.stats.late_frames
+            + sum(r.late_frames for r in self._recordings.values()),
+            "overrun_frames": self.stats.overrun_frames
+            + sum(r.overrun_frames for r in self._recordings.values()),
+            "write_errors": self.stats.write_errors,
+        }
+
+    async def _flush_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            # Shielded, so a shutdown mid-write waits for it instead of writing concurrently
+            self._flushing = asyncio.create_task(self.flush())
+            await asyncio.shield(self._flushing)
+
+    async def flush(self) -> None:
+        """Writes every call's settled audio, and closes finished recordings"""
+        now = asyncio.get_running_loop().time()
+        for call_sid, recording in list(self._recordings.items()):
+            span = recording.settle(now, self.settle_seconds)
+            try:
+                if span:
+                    self.stats.bytes_written += await asyncio.to_thread(
+                        recording.write, *span
+                    )
+                    recording.release(*span)
+                if recording.closing:
+                    await asyncio.to_thread(recording.close_file)
+            except OSError as ex:
+                self.stats.write_errors += 1
+                logger.warning(
+                    f"Failed to write recording for {call_sid}, giving up: {ex}"
+                )
+                await asyncio.gather(
+                    asyncio.to_thread(recording.close_file), return_exceptions=True
+                )
+                recording.closing = True
+            else:
+                if recording.closing:
+                    logger.info(f"Recording for {call_sid} saved to {recording.path}")
+            if recording.closing:
+                del self._recordings[call_sid]
+                self.stats.late_frames += recording.late_frames
+                self.stats.overrun_frames += recording.overrun_frames
+        self.stats.flushes += 1
+
+
+call_recorder = CallRecorder.from_env()
@@ -0,0 +1,102 @@
+"""
+Startup timing and the warm-up that gates readiness.
+
+uvicorn only starts listening once the app's lifespan startup returns, so the
+lifespan keeps that short: it starts the light services and hands everything
+calls need (importing google-adk, a dummy transcode, the MCP connection, the
+agent runtime) to a background warm-up. Meanwhile `/health/` answers, and
+`/health/ready` fails until the warm-up is done.
+
+Each warm-up phase is timed, as is `boot`: the time from process start (from
+`/proc` on Linux, otherwise from when this module was imported) to the lifespan
+starting, which covers the interpreter, uvicorn and the app's own imports.
+`ready_seconds` is the time from process start until the pod is ready.
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Coroutine
+
+from voice_bridge.utils.logging import logger
+
+
+def _process_age() -> float | None:
+    """Seconds since this process started, where `/proc` has it"""
+    try:
+        with open("/proc/self/stat") as stat:
+            # The command name may contain spaces, so fields are counted from after it
+            fields = stat.read().rpartition(")")[2].split()
+        with open("/proc/uptime") as uptime:
+            boot_uptime = float(uptime.read().split()[0])
+        return boot_uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+_STARTED_AT = time.monotonic() - (_process_age() or 0.0)
+
+
+class Startup:
+    """Times the process's startup phases and runs the warm-up that gates readiness"""
+
+    def __init__(self):
+        self.phases: dict[str, float] = {}
+        self.ready_seconds: float | None = None
+        self.error: str | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_seconds is not None
+
+    def elapsed(self) -> float:
+        """Seconds since the process started"""
+        return time.monotonic() - _STARTED_AT
+
+    @asynccontextmanager
+    async def phase(self, name: str) -> AsyncIterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+
+    def begin(self, warm_up: Coroutine[None, None, None]) -> None:
+        """Runs `warm_up` in the background; the process is ready once it returns"""
+        self.phases["boot"] = self.elapsed()
+        self._task = asyncio.create_task(self._run(warm_up))
+
+    async def cancel(self) -> None:
+        """Stops a warm-up still in progress, e.g. on shutdown"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def snapshot(self) -> dict[str, object]:
+        return {
+            "ready": self.ready,
+            "ready_seconds": self.ready_seconds,
+            "uptime_seconds": self.elapsed(),
+            "phases": dict(self.phases),
+            "error": self.error,
+        }
+
+    async def _run(self, warm_up: Coroutine[None, None, None]) -> None:
+        try:
+            await warm_up
+        except Exception as ex:
+            # Never ready, so the pod gets no calls and the error shows in /health/startup
+            self.error = repr(ex)
+            logger.exception(f"Startup warm-up failed: {ex}")
+            return
+        self.ready_seconds = self.elapsed()
+        phases = ", ".join(
+            f"{name} {seconds:.3f}s" for name, seconds in self.phases.items()
+        )
+        logger.info(f"Ready {self.ready_seconds:.3f}s after process start ({phases})")
+
+
+startup = Startup()
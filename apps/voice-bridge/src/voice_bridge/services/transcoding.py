@@ -0,0 +1,239 @@
+"""
+Runs per-call audio transcoding off the asyncio event loop.
+
+Modes (`TRANSCODE_EXECUTOR`):
+- `inline`: transcode on the event loop, as before. Lowest latency for a handful of calls.
+- `thread`: NumPy and soxr release the GIL, so worker threads transcode in parallel
+  with WebSocket I/O.
+- `process`: worker processes, for when Python overhead (not NumPy) dominates.
+
+Each call is pinned to one shard (a single-worker executor), so its stateful codec
+is only ever touched by one worker and frames come back in order. While a shard is
+busy, frames from all of its calls queue up and are sent as one batch when it frees
+up: no timers, so an idle pod adds no batching delay.
+
+Usage:
+```python
+call_codec = transcoding_executor.open_call(call_sid)
+pcm16 = await call_codec.twilio_to_adk(mulaw)
+ulaw = await call_codec.adk_to_twilio(pcm24)
+await call_codec.close()
+```
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Literal
+from zlib import crc32
+
+from voice_bridge.services.metrics import transcode_seconds
+from voice_bridge.utils.audio import TWILIO_FRAME_BYTES, CallAudioCodec
+from voice_bridge.utils.logging import logger
+
+TranscodeMode = Literal["inline", "thread", "process"]
+
+# Batch operations
+TO_ADK = 0
+TO_TWILIO = 1
+RESET_OUTBOUND = 2
+RELEASE = 3
+
+# Codecs owned by this worker (thread shards share it, keyed by call id)
+_worker_codecs: dict[str, CallAudioCodec] = {}
+
+
+def transcode_batch(batch: list[tuple[str, int, bytes]]) -> list[bytes]:
+    """Runs a batch of (call_id, op, data) items in order inside a worker"""
+    results = []
+    for call_id, op, data in batch:
+        if op == RELEASE:
+            _worker_codecs.pop(call_id, None)
+            results.append(b"")
+            continue
+        codec = _worker_codecs.get(call_id)
+        if codec is None:
+            codec = _worker_codecs[call_id] = CallAudioCodec()
+        if op == TO_ADK:
+            results.append(codec.twilio_to_adk(data))
+        elif op == TO_TWILIO:
+            results.append(codec.adk_to_twilio(data))
+        else:
+            codec.reset_outbound()
+            results.append(b"")
+    return results
+
+
+class _Shard:
+    """One single-worker executor plus the frames waiting for it"""
+
+    def __init__(self, executor: Executor, max_batch: int):
+        self.executor = executor
+        self.max_batch = max_batch
+        self.pending: list[tuple[tuple[str, int, bytes], asyncio.Future[bytes]]] = []
+        self.busy = False
+        self._drain_task: asyncio.Task | None = None
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, call_id: str, op: int, data: bytes) -> asyncio.Future[bytes]:
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append(((call_id, op, data), future))
+        if not self.busy:
+            self.busy = True
+            self._drain_task = asyncio.create_task(self._drain())
+        return future
+
+    async def _drain(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while self.pending:
+                chunk = self.pending[: self.max_batch]
+                del self.pending[: self.max_batch]
+                batch = [item for item, _ in chunk]
+                try:
+                    results = await loop.run_in_executor(
+                        self.executor, transcode_batch, batch
+                    )
+                except Exception as ex:
+                    logger.exception(f"Transcoding batch failed: {ex}")
+                    for _, future in chunk:
+                        if not future.done():
+                            future.set_exception(ex)
+                    continue
+                self.batches += 1
+                self.items += len(batch)
+                for (_, future), result in zip(chunk, results):
+                    if not future.done():
+                        future.set_result(result)
+        finally:
+            self.busy = False
+
+
+class CallTranscoder:
+    """A call's view of the transcoding executor, mirroring `CallAudioCodec` with async methods"""
+
+    def __init__(self, call_id: str, shard: _Shard | None):
+        self.call_id = call_id
+        self._shard = shard
+        self._codec = CallAudioCodec() if shard is None else None
+
+    async def twilio_to_adk(self, mulaw_bytes: bytes) -> bytes:
+        start = time.perf_counter()
+        if self._codec is not None:
+            pcm16 = self._codec.twilio_to_adk(mulaw_bytes)
+        else:
+            pcm16 = await self._shard.submit(self.call_id, TO_ADK, mulaw_bytes)
+        transcode_seconds.observe(time.perf_counter() - start, "inbound")
+        return pcm16
+
+    async def adk_to_twilio(self, pcm24: bytes) -> bytes:
+        start = time.perf_counter()
+        if self._codec is not None:
+            ulaw = self._codec.adk_to_twilio(pcm24)
+        else:
+            ulaw = await self._shard.submit(self.call_id, TO_TWILIO, pcm24)
+        transcode_seconds.observe(time.perf_counter() - start, "outbound")
+        return ulaw
+
+    async def reset_outbound(self) -> None:
+        if self._codec is not None:
+            return self._codec.reset_outbound()
+        await self._shard.submit(self.call_id, RESET_OUTBOUND, b"")
+
+    async def close(self) -> None:
+        if self._shard is None:
+            return
+        try:
+            await self._shard.submit(self.call_id, RELEASE, b"")
+        except Exception as ex:
+            logger.warning(f"Error while releasing codec for {self.call_id}: {ex}")
+
+
+class TranscodingExecutor:
+    """
+    Process-wide pool that transcodes audio for every call.
+
+    Args:
+        mode: Where transcoding runs, see module docstring.
+        workers: Number of shards (threads or processes). Ignored for `inline`.
+        max_batch: Max frames handed to a worker at once.
+    """
+
+    def __init__(
+        self, mode: TranscodeMode = "inline", workers: int = 2, max_batch: int = 64
+    ):
+        if mode not in ("inline", "thread", "process"):
+            raise ValueError(f"Unknown transcoding mode: {mode}")
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.max_batch = max_batch
+        self._shards: list[_Shard] = []
+
+    @classmethod
+    def from_env(cls) -> "TranscodingExecutor":
+        return cls(
+            mode=os.getenv("TRANSCODE_EXECUTOR", "inline"),  # type: ignore[arg-type]
+            workers=int(os.getenv("TRANSCODE_WORKERS", os.cpu_count() or 1)),
+            max_batch=int(os.getenv("TRANSCODE_MAX_BATCH", 64)),
+        )
+
+    def start(self) -> None:
+        if self.mode == "inline" or self._shards:
+            return
+        for i in range(self.workers):
+            executor: Executor
+            if self.mode == "thread":
+                executor = ThreadPoolExecutor(1, thread_name_prefix=f"transcode-{i}")
+            else:
+                spawn = multiprocessing.get_context("spawn")
+                executor = ProcessPoolExecutor(1, mp_context=spawn)
+            self._shards.append(_Shard(executor, self.max_batch))
+        logger.info(f"Transcoding executor started: {self.mode} x {self.workers}")
+
+    def shutdown(self) -> None:
+        for shard in self._shards:
+            shard.executor.shutdown(wait=False, cancel_futures=True)
+        self._shards.clear()
+
+    async def warm_up(self) -> None:
+        """
+        Transcodes a frame each way on every shard, so worker processes are spawned
+        and NumPy and the resamplers are loaded before the first call
+        """
+        silence = bytes([0xFF]) * TWILIO_FRAME_BYTES
+        pcm24 = bytes(TWILIO_FRAME_BYTES * 6)
+        if not self._shards:
+            transcode_batch(
+                [("warm-up", TO_ADK, silence), ("warm-up", TO_TWILIO, pcm24)]
+            )
+            _worker_codecs.pop("warm-up", None)
+            return
+        await asyncio.gather(
+            *(
+                shard.submit(f"warm-up-{i}", op, data)
+                for i, shard in enumerate(self._shards)
+                for op, data in ((TO_ADK, silence), (TO_TWILIO, pcm24), (RELEASE, b""))
+            )
+        )
+
+    def open_call(self, call_id: str) -> CallTranscoder:
+        if not self._shards:
+            return CallTranscoder(call_id, None)
+        shard = self._shards[crc32(call_id.encode()) % len(self._shards)]
+        return CallTranscoder(call_id, shard)
+
+    def stats(self) -> dict[str, float]:
+        batches = sum(s.batches for s in self._shards)
+        items = sum(s.items for s in self._shards)
+        return {
+            "batches": batches,
+            "frames": items,
+            "mean_batch_size": items / batches if batches else 0.0,
+            "pending": sum(len(s.pending) for s in self._shards),
+        }
+
+
+transcoding_executor = TranscodingExecutor.from_env()
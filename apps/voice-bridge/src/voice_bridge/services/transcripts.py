@@ -0,0 +1,271 @@
+"""
+Call transcripts for QA and compliance, written off the audio path.
+
+`TranscriptSink.record` only appends an utterance to a bounded in-memory queue
+shared by every call in the process. A background task drains the queue and
+writes the utterances in batches, on a worker thread, to JSONL or SQLite files
+under `directory`. A new file is started once the current one passes
+`rotate_bytes`. When the queue is full, utterances are dropped and counted
+rather than ever making a call wait. Whatever is still queued, or in a batch
+being filled, is written on shutdown.
+
+The live API transcribes the caller in many small fragments, so caller text is
+held per call and recorded as one utterance when the caller's turn ends: when
+the agent's reply is transcribed, its turn completes, or the call ends.
+
+Each row has the call SID, role (`user` for the caller, `model` for the agent),
+the text, and the Unix time and per-call sequence number of the utterance.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal
+
+from voice_bridge.utils.logging import logger
+
+TranscriptFormat = Literal["jsonl", "sqlite"]
+
+
+@dataclass(slots=True)
+class Utterance:
+    call_sid: str
+    role: str
+    text: str
+    timestamp: float
+    sequence: int
+
+
+@dataclass(slots=True)
+class TranscriptSinkStats:
+    recorded: int = 0
+    dropped: int = 0
+    written: int = 0
+    batches: int = 0
+    write_errors: int = 0
+
+
+class TranscriptSink:
+    """
+    Batches utterances from every call into rotated transcript files.
+
+    Args:
+        directory: Where transcript files are written.
+        enabled: When False, `record` is a no-op.
+        format: `jsonl` or `sqlite`.
+        max_queue: Utterances held in memory before new ones are dropped.
+        rotate_bytes: Start a new file once the current one is this big.
+        batch_size: Most utterances written at once.
+        flush_seconds: Longest an utterance waits for a batch to fill up.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        enabled: bool = False,
+        format: TranscriptFormat = "jsonl",
+        max_queue: int = 10_000,
+        rotate_bytes: int = 64 * 1024 * 1024,
+        batch_size: int = 500,
+        flush_seconds: float = 1.0,
+    ):
+        self.directory = directory
+        self.enabled = enabled
+        self.format = format
+        self.max_queue = max_queue
+        self.rotate_bytes = rotate_bytes
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.stats = TranscriptSinkStats()
+        self._queue: asyncio.Queue[Utterance] = asyncio.Queue(maxsize=max_queue)
+        self._sequences: dict[str, int] = {}
+        # Caller transcript fragments per call, until the caller's turn ends
+        self._caller_turns: dict[str, list[str]] = {}
+        # Utterances taken off the queue by the writer but not yet written
+        self._batch: list[Utterance] = []
+        self._writer: asyncio.Task | None = None
+        self._flushing: asyncio.Task | None = None
+        self._path: Path | None = None
+        self._db: sqlite3.Connection | None = None
+        self._files = 0  # Only touched by the writer thread
+
+    @classmethod
+    def from_env(cls) -> "TranscriptSink":
+        directory = os.getenv("TRANSCRIPTS_DIR") or os.path.join(
+            tempfile.gettempdir(), "voice-bridge-transcripts"
+        )
+        return cls(
+            directory=Path(directory),
+            enabled=os.getenv("TRANSCRIPTS", "false").lower() in ("1", "true", "yes"),
+            format=os.getenv("TRANSCRIPTS_FORMAT", "jsonl").lower(),  # type: ignore[arg-type]
+            max_queue=int(os.getenv("TRANSCRIPTS_MAX_QUEUE", 10_000)),
+            rotate_bytes=int(
+                float(os.getenv("TRANSCRIPTS_ROTATE_MB", 64)) * 1024 * 1024
+            ),
+        )
+
+    def start(self) -> None:
+        if self.enabled and self._writer is None:
+            self._writer = asyncio.create_task(self._write_forever())
+
+    async def shutdown(self) -> None:
+        """Writes what is still queued and closes the current file"""
+        if self._writer:
+            self._writer.cancel()
+            await asyncio.gather(self._writer, return_exceptions=True)
+            self._writer = None
+        if self._flushing:
+            await self._flushing
+        for call_sid in list(self._caller_turns):
+            self.end_turn(call_sid)
+        batch, self._batch = self._batch, []
+        while not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        if batch:
+            await self._flush(batch)
+        if self._db:
+            self._db.close()
+            self._db = None
+
+    def record(self, call_sid: str, role: str, text: str) -> None:
+        """Queues an utterance, or holds a caller fragment until the turn ends; never blocks"""
+        if not self.enabled:
+            return
+        if role == "user":
+            self._caller_turns.setdefault(call_sid, []).append(text)
+            return
+        # The agent only answers once the caller is done
+        self.end_turn(call_sid)
+        self._queue_utterance(call_sid, role, text)
+
+    def end_turn(self, call_sid: str) -> None:
+        """Records the caller's fragments so far as one utterance"""
+        fragments = self._caller_turns.pop(call_sid, None)
+        if fragments:
+            self._queue_utterance(call_sid, "user", "".join(fragments))
+
+    def end_call(self, call_sid: str) -> None:
+        self.end_turn(call_sid)
+        self._sequences.pop(call_sid, None)
+
+    def _queue_utterance(self, call_sid: str, role: str, text: str) -> None:
+        if not text.strip():
+            return
+        sequence = self._sequences.get(call_sid, 0)
+        self._sequences[call_sid] = sequence + 1
+        try:
+            self._queue.put_nowait(
+                Utterance(call_sid, role, text.strip(), time.time(), sequence)
+            )
+        except asyncio.QueueFull:
+            self.stats.dropped += 1
+            return
+        self.stats.recorded += 1
+
+    def snapshot(self) -> dict[str, float | str | None]:
+        return {
+            "enabled": self.enabled,
+            "queued": self._queue.qsize() + len(self._batch),
+            "recorded": self.stats.recorded,
+            "dropped": self.stats.dropped,
+            "written": self.stats.written,
+            "batches": self.stats.batches,
+            "files": self._files,
+            "write_errors": self.stats.write_errors,
+            "file": str(self._path) if self._path else None,
+        }
+
+    async def _write_forever(self) -> None:
+        while True:
+            # Filled on `self`, so a shutdown while it fills up writes it instead of losing it
+            self._batch.append(await self._queue.get())
+            deadline = time.monotonic() + self.flush_seconds
+            while len(self._batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    self._batch.append(
+                        await asyncio.wait_for(self._queue.get(), timeout)
+                    )
+                except TimeoutError:
+                    break
+            batch, self._batch = self._batch, []
+            # Shielded, so a shutdown mid-write waits for the batch instead of losing it
+            self._flushing = asyncio.create_task(self._flush(batch))
+            await asyncio.shield(self._flushing)
+
+    async def _flush(self, batch: list[Utterance]) -> None:
+        try:
+            await asyncio.to_thread(self._write, batch)
+        except (OSError, sqlite3.Error) as ex:
+            self.stats.write_errors += 1
+            self.stats.dropped += len(batch)
+            logger.warning(f"Failed to write {len(batch)} transcript utterances: {ex}")
+            return
+        self.stats.written += len(batch)
+        self.stats.batches += 1
+
+    def _write(self, batch: list[Utterance]) -> None:
+        """Runs on a worker thread, one batch at a time"""
+        if self._path is None or self._path.stat().st_size >= self.rotate_bytes:
+            self._rotate()
+        if self.format == "sqlite":
+            self._write_sqlite(batch)
+        else:
+            self._write_jsonl(batch)
+
+    def _rotate(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        suffix = "db" if self.format == "sqlite" else "jsonl"
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+        path = self.directory / f"transcripts-{stamp}-{os.getpid()}.{suffix}"
+        if path == self._path:
+            path = path.with_stem(f"{path.stem}-{self._files}")
+        if self._db:
+            self._db.close()
+            self._db = None
+        if self.format == "sqlite":
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS utterances "
+                "(call_sid TEXT, sequence INTEGER, role TEXT, text TEXT, timestamp REAL)"
+            )
+        else:
+            path.touch()
+        self._path = path
+        self._files += 1
+        logger.info(f"Writing transcripts to {path}")
+
+    def _write_jsonl(self, batch: list[Utterance]) -> None:
+        lines = "".join(
+            json.dumps(
+                {
+                    "call_sid": u.call_sid,
+                    "sequence": u.sequence,
+                    "role": u.role,
+                    "text": u.text,
+                    "timestamp": u.timestamp,
+                },
+                ensure_ascii=False,
+            )
+            + "\n"
+            for u in batch
+        )
+        with open(self._path, "a", encoding="utf-8") as file:
+            file.write(lines)
+
+    def _write_sqlite(self, batch: list[Utterance]) -> None:
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO utterances VALUES (?, ?, ?, ?, ?)",
+                [(u.call_sid, u.sequence, u.role, u.text, u.timestamp) for u in batch],
+            )
+
+
+transcript_sink = TranscriptSink.from_env()
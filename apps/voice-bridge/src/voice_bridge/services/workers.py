@@ -0,0 +1,245 @@
+"""
+State shared by the worker processes of a multi-worker pod, see `voice_bridge.supervisor`.
+
+Each worker owns one slot of a small table in a memory-mapped file: its pid,
+calls in use and active, remaining capacity, and whether it has warmed up, is
+draining, and how many `/twilio/connect` webhooks it has handled. The slot is
+updated whenever the worker's capacity changes and every `publish_seconds`.
+The supervisor reads the table to send each new call to the least loaded
+worker, and every worker reads it to answer `/health/ready` for the whole pod.
+
+Every `publish_seconds`, each worker also writes its `share`d sections (metrics,
+session and startup stats) to `worker-<id>.json` next to the table, so whichever
+worker serves `/metrics` or `/health/*` can report all of them.
+
+In a plain `uvicorn` run there is no table, and `enabled` is False.
+"""
+
+import asyncio
+import json
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from voice_bridge.services.capacity import call_capacity
+from voice_bridge.services.startup import startup
+from voice_bridge.utils.logging import logger
+
+# pid, in use, active, remaining (-1 without a limit), warmed up, draining, webhooks
+_SLOT = struct.Struct("<7q")
+TABLE_FILE = "workers.bin"
+
+
+@dataclass(slots=True)
+class WorkerSlot:
+    pid: int = 0
+    in_use: int = 0
+    active: int = 0
+    remaining: int | None = None
+    warmed_up: bool = False
+    draining: bool = False
+    webhooks: int = 0
+
+
+class WorkerTable:
+    """
+    This worker's view of the pod's workers.
+
+    Args:
+        directory: Where the supervisor keeps the table and the shared stats; None when
+            not running under the supervisor.
+        worker_id: This worker's slot.
+        workers: Number of workers in the pod.
+        publish_seconds: How often the slot and the shared stats are refreshed.
+    """
+
+    def __init__(
+        self,
+        directory: Path | None = None,
+        worker_id: int = 0,
+        workers: int = 1,
+        publish_seconds: float = 1.0,
+    ):
+        self.directory = directory
+        self.worker_id = worker_id
+        self.workers = workers
+        self.publish_seconds = publish_seconds
+        self._shared: dict[str, Callable[[], Any]] = {}
+        self._table: mmap.mmap | None = None
+        self._publisher: asyncio.Task | None = None
+
+    @classmethod
+    def from_env(cls) -> "WorkerTable":
+        # Set by the supervisor for each worker process it starts
+        directory = os.getenv("VOICE_BRIDGE_WORKER_DIR")
+        return cls(
+            directory=Path(directory) if directory else None,
+            worker_id=int(os.getenv("VOICE_BRIDGE_WORKER_ID", 0)),
+            workers=int(os.getenv("VOICE_BRIDGE_WORKERS", 1)),
+        )
+
+    @staticmethod
+    def create(directory: Path, workers: int) -> None:
+        """Creates an empty table; done by the supervisor before starting workers"""
+        (directory / TABLE_FILE).write_bytes(bytes(_SLOT.size * workers))
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def share(self, name: str, read: Callable[[], Any]) -> None:
+        """Publishes `read()` to the other workers as section `name`"""
+        self._shared[name] = read
+
+    def start(self) -> None:
+        if self.enabled and self._publisher is None:
+            self._publisher = asyncio.create_task(self._publish_forever())
+
+    async def shutdown(self) -> None:
+        if self._publisher:
+            self._publisher.cancel()
+            await asyncio.gather(self._publisher, return_exceptions=True)
+            self._publisher = None
+        if self.enabled:
+            self.write(self.worker_id, WorkerSlot())
+
+    def update(self) -> None:
+        """Writes this worker's capacity and warm-up state to its slot"""
+        if not self.enabled:
+            return
+        snapshot = call_capacity.snapshot()
+        slot = WorkerSlot(
+            pid=os.getpid(),
+            in_use=call_capacity.in_use,
+            active=snapshot["active"],
+            remaining=snapshot["remaining"],
+            warmed_up=startup.ready,
+            draining=call_capacity.draining,
+            webhooks=call_capacity.stats.webhooks,
+        )
+        self.write(self.worker_id, slot)
+
+    def write(self, worker_id: int, slot: WorkerSlot) -> None:
+        remaining = -1 if slot.remaining is None else slot.remaining
+        values = (
+            slot.pid,
+            slot.in_use,
+            slot.active,
+            remaining,
+            slot.warmed_up,
+            slot.draining,
+        )
+        _SLOT.pack_into(self._map(), worker_id * _SLOT.size, *values, slot.webhooks)
+
+    def slots(self) -> list[WorkerSlot]:
+        table = self._map()
+        slots = []
+        for worker_id in range(self.workers):
+            pid, in_use, active, remaining, warmed_up, draining, webhooks = (
+                _SLOT.unpack_from(table, worker_id * _SLOT.size)
+            )
+            slots.append(
+                WorkerSlot(
+                    pid,
+                    in_use,
+                    active,
+                    None if remaining < 0 else remaining,
+                    bool(warmed_up),
+                    bool(draining),
+                    webhooks,
+                )
+            )
+        return slots
+
+    def pod_snapshot(self) -> dict[str, Any]:
+        """Capacity and warm-up of the whole pod, in the shape of `CallCapacity.snapshot`"""
+        self.update()
+        slots = self.slots()
+        remaining = [s.remaining for s in slots]
+        return {
+            "workers": self.workers,
+            "max_calls": call_capacity.pod_max_calls or None,
+            "active": sum(s.active for s in slots),
+            "reserved": sum(s.in_use - s.active for s in slots),
+            "remaining": None if None in remaining else sum(remaining),
+            "draining": any(s.draining for s in slots),
+            "warmed_up": all(s.pid and s.warmed_up for s in slots),
+        }
+
+    def peers(self, name: str) -> dict[int, Any]:
+        """Section `name` as last published by every other worker"""
+        sections = {}
+        for worker_id in range(self.workers if self.enabled else 0):
+            if worker_id == self.worker_id:
+                continue
+            try:
+                published = json.loads(
+                    (self.directory / f"worker-{worker_id}.json").read_text()
+                )
+            except (OSError, ValueError):
+                continue  # Not started yet
+            if name in published:
+                sections[worker_id] = published[name]
+        return sections
+
+    def gather(self, name: str) -> dict[int, Any]:
+        """Section `name` from every worker, read live for this one"""
+        sections = self.peers(name) | {self.worker_id: self._shared[name]()}
+        return dict(sorted(sections.items()))
+
+    def _map(self) -> mmap.mmap:
+        if self._table is None:
+            with open(self.directory / TABLE_FILE, "r+b") as file:
+                self._table = mmap.mmap(file.fileno(), 0)
+        return self._table
+
+    async def _publish_forever(self) -> None:
+        path = self.directory / f"worker-{self.worker_id}.json"
+        while True:
+            self.update()
+            try:
+                document = json.dumps(
+                    {name: read() for name, read in self._shared.items()}
+                )
+                await asyncio.to_thread(_replace, path, document)
+            except Exception as ex:
+                logger.warning(
+                    f"Failed to publish worker {self.worker_id} stats: {ex!r}"
+                )
+            await asyncio.sleep(self.publish_seconds)
+
+
+def close_connections(app: ASGIApp) -> ASGIApp:
+    """
+    ASGI middleware that answers every HTTP request with `Connection: close`, so
+    each request comes in on a new connection that the supervisor routes on its own
+    """
+
+    async def middleware(scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await app(scope, receive, send)
+
+        async def send_closing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = [*message.get("headers", []), (b"connection", b"close")]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await app(scope, receive, send_closing)
+
+    return middleware
+
+
+def _replace(path: Path, text: str) -> None:
+    """Writes `path` atomically, so readers never see half of it"""
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+worker_table = WorkerTable.from_env()
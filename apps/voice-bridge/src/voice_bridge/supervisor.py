@@ -0,0 +1,292 @@
+"""
+Runs voice-bridge as several worker processes behind one port, so a pod can use all its cores.
+
+A single process handles every call's WebSocket, JSON and audio on one event
+loop and one GIL. The supervisor owns the listening socket instead and starts
+`--workers` worker processes, each a normal voice-bridge app under uvicorn.
+Every connection it accepts is passed to one worker as a file descriptor, so
+the supervisor never touches the traffic itself:
+- `POST /twilio/connect` goes to the warmed-up worker with the fewest calls in
+  use, counting webhooks already sent to it but not yet handled;
+- `GET /twilio/stream/<worker>` goes back to the worker that took the call's
+  webhook, which holds its capacity slot and pre-started agent session;
+- anything else goes to the workers in turn.
+
+Workers answer every HTTP request with `Connection: close`, so the first
+request on each connection is the only one there is, and peeking at its request
+line is enough to route it. The workers share their call counts, readiness and
+stats through `voice_bridge.services.workers`.
+
+SIGTERM and SIGINT are passed on to every worker, which drains as usual, and the
+supervisor keeps routing connections until they have all exited. A worker that
+dies is started again.
+
+With `--workers 1` (the default) this just runs the app under uvicorn.
+
+Usage:
+```sh
+python -m voice_bridge.supervisor --workers 4 --port 8000
+```
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import re
+import shutil
+import signal
+import socket
+import tempfile
+from itertools import cycle
+from multiprocessing.process import BaseProcess
+from pathlib import Path
+
+import uvicorn
+
+from voice_bridge.services.workers import WorkerSlot, WorkerTable
+from voice_bridge.utils.logging import logger
+
+APP = "voice_bridge.main:app"
+STREAM_REQUEST = re.compile(rb"GET /twilio/stream/(\d+)[ ?/]")
+CONNECT_REQUEST = re.compile(rb"POST /twilio/connect[ ?]")
+# How long to wait for a new connection's first request before routing it blind
+PEEK_TIMEOUT_SECONDS = 5.0
+
+
+class WorkerServer(uvicorn.Server):
+    """uvicorn serving the connections the supervisor passes over `channel`"""
+
+    def __init__(self, config: uvicorn.Config, channel: socket.socket):
+        super().__init__(config)
+        self.channel = channel
+
+    async def startup(self, sockets: list[socket.socket] | None = None) -> None:
+        # No listening sockets of its own; connections arrive on the channel
+        await super().startup(sockets=[])
+        self.channel.setblocking(False)
+        asyncio.get_running_loop().add_reader(self.channel.fileno(), self._receive)
+
+    async def shutdown(self, sockets: list[socket.socket] | None = None) -> None:
+        asyncio.get_running_loop().remove_reader(self.channel.fileno())
+        await super().shutdown()
+
+    def _receive(self) -> None:
+        try:
+            _, fds, _, _ = socket.recv_fds(self.channel, 1, 1)
+        except BlockingIOError:
+            return
+        if not fds:
+            logger.warning("Supervisor went away, shutting down")
+            asyncio.get_running_loop().remove_reader(self.channel.fileno())
+            self.should_exit = True
+            return
+        connection = socket.socket(fileno=fds[0])
+        connection.setblocking(False)
+        loop = asyncio.get_running_loop()
+        asyncio.ensure_future(loop.connect_accepted_socket(self._protocol, connection))
+
+    def _protocol(self) -> asyncio.Protocol:
+        # What uvicorn's own listening sockets create for each connection
+        return self.config.http_protocol_class(  # type: ignore[call-arg]
+            config=self.config,
+            server_state=self.server_state,
+            app_state=self.lifespan.state,
+        )
+
+
+def run_worker(channel: socket.socket, log_level: str) -> None:
+    # Signals come from the supervisor only, not from the terminal's process group too
+    os.setpgrp()
+    config = uvicorn.Config(APP, log_level=log_level, proxy_headers=True)
+    WorkerServer(config, channel).run()
+
+
+class Worker:
+    """The supervisor's handle on one worker process"""
+
+    def __init__(self, worker_id: int):
+        self.worker_id = worker_id
+        self.process: BaseProcess | None = None
+        self.channel: socket.socket | None = None
+        self.webhooks_sent = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def start(self, directory: Path, workers: int, log_level: str) -> None:
+        self.channel, child = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.channel.setblocking(False)
+        self.webhooks_sent = 0
+        # Read by the worker's modules when they are imported; spawned children inherit them
+        os.environ["VOICE_BRIDGE_WORKER_DIR"] = str(directory)
+        os.environ["VOICE_BRIDGE_WORKER_ID"] = str(self.worker_id)
+        os.environ["VOICE_BRIDGE_WORKERS"] = str(workers)
+        spawn = multiprocessing.get_context("spawn")
+        self.process = spawn.Process(
+            target=run_worker, args=(child, log_level), name=f"worker-{self.worker_id}"
+        )
+        self.process.start()
+        child.close()
+        logger.info(f"Started worker {self.worker_id} (pid {self.process.pid})")
+
+    async def send(self, connection: socket.socket) -> None:
+        """Hands `connection` over to the worker"""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                socket.send_fds(self.channel, [b"c"], [connection.fileno()])
+                return
+            except BlockingIOError:
+                writable = loop.create_future()
+                loop.add_writer(self.channel.fileno(), writable.set_result, None)
+                try:
+                    await writable
+                finally:
+                    loop.remove_writer(self.channel.fileno())
+
+    def signal(self, signum: int) -> None:
+        if self.alive:
+            os.kill(self.process.pid, signum)
+
+
+class Supervisor:
+    """
+    Accepts connections for `workers` worker processes and routes each one to a worker.
+
+    Args:
+        listener: Bound, listening socket.
+        workers: Number of worker processes.
+        log_level: uvicorn log level for the workers.
+    """
+
+    def __init__(self, listener: socket.socket, workers: int, log_level: str = "info"):
+        self.listener = listener
+        self.log_level = log_level
+        self.directory = Path(tempfile.mkdtemp(prefix="voice-bridge-workers-"))
+        WorkerTable.create(self.directory, workers)
+        self.table = WorkerTable(self.directory, workers=workers)
+        self.workers = [Worker(i) for i in range(workers)]
+        self.stopping = False
+        self._turns = cycle(self.workers)
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, self._on_signal, signum)
+        for worker in self.workers:
+            worker.start(self.directory, len(self.workers), self.log_level)
+        self.listener.setblocking(False)
+        acceptor = asyncio.create_task(self._accept_forever())
+        try:
+            await self._watch_workers()
+        finally:
+            acceptor.cancel()
+            await asyncio.gather(acceptor, return_exceptions=True)
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _on_signal(self, signum: int) -> None:
+        logger.info(
+            f"Passing {signal.Signals(signum).name} on to {len(self.workers)} workers"
+        )
+        self.stopping = True
+        for worker in self.workers:
+            worker.signal(signum)
+
+    async def _watch_workers(self) -> None:
+        """Restarts workers that die, until stopping and every worker has exited"""
+        while True:
+            await asyncio.sleep(0.5)
+            if self.stopping and not any(w.alive for w in self.workers):
+                return
+            for worker in self.workers:
+                if self.stopping or worker.alive:
+                    continue
+                logger.warning(
+                    f"Worker {worker.worker_id} exited with {worker.process.exitcode}, restarting"
+                )
+                self.table.write(worker.worker_id, WorkerSlot())
+                worker.start(self.directory, len(self.workers), self.log_level)
+
+    async def _accept_forever(self) -> None:
+        loop = asyncio.get_running_loop()
+        routing: set[asyncio.Task] = set()
+        while True:
+            connection, _ = await loop.sock_accept(self.listener)
+            task = asyncio.create_task(self._route(connection))
+            routing.add(task)
+            task.add_done_callback(routing.discard)
+
+    async def _route(self, connection: socket.socket) -> None:
+        try:
+            request = await self._peek(connection)
+            worker = self._pick(request)
+            if worker is None:
+                logger.warning("No worker running, dropping connection")
+                return
+            await worker.send(connection)
+        except OSError as ex:
+            logger.warning(f"Failed to hand over connection: {ex!r}")
+        finally:
+            connection.close()
+
+    async def _peek(self, connection: socket.socket) -> bytes:
+        """The start of the connection's first request, without reading it off the socket"""
+        loop = asyncio.get_running_loop()
+        readable = loop.create_future()
+        loop.add_reader(connection.fileno(), readable.set_result, None)
+        try:
+            await asyncio.wait_for(readable, PEEK_TIMEOUT_SECONDS)
+        except TimeoutError:
+            return b""
+        finally:
+            loop.remove_reader(connection.fileno())
+        try:
+            return connection.recv(256, socket.MSG_PEEK)
+        except BlockingIOError:
+            return b""
+
+    def _pick(self, request: bytes) -> Worker | None:
+        alive = [w for w in self.workers if w.alive]
+        if not alive:
+            return None
+        if match := STREAM_REQUEST.match(request):
+            worker_id = int(match[1])
+            if worker_id < len(self.workers) and self.workers[worker_id].alive:
+                return self.workers[worker_id]
+        slots = self.table.slots()
+        serving = [w for w in alive if slots[w.worker_id].warmed_up] or alive
+        if CONNECT_REQUEST.match(request):
+            taking = [w for w in serving if not slots[w.worker_id].draining] or serving
+
+            def load(worker: Worker) -> int:
+                slot = slots[worker.worker_id]
+                return slot.in_use + max(worker.webhooks_sent - slot.webhooks, 0)
+
+            worker = min(taking, key=load)
+            worker.webhooks_sent += 1
+            return worker
+        for worker in self._turns:
+            if worker in serving:
+                return worker
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WORKERS", 1)))
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    if args.workers <= 1:
+        uvicorn.run(APP, host=args.host, port=args.port, log_level=args.log_level)
+        return
+    listener = socket.create_server((args.host, args.port), backlog=2048)
+    logger.info(f"Listening on {args.host}:{args.port} with {args.workers} workers")
+    asyncio.run(Supervisor(listener, args.workers, args.log_level).run())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,121 @@
 # https://github.com/openai/openai-agents-python/issues/304#issuecomment-2746073108
 
-import audioop
 import numpy as np
 import soxr
 
+TWILIO_SAMPLE_RATE = 8000  # Twilio Media Streams: 8-bit μ-law @ 8kHz
+ADK_INPUT_SAMPLE_RATE = 16000  # ADK realtime input: 16-bit PCM @ 16kHz
+ADK_OUTPUT_SAMPLE_RATE = 24000  # ADK live output: 16-bit PCM @ 24kHz
+
+TWILIO_FRAME_BYTES = 160  # Twilio sends 20ms frames, 1 byte per sample
+
+
+def _build_ulaw_decode_table() -> np.ndarray:
+    """G.711 μ-law byte -> int16 sample, identical to `audioop.ulaw2lin`"""
+    u = ~np.arange(256, dtype=np.uint8)
+    t = ((u & 0x0F).astype(np.int32) << 3) + 0x84
+    t <<= (u & 0x70) >> 4
+    return np.where(u & 0x80, 0x84 - t, t - 0x84).astype(np.int16)
+
+
+def _build_ulaw_encode_table() -> np.ndarray:
+    """int16 sample (indexed as uint16) -> G.711 μ-law byte, identical to `audioop.lin2ulaw`"""
+    pcm14 = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32) >> 2
+    mask = np.where(pcm14 < 0, 0x7F, 0xFF)
+    magnitude = np.minimum(np.abs(pcm14), 8159) + 0x21
+    segment_ends = np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF])
+    segment = np.searchsorted(segment_ends, magnitude)
+    ulaw = ((segment << 4) | ((magnitude >> (segment + 1)) & 0x0F)) ^ mask
+    return np.where(segment >= 8, 0x7F ^ mask, ulaw).astype(np.uint8)
+
+
+ULAW_DECODE_TABLE = _build_ulaw_decode_table()
+ULAW_ENCODE_TABLE = _build_ulaw_encode_table()
+
+
+def ulaw_to_pcm(mulaw: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """Decode uint8 μ-law samples to int16 PCM with a table lookup"""
+    return np.take(ULAW_DECODE_TABLE, mulaw, out=out)
+
+
+def pcm_to_ulaw(pcm: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """Encode int16 PCM samples to uint8 μ-law with a table lookup"""
+    return np.take(ULAW_ENCODE_TABLE, pcm.view(np.uint16), out=out)
+
+
+class CallAudioCodec:
+    """
+    Transcodes audio between Twilio and ADK for a single call.
+
+    Keeps a streaming resampler for each direction so the filter state carries
+    over between 20ms frames (no clicks at frame edges, no filter rebuild per
+    packet), and reuses its lookup buffers across frames.
+
+    Create one per Twilio WebSocket; instances are not safe to share between calls.
+
+    Args:
+        quality: soxr quality recipe. "QQ" (cubic interpolation) turns every
+            20ms frame into a full frame each way, with no filter delay. The
+            filtered recipes, even "LQ", hold input back and release it in bursts
+            (e.g. 940 samples every third inbound frame), adding 40-60ms of
+            buffering; phone audio is band-limited to 4kHz, so they gain little.
+    """
+
+    def __init__(self, quality: str = "QQ"):
+        self._inbound = soxr.ResampleStream(
+            TWILIO_SAMPLE_RATE, ADK_INPUT_SAMPLE_RATE, 1, dtype="int16", quality=quality
+        )
+        self._outbound = soxr.ResampleStream(
+            ADK_OUTPUT_SAMPLE_RATE,
+            TWILIO_SAMPLE_RATE,
+            1,
+            dtype="int16",
+            quality=quality,
+        )
+        self._pcm8 = np.empty(TWILIO_FRAME_BYTES, dtype=np.int16)
+        self._ulaw8 = np.empty(TWILIO_FRAME_BYTES, dtype=np.uint8)
+        # Odd trailing byte of a 16-bit sample split across agent chunks
+        self._pcm24_carry = b""
+
+    # Inbound: Twilio 8-bit 8kHz μ-law -> 16-bit 16kHz PCM for ADK
+    def twilio_to_adk(self, mulaw_bytes: bytes) -> bytes:
+        n = len(mulaw_bytes)
+        if n > len(self._pcm8):
+            self._pcm8 = np.empty(n, dtype=np.int16)
+        pcm8 = ulaw_to_pcm(np.frombuffer(mulaw_bytes, dtype=np.uint8), self._pcm8[:n])
+        return self._inbound.resample_chunk(pcm8).tobytes()
+
+    # Outbound: ADK 16-bit 24kHz PCM -> Twilio 8-bit 8kHz μ-law
+    def adk_to_twilio(self, pcm24: bytes) -> bytes:
+        if self._pcm24_carry:
+            pcm24 = self._pcm24_carry + pcm24
+        usable = len(pcm24) & ~1
+        self._pcm24_carry = pcm24[usable:]
+        x = np.frombuffer(pcm24, dtype=np.int16, count=usable // 2)
+        pcm8 = self._outbound.resample_chunk(x)
+        n = len(pcm8)
+        if n > len(self._ulaw8):
+            self._ulaw8 = np.empty(n, dtype=np.uint8)
+        return pcm_to_ulaw(pcm8, self._ulaw8[:n]).tobytes()
+
+    def reset_outbound(self) -> None:
+        """Drop buffered agent audio, e.g. when the caller interrupts the agent"""
+        self._outbound.clear()
+        self._pcm24_carry = b""
+
+
+# Stateless one-shot conversions, for callers without a per-call codec.
+
 
 # Inbound: Twilio 8-bit 8kHz μ-law -> 16-bit 16kHz PCM for ADK
 def twilio_ulaw8k_to_adk_pcm16k(mulaw_bytes: bytes) -> bytes:
-    pcm8 = audioop.ulaw2lin(mulaw_bytes, 2)  # μ-law -> 16-bit PCM @ 8kHz
-    # resample: int16 <-> float32 for soxr
-    x = np.frombuffer(pcm8, dtype=np.int16).astype(np.float32) / 32768.0
-    y = soxr.resample(x, 8000, 16000)  # 8kHz -> 16kHz
-    pcm16 = (np.clip(y, -1, 1) * 32767).astype(np.int16).tobytes()
-    return pcm16
+    pcm8 = ulaw_to_pcm(np.frombuffer(mulaw_bytes, dtype=np.uint8))
+    pcm16 = soxr.resample(pcm8, TWILIO_SAMPLE_RATE, ADK_INPUT_SAMPLE_RATE)
+    return pcm16.tobytes()
 
 
 # Outbound: ADK 16-bit 24kHz PCM -> Twilio 8-bit 8kHz μ-law
 def adk_pcm24k_to_twilio_ulaw8k(pcm24: bytes) -> bytes:
-    x = np.frombuffer(pcm24, dtype=np.int16).astype(np.float32) / 32768.0
-    y = soxr.resample(x, 24000, 8000)  # 24kHz -> 8kHz
-    pcm8 = (np.clip(y, -1, 1) * 32767).astype(np.int16).tobytes()
-    ulaw = audioop.lin2ulaw(pcm8, 2)  # PCM -> μ-law
-    return ulaw
+    x = np.frombuffer(pcm24, dtype=np.int16, count=len(pcm24) // 2)
+    pcm8 = soxr.resample(x, ADK_OUTPUT_SAMPLE_RATE, TWILIO_SAMPLE_RATE)
+    return pcm_to_ulaw(pcm8).tobytes()
@@ -1,13 +1,20 @@
 import os
 
 from google.adk.agents import Agent
-from google.adk.tools.mcp_tool.mcp_toolset import McpToolset
 from google.adk.tools.mcp_tool.mcp_session_manager import StreamableHTTPConnectionParams
 
+from adk_agents.tools.mcp_connection import ManagedMcpToolset, McpConnection
+
 mcp_url = f"http://{os.getenv('ANTHOS_MCP_SERVICE_HOST', 'localhost')}:{os.getenv('ANTHOS_MCP_SERVICE_PORT', 8002)}/mcp"
 
-mcp_connection = StreamableHTTPConnectionParams(url=mcp_url)
-mcp_toolset = McpToolset(connection_params=mcp_connection)
+# One MCP session and tool listing shared by every call in the process
+mcp_connection = McpConnection(
+    StreamableHTTPConnectionParams(url=mcp_url),
+    schema_ttl_seconds=float(os.getenv("MCP_SCHEMA_TTL_S", 300)),
+    call_timeout_seconds=float(os.getenv("MCP_CALL_TIMEOUT_S", 30)),
+    backoff_max_seconds=float(os.getenv("MCP_RECONNECT_MAX_S", 30)),
+)
+mcp_toolset = ManagedMcpToolset(mcp_connection)
 
 root_agent = Agent(
     # A unique name for the agent.
@@ -18,7 +25,7 @@ root_agent = Agent(
     # A short description of the agent's purpose.
     description="Agent to assist with banking inquiries.",
     # Instructions to set the agent's behavior.
-    instruction="You are Sam, help the user with the provided banking tools. When asking the user for information, confirm what they said. If you are unsure about something, ask the user for clarification. Don't read account numbers as 'numbers', read them as 'digits'. '12345' is 'one two three four five'. Always end your response with a question to keep the conversation going.",
+    instruction="You are Sam, help the user with the provided banking tools. When asking the user for information, confirm what they said. If you are unsure about something, ask the user for clarification. Don't read account numbers as 'numbers', read them as 'digits'. '12345' is 'one two three four five'. Always end your response with a question to keep the conversation going. Every tool call makes the caller wait, so use as few as possible: log in with `login_and_get_balance`, which also tells you the balance, and send money with `transfer_with_balance_check`, which also tells you the new balance. Keep the session handle from login for later banking tools. Messages starting with [keypad] are digits the caller typed on their phone keypad: use them as if the caller had said them, don't read them back digit by digit, and if they include a `result`, tell the caller that result.",
     # Use MCP Server tools.
     tools=[mcp_toolset],
 )
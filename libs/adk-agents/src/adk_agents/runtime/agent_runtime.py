@@ -0,0 +1,279 @@
+"""
+Process-wide ADK runtime shared by every live call.
+
+Building a Runner, RunConfig and session service per call is wasted work, and
+ADK resolves a string `model` into a new `Gemini` (with new genai clients) on
+every `run_live`. `AgentRuntime` builds all of that once, can pre-warm the model
+clients and tool listing before the first call arrives, and issues sessions.
+Sessions reconnect to the model on their own when a live connection ends; see
+`live_resumption`. With `LIVE_BACKEND=fake`, sessions run against the
+deterministic stand-in in `fake_live` instead of Gemini.
+
+Usage:
+```python
+runtime = AgentRuntime(root_agent, runners=2)
+await runtime.prewarm()
+live_events, live_request_queue = await runtime.start_session(user_id, session_id)
+...
+await runtime.end_session(user_id, session_id)
+```
+"""
+
+import asyncio
+import logging
+import time
+from typing import AsyncGenerator
+
+from google.adk.agents import LlmAgent
+from google.adk.agents.live_request_queue import LiveRequestQueue
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.events import Event
+from google.adk.memory import InMemoryMemoryService
+from google.adk.models import LLMRegistry
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.adk.tools.base_toolset import BaseToolset
+from google.genai import types
+
+from adk_agents.runtime.fake_live import (
+    FakeLiveConfig,
+    fake_live_config,
+    fake_live_events,
+)
+from adk_agents.runtime.live_resumption import (
+    LiveResumptionConfig,
+    LiveResumptionStats,
+    live_resumption_config,
+    resumable_live_events,
+    resumable_model,
+)
+
+logger = logging.getLogger(__name__)
+
+APP_NAME = "THE VOICE AGENT"
+
+LiveEvents = AsyncGenerator[Event, None]
+
+
+def build_run_config(
+    voice_name: str = "Zephyr", language_code: str = "en-US"
+) -> RunConfig:
+    """Live run config for phone calls: audio out, transcriptions, server-side VAD"""
+    speech_config = types.SpeechConfig(
+        voice_config=types.VoiceConfig(
+            # https://ai.google.dev/gemini-api/docs/speech-generation#voices
+            prebuilt_voice_config=types.PrebuiltVoiceConfig(voice_name=voice_name)
+        ),
+        # https://ai.google.dev/gemini-api/docs/speech-generation#languages
+        language_code=language_code,
+    )
+
+    automatic_activity_detection = types.AutomaticActivityDetection(
+        disabled=False,
+        start_of_speech_sensitivity=types.StartSensitivity.START_SENSITIVITY_HIGH,
+        end_of_speech_sensitivity=types.EndSensitivity.END_SENSITIVITY_HIGH,
+        prefix_padding_ms=150,
+        silence_duration_ms=400,
+    )
+    realtime_input_config = types.RealtimeInputConfig(
+        automatic_activity_detection=automatic_activity_detection
+    )
+
+    return RunConfig(
+        speech_config=speech_config,
+        # response_modalities=["AUDIO"], # Setting this gives Pydantic warning
+        streaming_mode=StreamingMode.BIDI,
+        session_resumption=types.SessionResumptionConfig(),
+        input_audio_transcription=types.AudioTranscriptionConfig(),
+        output_audio_transcription=types.AudioTranscriptionConfig(),
+        realtime_input_config=realtime_input_config,
+    )
+
+
+class AgentRuntime:
+    """
+    Shared runners, run config and session service for one agent.
+
+    Runners keep no per-call state, so calls are spread round-robin over a
+    small pool; `runners=1` is enough unless plugins make a runner a hotspot.
+
+    Args:
+        agent: Root agent to run.
+        app_name: ADK app name for sessions.
+        runners: Number of runners in the pool.
+        run_config: Live run config, defaults to `build_run_config()`.
+        resumption: Live reconnect settings, defaults to `LIVE_RECONNECT*` env vars.
+        fake_live: Run sessions against the fake live backend instead of the model,
+            defaults to `fake_live_config` when `LIVE_BACKEND=fake`.
+    """
+
+    def __init__(
+        self,
+        agent: LlmAgent,
+        app_name: str = APP_NAME,
+        runners: int = 1,
+        run_config: RunConfig | None = None,
+        resumption: LiveResumptionConfig | None = None,
+        fake_live: FakeLiveConfig | None = None,
+    ):
+        self.agent = agent
+        self.fake_live = fake_live or (
+            fake_live_config if fake_live_config.enabled else None
+        )
+        self.resumption = resumption or live_resumption_config
+        if self.resumption.enabled:
+            self.agent.model = resumable_model(self.agent.model)
+        self.app_name = app_name
+        self.run_config = run_config or build_run_config()
+        self.session_service = InMemorySessionService()
+        self.artifact_service = InMemoryArtifactService()
+        self.memory_service = InMemoryMemoryService()
+        self._runners: list[Runner] = []
+        self._next_runner = 0
+        self.resize(runners)
+
+        self.prewarmed = False
+        self.prewarm_seconds = 0.0
+        self.sessions_started = 0
+        self.active_sessions: set[tuple[str, str]] = set()
+        self.resumption_stats = LiveResumptionStats()
+        self._setup_seconds_total = 0.0
+
+    def resize(self, runners: int) -> None:
+        """Grows or shrinks the runner pool; running sessions keep their runner"""
+        runners = max(1, runners)
+        while len(self._runners) < runners:
+            self._runners.append(
+                Runner(
+                    app_name=self.app_name,
+                    agent=self.agent,
+                    session_service=self.session_service,
+                    artifact_service=self.artifact_service,
+                    memory_service=self.memory_service,
+                )
+            )
+        del self._runners[runners:]
+
+    async def prewarm(self) -> None:
+        """
+        Resolves the model once and creates its genai clients, and lists the agent's
+        tools, so the first call doesn't pay for it. Failures are logged, not raised:
+        a cold call still works.
+        """
+        if self.fake_live:
+            self.prewarmed = True
+            logger.info("Fake live backend, nothing to pre-warm")
+            return
+        start = time.perf_counter()
+        if isinstance(self.agent.model, str):
+            self.agent.model = LLMRegistry.new_llm(self.agent.model)
+        llm = self.agent.canonical_model
+        for client in ("api_client", "_live_api_client"):
+            try:
+                getattr(llm, client)
+            except Exception as ex:
+                logger.warning(f"Failed to pre-warm model {client}: {ex}")
+        # In its own task: a failed MCP connect can leak a cancellation from its cancel scope
+        tools = asyncio.create_task(self.agent.canonical_tools())
+        (result,) = await asyncio.gather(tools, return_exceptions=True)
+        if isinstance(result, BaseException):
+            logger.warning(f"Failed to pre-warm agent tools: {result!r}")
+        self.prewarm_seconds = time.perf_counter() - start
+        self.prewarmed = True
+        logger.info(f"Agent runtime pre-warmed in {self.prewarm_seconds:.3f}s")
+
+    async def close(self) -> None:
+        """Closes the agent's toolsets, e.g. their MCP connections"""
+        for tool in self.agent.tools:
+            if isinstance(tool, BaseToolset):
+                try:
+                    await tool.close()
+                except Exception as ex:
+                    logger.warning(f"Failed to close toolset {tool!r}: {ex}")
+
+    def _runner(self) -> Runner:
+        runner = self._runners[self._next_runner % len(self._runners)]
+        self._next_runner += 1
+        return runner
+
+    async def start_session(
+        self,
+        user_id: str,
+        session_id: str,
+        history: list[types.Content] | None = None,
+    ) -> tuple[LiveEvents, LiveRequestQueue]:
+        """
+        Creates a session and starts a live run for it.
+
+        `history` is recorded in the session before the run starts and sent to the
+        model as context when it connects. If it ends on a model turn, the model
+        waits for the user instead of responding.
+        """
+        start = time.perf_counter()
+        runner = self._runner()
+        session = await self.session_service.create_session(
+            app_name=self.app_name,
+            user_id=user_id,
+            session_id=session_id,
+        )
+        invocation_id = Event.new_id()
+        for content in history or []:
+            author = "user" if content.role == "user" else self.agent.name
+            await self.session_service.append_event(
+                session,
+                Event(invocation_id=invocation_id, author=author, content=content),
+            )
+
+        live_request_queue = LiveRequestQueue()
+        # ADK writes each connection's resumption handle into the run config, so every
+        # call gets its own; a shared one would resume the previous caller's session
+        run_config = self.run_config.model_copy(deep=True)
+
+        if self.fake_live:
+            live_events = fake_live_events(
+                live_request_queue, self.fake_live, self.agent.name
+            )
+        elif self.resumption.enabled:
+            live_events = resumable_live_events(
+                runner,
+                session,
+                live_request_queue,
+                run_config,
+                self.resumption,
+                self.resumption_stats,
+            )
+        else:
+            live_events = runner.run_live(
+                # user_id=user_id, # Using the suggested args fails to create session
+                # session_id=session_id,
+                live_request_queue=live_request_queue,
+                run_config=run_config,
+                session=session,
+            )
+
+        self.sessions_started += 1
+        self.active_sessions.add((user_id, session_id))
+        self._setup_seconds_total += time.perf_counter() - start
+        return live_events, live_request_queue
+
+    async def end_session(self, user_id: str, session_id: str) -> None:
+        """Forgets a finished call's session so the shared session service doesn't grow"""
+        self.active_sessions.discard((user_id, session_id))
+        await self.session_service.delete_session(
+            app_name=self.app_name, user_id=user_id, session_id=session_id
+        )
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "runners": len(self._runners),
+            "prewarmed": self.prewarmed,
+            "prewarm_seconds": self.prewarm_seconds,
+            "sessions_started": self.sessions_started,
+            "active_sessions": len(self.active_sessions),
+            "mean_setup_seconds": (
+                self._setup_seconds_total / self.sessions_started
+                if self.sessions_started
+                else 0.0
+            ),
+        }
@@ -0,0 +1,197 @@
+"""
+Deterministic stand-in for a Gemini Live run, for benchmarks and offline runs.
+
+`fake_live_events` reads a call's `LiveRequestQueue` and yields the same kind
+of ADK `Event`s as `runner.run_live`: PCM audio, input and output
+transcriptions, `turn_complete` and `interrupted`. It also yields a function
+call and its response when a reply uses a tool. No model or tools are involved,
+so voice-bridge's own overhead can be measured at hundreds of calls on one
+machine, apart from model latency.
+
+The caller's turn ends after `silence_ms` of quiet audio following speech, or
+when text content (e.g. the greeting prompt) or `activity_end` arrives. The
+reply starts `first_token_ms` later and streams `reply_ms` of audio in
+`chunk_ms` chunks, at `burst_rate` times realtime. Every `tool_every`-th reply
+first waits `tool_ms` for a simulated tool call. Caller speech during a reply
+interrupts it. Silence is counted in audio time, not wall time, so the same
+input always produces the same turns.
+
+Select it with `LIVE_BACKEND=fake`; see `AgentRuntime`.
+"""
+
+import asyncio
+import math
+import os
+import struct
+from dataclasses import dataclass
+from typing import AsyncGenerator
+
+from google.adk.agents.live_request_queue import LiveRequestQueue
+from google.adk.events import Event
+from google.genai import types
+
+# Caller audio is 16kHz 16-bit mono PCM, agent audio 24kHz
+INPUT_BYTES_PER_MS = 32
+OUTPUT_BYTES_PER_MS = 48
+# Peak level of caller audio treated as speech, about -30 dBFS
+SPEECH_PEAK = 1000
+REPLY_TEXT = "This is a simulated reply from the fake live backend."
+
+
+@dataclass(slots=True)
+class FakeLiveConfig:
+    enabled: bool = False
+    handshake_ms: int = 300
+    first_token_ms: int = 500
+    reply_ms: int = 3000
+    chunk_ms: int = 40
+    burst_rate: float = 2.0
+    tool_ms: int = 300
+    tool_every: int = 3
+    silence_ms: int = 400
+
+    @classmethod
+    def from_env(cls) -> "FakeLiveConfig":
+        return cls(
+            enabled=os.getenv("LIVE_BACKEND", "gemini").lower() == "fake",
+            handshake_ms=int(os.getenv("FAKE_LIVE_HANDSHAKE_MS", 300)),
+            first_token_ms=int(os.getenv("FAKE_LIVE_FIRST_TOKEN_MS", 500)),
+            reply_ms=int(os.getenv("FAKE_LIVE_REPLY_MS", 3000)),
+            chunk_ms=int(os.getenv("FAKE_LIVE_CHUNK_MS", 40)),
+            burst_rate=float(os.getenv("FAKE_LIVE_BURST_RATE", 2.0)),
+            tool_ms=int(os.getenv("FAKE_LIVE_TOOL_MS", 300)),
+            tool_every=int(os.getenv("FAKE_LIVE_TOOL_EVERY", 3)),
+            silence_ms=int(os.getenv("FAKE_LIVE_SILENCE_MS", 400)),
+        )
+
+
+fake_live_config = FakeLiveConfig.from_env()
+
+
+def _speech_chunk(chunk_ms: int) -> bytes:
+    """A voiced tone with a syllable envelope, as 24kHz 16-bit PCM"""
+    samples = chunk_ms * OUTPUT_BYTES_PER_MS // 2
+    values = []
+    for i in range(samples):
+        t = i / 24000
+        envelope = 0.5 + 0.5 * math.sin(2 * math.pi * 4 * t)
+        tone = math.sin(2 * math.pi * 160 * t) + 0.5 * math.sin(2 * math.pi * 320 * t)
+        values.append(int(8000 * envelope * tone))
+    return struct.pack(f"<{samples}h", *values)
+
+
+def _is_speech(pcm: bytes) -> bool:
+    # Every 8th sample is plenty for a level check and keeps hundreds of calls cheap
+    samples = memoryview(pcm[: len(pcm) - len(pcm) % 2]).cast("h")[::8]
+    return bool(samples) and max(max(samples), -min(samples)) > SPEECH_PEAK
+
+
+class FakeLiveSession:
+    """Turn-taking state for one call's fake live run"""
+
+    def __init__(self, config: FakeLiveConfig, author: str):
+        self.config = config
+        self.author = author
+        self.replies = 0
+        self.user_turns = 0
+        self._events: asyncio.Queue[Event | None] = asyncio.Queue()
+        self._reply: asyncio.Task | None = None
+        self._chunk = _speech_chunk(config.chunk_ms)
+        self._speaking = False
+        self._speech_bytes = 0
+        self._silence_bytes = 0
+
+    async def run(
+        self, live_request_queue: LiveRequestQueue
+    ) -> AsyncGenerator[Event, None]:
+        await asyncio.sleep(self.config.handshake_ms / 1000)
+        reader = asyncio.create_task(self._read(live_request_queue))
+        try:
+            while (event := await self._events.get()) is not None:
+                yield event
+        finally:
+            tasks = [reader, self._reply] if self._reply else [reader]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _read(self, live_request_queue: LiveRequestQueue) -> None:
+        try:
+            while True:
+                request = await live_request_queue.get()
+                if request.close:
+                    return
+                if request.blob and request.blob.data:
+                    self._on_audio(request.blob.data)
+                elif request.content or request.activity_end:
+                    self._end_user_turn(speech_ms=0)
+        finally:
+            self._events.put_nowait(None)
+
+    def _on_audio(self, pcm: bytes) -> None:
+        if _is_speech(pcm):
+            self._speech_bytes += len(pcm)
+            self._silence_bytes = 0
+            if not self._speaking:
+                self._speaking = True
+                self._interrupt()
+            return
+        if not self._speaking:
+            return
+        self._silence_bytes += len(pcm)
+        if self._silence_bytes >= self.config.silence_ms * INPUT_BYTES_PER_MS:
+            self._speaking = False
+            self._end_user_turn(self._speech_bytes // INPUT_BYTES_PER_MS)
+            self._speech_bytes = self._silence_bytes = 0
+
+    def _interrupt(self) -> None:
+        if self._reply and not self._reply.done():
+            self._reply.cancel()
+            self._events.put_nowait(Event(author=self.author, interrupted=True))
+
+    def _end_user_turn(self, speech_ms: int) -> None:
+        self._interrupt()
+        self.user_turns += 1
+        if speech_ms:
+            text = f"Caller turn {self.user_turns}, {speech_ms}ms of speech."
+            self._put_content("user", types.Part(text=text))
+        self._reply = asyncio.create_task(self._respond())
+
+    def _put_content(
+        self, role: str, *parts: types.Part, partial: bool | None = None
+    ) -> None:
+        content = types.Content(role=role, parts=list(parts))
+        self._events.put_nowait(
+            Event(author=self.author, content=content, partial=partial)
+        )
+
+    async def _respond(self) -> None:
+        config = self.config
+        self.replies += 1
+        await asyncio.sleep(config.first_token_ms / 1000)
+        if config.tool_every and self.replies % config.tool_every == 0:
+            call = types.FunctionCall(id=Event.new_id(), name="fake_tool", args={})
+            self._put_content("model", types.Part(function_call=call))
+            await asyncio.sleep(config.tool_ms / 1000)
+            response = types.FunctionResponse(
+                id=call.id, name=call.name, response={"ok": True}
+            )
+            self._put_content("user", types.Part(function_response=response))
+        self._put_content("model", types.Part(text=REPLY_TEXT), partial=True)
+        interval = config.chunk_ms / 1000 / config.burst_rate
+        audio = types.Part(
+            inline_data=types.Blob(data=self._chunk, mime_type="audio/pcm")
+        )
+        for _ in range(max(1, config.reply_ms // config.chunk_ms)):
+            self._put_content("model", audio)
+            await asyncio.sleep(interval)
+        self._put_content("model", types.Part(text=REPLY_TEXT))
+        self._events.put_nowait(Event(author=self.author, turn_complete=True))
+
+
+async def fake_live_events(
+    live_request_queue: LiveRequestQueue, config: FakeLiveConfig, author: str
+) -> AsyncGenerator[Event, None]:
+    """Fake `run_live` events for one call, until `live_request_queue` is closed"""
+    async for event in FakeLiveSession(config, author).run(live_request_queue):
+        yield event
@@ -20,22 +20,36 @@ except Exception as ex:
     print(f"TaskGroup caught: {ex}")
 finally:
     live_request_queue.close()
+    await end_agent_session(...)
     websocket.close()
 ```
+
+Sessions are issued by the process-wide `agent_runtime`; call `await agent_runtime.prewarm()`
+at startup so the first call doesn't pay for model client and tool setup.
+
+`agent_to_client_messaging` hands out a Pydantic model per audio chunk. Hot paths
+should use `agent_to_client_batches` instead: its events are slotted dataclasses
+with the same `type` values, and all audio parts of one ADK event arrive in a
+single `AgentAudio`, so there is one callback per ADK event rather than per part.
+Only `agent_to_client_batches` delivers transcriptions (`AgentTranscript`); the
+legacy events stay audio, turn complete and interrupted.
 """
 
-from typing import AsyncGenerator, Awaitable, Callable, Literal
+import logging
+import os
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Literal
 
-from google.adk.agents.run_config import RunConfig, StreamingMode
-from google.adk.events import Event
-from google.adk.runners import InMemoryRunner
 from google.adk.agents.live_request_queue import LiveRequestQueue
+from google.adk.events import Event
 
-from google.genai import types
 from google.genai.types import Part, Blob, Content
 from pydantic import BaseModel, Field
 
 from adk_agents.agents.banking_agent.agent import root_agent
+from adk_agents.runtime.agent_runtime import APP_NAME, AgentRuntime, LiveEvents
+
+logger = logging.getLogger(__name__)
 
 
 def text_to_content(text: str, role: Literal["user", "model"] = "user") -> Content:
@@ -43,70 +57,23 @@ def text_to_content(text: str, role: Literal["user", "model"] = "user") -> Conte
     return Content(role=role, parts=[Part(text=text)])
 
 
-APP_NAME = "THE VOICE AGENT"
-
-LiveEvents = AsyncGenerator[Event, None]
+# Shared by every call in this process
+agent_runtime = AgentRuntime(
+    root_agent, app_name=APP_NAME, runners=int(os.getenv("AGENT_RUNNERS", 1))
+)
 
 
 # TODO: Make this *dynamic*
 async def start_agent_session(
-    user_id: str, session_id: str
+    user_id: str, session_id: str, history: list[Content] | None = None
 ) -> tuple[LiveEvents, LiveRequestQueue]:
-    """Starts an agent session"""
+    """Starts an agent session, optionally with prior turns as context"""
+    return await agent_runtime.start_session(user_id, session_id, history=history)
 
-    # Create a Runner
-    runner = InMemoryRunner(
-        root_agent,
-        app_name=APP_NAME,
-    )
 
-    # Create a Session
-    session = await runner.session_service.create_session(
-        app_name=APP_NAME,
-        user_id=user_id,
-        session_id=session_id,
-    )
-
-    speech_config = types.SpeechConfig(
-        voice_config=types.VoiceConfig(
-            # https://ai.google.dev/gemini-api/docs/speech-generation#voices
-            prebuilt_voice_config=types.PrebuiltVoiceConfig(voice_name="Zephyr")
-        ),
-        # https://ai.google.dev/gemini-api/docs/speech-generation#languages
-        language_code="en-US",
-    )
-
-    automatic_activity_detection = types.AutomaticActivityDetection(
-        disabled=False,
-        start_of_speech_sensitivity=types.StartSensitivity.START_SENSITIVITY_HIGH,
-        end_of_speech_sensitivity=types.EndSensitivity.END_SENSITIVITY_HIGH,
-        prefix_padding_ms=150,
-        silence_duration_ms=400,
-    )
-    realtime_input_config = types.RealtimeInputConfig(
-        automatic_activity_detection=automatic_activity_detection
-    )
-
-    run_config = RunConfig(
-        speech_config=speech_config,
-        # response_modalities=["AUDIO"], # Setting this gives Pydantic warning
-        streaming_mode=StreamingMode.BIDI,
-        session_resumption=types.SessionResumptionConfig(),
-        input_audio_transcription=types.AudioTranscriptionConfig(),
-        output_audio_transcription=types.AudioTranscriptionConfig(),
-        realtime_input_config=realtime_input_config,
-    )
-
-    live_request_queue = LiveRequestQueue()
-
-    live_events = runner.run_live(
-        # user_id=user_id, # Using the suggested args fails to create session
-        # session_id=session_id,
-        live_request_queue=live_request_queue,
-        run_config=run_config,
-        session=session,
-    )
-    return live_events, live_request_queue
+async def end_agent_session(user_id: str, session_id: str) -> None:
+    """Releases an agent session once the call has ended"""
+    await agent_runtime.end_session(user_id, session_id)
 
 
 class AgentInterruptedEvent(BaseModel):
@@ -129,6 +96,80 @@ AgentEvent = AgentInterruptedEvent | AgentTurnCompleteEvent | AgentDataEvent
 OnAgentEvent = Callable[[AgentEvent], Awaitable[None]]
 
 
+@dataclass(slots=True)
+class AgentAudio:
+    chunks: list[bytes]  # Output PCM (16-bit, 24kHz), every audio part of one ADK event
+    type: Literal["data"] = "data"
+
+
+@dataclass(slots=True)
+class AgentTurnComplete:
+    timestamp: float
+    type: Literal["complete"] = "complete"
+
+
+@dataclass(slots=True)
+class AgentInterrupted:
+    timestamp: float
+    type: Literal["interrupted"] = "interrupted"
+
+
+@dataclass(slots=True)
+class AgentTranscript:
+    role: str
+    text: str
+    type: Literal["transcript"] = "transcript"
+
+
+LeanAgentEvent = AgentAudio | AgentTurnComplete | AgentInterrupted | AgentTranscript
+
+OnLeanAgentEvent = Callable[[LeanAgentEvent], Awaitable[None]]
+
+
+def lean_agent_events(event: Event) -> list[LeanAgentEvent]:
+    """The client-facing events in one ADK event; audio parts are grouped into one `AgentAudio`"""
+    if event.turn_complete:
+        return [AgentTurnComplete(event.timestamp)]
+    if event.interrupted:
+        return [AgentInterrupted(event.timestamp)]
+    content = event.content
+    if content is None or not content.parts:
+        logger.debug("Agent sent empty content %s", event)
+        return []
+
+    chunks: list[bytes] = []
+    transcripts: list[LeanAgentEvent] = []
+    for part in content.parts:
+        inline_data = part.inline_data
+        if inline_data is not None:
+            mime_type = inline_data.mime_type
+            if inline_data.data and mime_type and mime_type.startswith("audio/pcm"):
+                chunks.append(inline_data.data)
+        # Partial events are streaming fragments of the final transcription
+        elif part.text and not event.partial:
+            transcripts.append(AgentTranscript(content.role or "model", part.text))
+    if not chunks:
+        return transcripts
+    audio = AgentAudio(chunks)
+    return [audio, *transcripts] if transcripts else [audio]
+
+
+async def agent_to_client_batches(
+    on_agent_event: OnLeanAgentEvent, live_events: LiveEvents
+) -> None:
+    """
+    Like `agent_to_client_messaging`, with lean events and one `AgentAudio` per
+    ADK event carrying all of its audio parts.
+
+    Args:
+        on_agent_event: Async callback invoked per LeanAgentEvent.
+        live_events: Async generator of ADK Event objects to send to client.
+    """
+    async for event in live_events:
+        for message in lean_agent_events(event):
+            await on_agent_event(message)
+
+
 async def agent_to_client_messaging(
     on_agent_event: OnAgentEvent, live_events: LiveEvents
 ) -> None:
@@ -142,45 +183,14 @@ async def agent_to_client_messaging(
         live_events: Async generator of ADK Event objects to send to client.
     """
     async for event in live_events:
-        message: AgentEvent
-
-        if event.turn_complete:
-            message = AgentTurnCompleteEvent(timestamp=event.timestamp)
-            await on_agent_event(message)
-            continue
-
-        if event.interrupted:
-            message = AgentInterruptedEvent(timestamp=event.timestamp)
-            await on_agent_event(message)
-            continue
-
-        if not event.content or not event.content.parts:
-            print("Agent sent empty content", event)
-            continue
-
-        for part in event.content.parts:
-            is_text = hasattr(part, "text") and part.text is not None
-            is_audio = (
-                part.inline_data
-                and part.inline_data.mime_type
-                and part.inline_data.mime_type.startswith("audio/pcm")
-            )
-
-            if is_audio:
-                audio_data = part.inline_data and part.inline_data.data
-                if not audio_data:
-                    continue
-                # twilio_payload = base64.b64encode(audio_data).decode("ascii")
-                message = AgentDataEvent(payload=audio_data)
-                await on_agent_event(message)
-                continue
-
-            elif is_text:
-                # print(part.text, end="", flush=True)
-                continue
-
-            else:
-                print("Unknown event content part", event)
+        for lean in lean_agent_events(event):
+            if lean.type == "data":
+                for chunk in lean.chunks:
+                    await on_agent_event(AgentDataEvent(payload=chunk))
+            elif lean.type == "complete":
+                await on_agent_event(AgentTurnCompleteEvent(timestamp=lean.timestamp))
+            elif lean.type == "interrupted":
+                await on_agent_event(AgentInterruptedEvent(timestamp=lean.timestamp))
 
 
 def send_pcm_to_agent(pcm_audio: bytes, live_request_queue: LiveRequestQueue):
@@ -0,0 +1,341 @@
+"""
+Keeps a call's live model session going across Gemini Live disconnects.
+
+A Gemini Live connection only lasts so long: the server sends `go_away` shortly
+before closing it, and connections can also just drop. ADK ignores `go_away` and
+ends `run_live` with an error when the connection closes, which hangs up the
+call. `resumable_live_events` runs a call's live session as a series of
+connections instead. It tracks the latest session resumption handle the server
+sends, and when a connection ends it opens a new one with that handle, so the
+model carries on with the conversation where it left off. After a `go_away` it
+switches over at the next turn boundary rather than waiting to be cut off.
+
+The caller keeps one `LiveRequestQueue` for the whole call. While a connection
+is being replaced, its audio is held in a buffer of at most `buffer_ms` (oldest
+audio dropped first) and sent as soon as the new connection is up.
+
+Only models resolved to `ResumableGemini` report handles and `go_away`; see
+`resumable_model`.
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator
+
+from google.adk.agents.live_request_queue import LiveRequest, LiveRequestQueue
+from google.adk.agents.run_config import RunConfig
+from google.adk.events import Event
+from google.adk.models import BaseLlm, LLMRegistry
+from google.adk.models.base_llm_connection import BaseLlmConnection
+from google.adk.models.google_llm import Gemini
+from google.adk.models.llm_request import LlmRequest
+from google.adk.runners import Runner
+from google.adk.sessions import Session
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+# Caller audio is 16kHz 16-bit mono PCM (see `send_pcm_to_agent`)
+AUDIO_BYTES_PER_MS = 32
+
+# The call whose live run is being iterated in this task
+_current_call: ContextVar["LiveCall | None"] = ContextVar("live_call", default=None)
+
+
+class LiveConnectionEnded(Exception):
+    """Ends a live connection on purpose: the server is about to close it, or the call is over"""
+
+
+@dataclass(slots=True)
+class LiveResumptionConfig:
+    enabled: bool = True
+    max_attempts: int = 3
+    buffer_ms: int = 5000
+
+    @classmethod
+    def from_env(cls) -> "LiveResumptionConfig":
+        return cls(
+            enabled=os.getenv("LIVE_RECONNECT", "true").lower() in ("1", "true", "yes"),
+            max_attempts=int(os.getenv("LIVE_RECONNECT_MAX_ATTEMPTS", 3)),
+            buffer_ms=int(os.getenv("LIVE_RECONNECT_BUFFER_MS", 5000)),
+        )
+
+
+live_resumption_config = LiveResumptionConfig.from_env()
+
+
+@dataclass(slots=True)
+class LiveResumptionStats:
+    connects: int = 0
+    reconnects: int = 0
+    resumed: int = 0
+    reconnect_failures: int = 0
+    go_aways: int = 0
+    dropped_audio_ms: float = 0.0
+    reconnect_seconds: deque[float] = field(default_factory=lambda: deque(maxlen=100))
+
+    def snapshot(self) -> dict[str, float]:
+        ordered = sorted(self.reconnect_seconds)
+        return {
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "resumed": self.resumed,
+            "reconnect_failures": self.reconnect_failures,
+            "go_aways": self.go_aways,
+            "dropped_audio_ms": self.dropped_audio_ms,
+            "reconnect_p50_ms": ordered[len(ordered) // 2] * 1000 if ordered else 0.0,
+            "reconnect_max_ms": ordered[-1] * 1000 if ordered else 0.0,
+        }
+
+
+class LiveCall:
+    """
+    One call's live session state, carried from connection to connection.
+
+    Requests from the caller's queue are forwarded to the current connection's
+    queue, or held while there is no connection.
+    """
+
+    def __init__(
+        self,
+        live_request_queue: LiveRequestQueue,
+        config: LiveResumptionConfig,
+        stats: LiveResumptionStats,
+    ):
+        self.live_request_queue = live_request_queue
+        self.config = config
+        self.stats = stats
+        self.handle: str | None = None
+        self.queue = LiveRequestQueue()
+        self.connected = False
+        self.closed = False
+        self.go_away = False
+        self.model_turn_open = False
+        self.disconnected_at: float | None = None
+        self._held: deque[LiveRequest] = deque()
+        self._held_audio_bytes = 0
+        self._forwarder = asyncio.create_task(self._forward())
+
+    def new_connection(self) -> LiveRequestQueue:
+        """A fresh request queue for the next connection"""
+        self.connected = False
+        self.go_away = False
+        self.model_turn_open = False
+        self.queue = LiveRequestQueue()
+        return self.queue
+
+    def on_connected(self) -> None:
+        self.stats.connects += 1
+        if self.disconnected_at is not None:
+            seconds = time.perf_counter() - self.disconnected_at
+            self.stats.reconnect_seconds.append(seconds)
+            logger.info(f"Live session reconnected in {seconds * 1000:.0f}ms")
+        self.disconnected_at = None
+        self.connected = True
+        while self._held:
+            self.queue.send(self._held.popleft())
+        self._held_audio_bytes = 0
+
+    def on_disconnected(self) -> None:
+        self.connected = False
+        self.disconnected_at = time.perf_counter()
+
+    def observe(self, message: types.LiveServerMessage) -> None:
+        """Notes resumption handles, `go_away` and turn boundaries from the server"""
+        update = message.session_resumption_update
+        if update and update.resumable and update.new_handle:
+            self.handle = update.new_handle
+        if message.go_away and not self.go_away:
+            self.go_away = True
+            self.stats.go_aways += 1
+            logger.info(f"Live session go_away, {message.go_away.time_left} left")
+        content = message.server_content
+        if message.tool_call or (content and content.model_turn):
+            self.model_turn_open = True
+        if content and (content.turn_complete or content.interrupted):
+            self.model_turn_open = False
+
+    async def close(self) -> None:
+        self._forwarder.cancel()
+        await asyncio.gather(self._forwarder, return_exceptions=True)
+        self.queue.close()
+
+    async def _forward(self) -> None:
+        while True:
+            request = await self.live_request_queue.get()
+            if request.close:
+                self.closed = True
+                self.queue.close()
+                return
+            if self.connected:
+                self.queue.send(request)
+            else:
+                self._hold(request)
+
+    def _hold(self, request: LiveRequest) -> None:
+        self._held.append(request)
+        if request.blob and request.blob.data:
+            self._held_audio_bytes += len(request.blob.data)
+        limit = self.config.buffer_ms * AUDIO_BYTES_PER_MS
+        while self._held_audio_bytes > limit:
+            # Drop the oldest audio; text and activity signals are always kept
+            oldest = next(r for r in self._held if r.blob and r.blob.data)
+            self._held.remove(oldest)
+            self._held_audio_bytes -= len(oldest.blob.data)
+            self.stats.dropped_audio_ms += len(oldest.blob.data) / AUDIO_BYTES_PER_MS
+
+
+class _WatchedSession:
+    """genai live session whose server messages are shown to the call first"""
+
+    def __init__(self, session: Any, call: LiveCall):
+        self._session = session
+        self._call = call
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._session, name)
+
+    async def receive(self) -> AsyncGenerator[types.LiveServerMessage, None]:
+        # ADK stops reading at each turn_complete and calls `receive` again
+        self._switch_if_idle()
+        async for message in self._session.receive():
+            self._call.observe(message)
+            yield message
+            self._switch_if_idle()
+
+    def _switch_if_idle(self) -> None:
+        if self._call.go_away and not self._call.model_turn_open:
+            raise LiveConnectionEnded()
+
+
+class _ResumedConnection(BaseLlmConnection):
+    """A connection resumed from a handle: the server already has the history"""
+
+    def __init__(self, connection: BaseLlmConnection):
+        self._connection = connection
+
+    async def send_history(self, history: list[types.Content]):
+        pass
+
+    async def send_content(self, content: types.Content):
+        await self._connection.send_content(content)
+
+    async def send_realtime(self, blob: types.Blob):
+        await self._connection.send_realtime(blob)
+
+    async def receive(self):
+        async with contextlib.aclosing(self._connection.receive()) as responses:
+            async for response in responses:
+                yield response
+
+    async def close(self):
+        await self._connection.close()
+
+
+class ResumableGemini(Gemini):
+    """`Gemini` whose live connections report to the call they belong to"""
+
+    @contextlib.asynccontextmanager
+    async def connect(self, llm_request: LlmRequest) -> BaseLlmConnection:
+        call = _current_call.get()
+        if call is not None and call.closed:
+            # ADK reconnects on its own after the connection is closed
+            raise LiveConnectionEnded()
+        async with super().connect(llm_request) as connection:
+            if call is None:
+                yield connection
+                return
+            connection._gemini_session = _WatchedSession(
+                connection._gemini_session, call
+            )
+            resumption = llm_request.live_connect_config.session_resumption
+            call.on_connected()
+            yield (
+                _ResumedConnection(connection)
+                if resumption and resumption.handle
+                else connection
+            )
+
+
+def resumable_model(model: str | BaseLlm) -> str | BaseLlm:
+    """`ResumableGemini` for Gemini model names; other models are returned as is"""
+    if isinstance(model, str) and LLMRegistry.resolve(model) is Gemini:
+        return ResumableGemini(model=model)
+    return model
+
+
+async def resumable_live_events(
+    runner: Runner,
+    session: Session,
+    live_request_queue: LiveRequestQueue,
+    run_config: RunConfig,
+    config: LiveResumptionConfig,
+    stats: LiveResumptionStats,
+) -> AsyncGenerator[Event, None]:
+    """
+    `runner.run_live` events for a whole call, reconnecting with the latest
+    resumption handle until `live_request_queue` is closed. Gives up after
+    `config.max_attempts` connections in a row fail to open.
+    """
+    call = LiveCall(live_request_queue, config, stats)
+    _current_call.set(call)
+    failures = 0
+    try:
+        while True:
+            queue = call.new_connection()
+            # ADK writes the handles it receives into the config; start each attempt from
+            # the call's own handle rather than whatever an earlier attempt left there
+            attempt_config = run_config.model_copy(deep=True)
+            if call.handle:
+                attempt_config.session_resumption = types.SessionResumptionConfig(
+                    handle=call.handle
+                )
+            connects = stats.connects
+            error: Exception | None = None
+            try:
+                async with contextlib.aclosing(
+                    runner.run_live(
+                        session=session,
+                        live_request_queue=queue,
+                        run_config=attempt_config,
+                    )
+                ) as events:
+                    async for event in events:
+                        yield event
+            except LiveConnectionEnded:
+                pass
+            except Exception as ex:
+                error = ex
+            call.on_disconnected()
+            if call.closed:
+                return
+
+            failures = 0 if stats.connects > connects else failures + 1
+            if failures >= config.max_attempts:
+                stats.reconnect_failures += 1
+                logger.error(
+                    f"Live session could not reconnect after {failures} attempts"
+                )
+                if error:
+                    raise error
+                return
+            stats.reconnects += 1
+            if call.handle:
+                stats.resumed += 1
+            reason = (
+                repr(error) if error else "go_away" if call.go_away else "run ended"
+            )
+            logger.info(
+                f"Live connection ended ({reason}), reconnecting "
+                f"{'with' if call.handle else 'without'} a resumption handle"
+            )
+            if failures:
+                await asyncio.sleep(0.25 * failures)
+    finally:
+        await call.close()
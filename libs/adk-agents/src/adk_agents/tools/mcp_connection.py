@@ -0,0 +1,359 @@
+"""
+Long-lived MCP connection shared by every live call.
+
+ADK's `McpToolset` opens its MCP session inside whichever call first needs it (so
+the session's transport lives and dies with that call's task) and lists the
+server's tools again every time a live call connects. `McpConnection` instead
+owns one streamable-HTTP session in a background task for the life of the
+process, reconnects it with exponential backoff when it breaks, and caches the
+tool schemas until the server reports a new version (`serverInfo.version` on
+reconnect, or a `tools/list_changed` notification) or `schema_ttl_seconds` passes.
+
+`ManagedMcpToolset` plugs the connection into an agent in place of `McpToolset`.
+
+Usage:
+```python
+connection = McpConnection(StreamableHTTPConnectionParams(url=mcp_url))
+agent = Agent(..., tools=[ManagedMcpToolset(connection)])
+...
+await connection.close()
+```
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Callable, Optional
+
+import anyio
+import httpx
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset, ToolPredicate
+from google.adk.tools.mcp_tool.mcp_session_manager import StreamableHTTPConnectionParams
+from google.adk.tools.mcp_tool.mcp_tool import McpTool
+from mcp import ClientSession, types
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.shared.exceptions import McpError
+
+logger = logging.getLogger(__name__)
+
+# Failures where the request never reached the server, so it is safe to retry
+# even non-idempotent tools (e.g. transfers) once on a fresh session
+_NOT_DELIVERED = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    httpx.ConnectError,
+)
+
+
+def _never_delivered(error: BaseException) -> bool:
+    if isinstance(error, McpError):
+        # The server forgot the session, e.g. it restarted; the call was rejected
+        return "terminated" in str(error).lower()
+    return isinstance(error, _NOT_DELIVERED)
+
+
+def _percentile(samples: deque[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[round(pct / 100 * (len(ordered) - 1))]
+
+
+@dataclass(slots=True)
+class McpConnectionStats:
+    connects: int = 0
+    connect_failures: int = 0
+    tool_calls: int = 0
+    tool_call_errors: int = 0
+    tool_call_retries: int = 0
+    schema_fetches: int = 0
+    schema_hits: int = 0
+    schema_invalidations: int = 0
+    handshake_seconds: deque[float] = field(default_factory=lambda: deque(maxlen=100))
+    tool_call_seconds: deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+
+
+class McpConnection:
+    """
+    One MCP client session, owned by a background task and shared across calls.
+
+    Args:
+        connection_params: Streamable HTTP server URL, headers and timeouts.
+        schema_ttl_seconds: Tool schemas are listed again at least this often.
+        call_timeout_seconds: Max time to wait for a tool call's result.
+        backoff_initial_seconds: First reconnect delay, doubled per failure.
+        backoff_max_seconds: Max reconnect delay.
+    """
+
+    def __init__(
+        self,
+        connection_params: StreamableHTTPConnectionParams,
+        schema_ttl_seconds: float = 300.0,
+        call_timeout_seconds: float = 30.0,
+        backoff_initial_seconds: float = 0.5,
+        backoff_max_seconds: float = 30.0,
+    ):
+        self.connection_params = connection_params
+        self.schema_ttl_seconds = schema_ttl_seconds
+        self.call_timeout_seconds = call_timeout_seconds
+        self.backoff_initial_seconds = backoff_initial_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.stats = McpConnectionStats()
+        self.server_version: str | None = None
+        # Called with (tool name, seconds, succeeded) after every tool call, e.g. for metrics
+        self.on_tool_call: Callable[[str, float, bool], None] | None = None
+
+        self._session: ClientSession | None = None
+        self._ready = asyncio.Event()
+        self._broken = asyncio.Event()
+        self._closed = False
+        self._owner: asyncio.Task | None = None
+        self._last_error: BaseException | None = None
+
+        self._tools: list[types.Tool] | None = None
+        self._tools_version: str | None = None
+        self._tools_expire_at = 0.0
+        self._tools_lock = asyncio.Lock()
+
+    def start(self) -> None:
+        """Starts connecting in the background; also done lazily on first use"""
+        if self._owner is None and not self._closed:
+            self._owner = asyncio.create_task(self._own_session())
+
+    async def close(self) -> None:
+        self._closed = True
+        self._broken.set()
+        if self._owner:
+            await asyncio.gather(self._owner, return_exceptions=True)
+            self._owner = None
+
+    @property
+    def connected(self) -> bool:
+        return self._ready.is_set()
+
+    async def create_session(
+        self, headers: Optional[dict[str, str]] = None
+    ) -> ClientSession:
+        """
+        The shared session, waiting up to the connection timeout for it to (re)connect.
+        Matches `MCPSessionManager.create_session`; per-call headers are not supported.
+        """
+        self.start()
+        try:
+            await asyncio.wait_for(self._ready.wait(), self.connection_params.timeout)
+        except TimeoutError:
+            raise ConnectionError(
+                f"MCP server {self.connection_params.url} unavailable: {self._last_error!r}"
+            ) from self._last_error
+        assert self._session is not None
+        return self._session
+
+    async def list_tools(self) -> list[types.Tool]:
+        """Tool schemas, from cache unless the server version changed or the TTL passed"""
+        async with self._tools_lock:
+            session = await self.create_session()
+            if (
+                self._tools is not None
+                and self._tools_version == self.server_version
+                and time.monotonic() < self._tools_expire_at
+            ):
+                self.stats.schema_hits += 1
+                return self._tools
+            result = await session.list_tools()
+            self.stats.schema_fetches += 1
+            self._tools = result.tools
+            self._tools_version = self.server_version
+            self._tools_expire_at = time.monotonic() + self.schema_ttl_seconds
+            return self._tools
+
+    def invalidate_tools(self) -> None:
+        if self._tools is not None:
+            self.stats.schema_invalidations += 1
+        self._tools = None
+
+    async def call_tool(
+        self, name: str, arguments: dict[str, Any]
+    ) -> types.CallToolResult:
+        """Calls a tool, retrying once on a fresh session if the request was never delivered"""
+        self.stats.tool_calls += 1
+        start = time.perf_counter()
+        ok = False
+        try:
+            try:
+                result = await self._call_once(name, arguments)
+            except (*_NOT_DELIVERED, McpError) as ex:
+                if not _never_delivered(ex):
+                    raise
+                self.stats.tool_call_retries += 1
+                logger.info(f"Retrying MCP tool {name} on a new session after {ex!r}")
+                result = await self._call_once(name, arguments)
+            ok = not result.isError
+            return result
+        except Exception:
+            self.stats.tool_call_errors += 1
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            self.stats.tool_call_seconds.append(seconds)
+            if self.on_tool_call:
+                self.on_tool_call(name, seconds, ok)
+
+    async def _call_once(
+        self, name: str, arguments: dict[str, Any]
+    ) -> types.CallToolResult:
+        session = await self.create_session()
+        try:
+            return await session.call_tool(
+                name,
+                arguments,
+                read_timeout_seconds=timedelta(seconds=self.call_timeout_seconds),
+            )
+        except (*_NOT_DELIVERED, McpError) as ex:
+            if _never_delivered(ex):
+                self._reconnect(session, ex)
+            raise
+
+    def snapshot(self) -> dict[str, Any]:
+        stats = self.stats
+        return {
+            "connected": self.connected,
+            "server_version": self.server_version,
+            "connects": stats.connects,
+            "connect_failures": stats.connect_failures,
+            "handshake_p50_ms": _percentile(stats.handshake_seconds, 50) * 1000,
+            "handshake_max_ms": max(stats.handshake_seconds, default=0.0) * 1000,
+            "tool_calls": stats.tool_calls,
+            "tool_call_errors": stats.tool_call_errors,
+            "tool_call_retries": stats.tool_call_retries,
+            "tool_call_p50_ms": _percentile(stats.tool_call_seconds, 50) * 1000,
+            "tool_call_p99_ms": _percentile(stats.tool_call_seconds, 99) * 1000,
+            "schema_fetches": stats.schema_fetches,
+            "schema_hits": stats.schema_hits,
+            "schema_invalidations": stats.schema_invalidations,
+        }
+
+    def _reconnect(self, session: ClientSession, error: BaseException) -> None:
+        """Asks the owner task to replace `session`, unless it already has"""
+        if self._session is session and not self._broken.is_set():
+            logger.warning(
+                f"MCP session to {self.connection_params.url} broke: {error!r}"
+            )
+            self._ready.clear()
+            self._broken.set()
+
+    async def _own_session(self) -> None:
+        params = self.connection_params
+        backoff = self.backoff_initial_seconds
+        while not self._closed:
+            start = time.perf_counter()
+            try:
+                # Entered and exited in this task, as anyio's cancel scopes require
+                async with (
+                    streamablehttp_client(
+                        url=params.url,
+                        headers=params.headers,
+                        timeout=timedelta(seconds=params.timeout),
+                        sse_read_timeout=timedelta(seconds=params.sse_read_timeout),
+                        terminate_on_close=params.terminate_on_close,
+                    ) as (read, write, _),
+                    ClientSession(
+                        read, write, message_handler=self._on_message
+                    ) as session,
+                ):
+                    result = await asyncio.wait_for(
+                        session.initialize(), params.timeout
+                    )
+                    self.stats.handshake_seconds.append(time.perf_counter() - start)
+                    self.stats.connects += 1
+                    if result.serverInfo.version != self.server_version:
+                        self.invalidate_tools()
+                    self.server_version = result.serverInfo.version
+                    logger.info(
+                        f"Connected to MCP server {result.serverInfo.name} "
+                        f"{self.server_version} in {time.perf_counter() - start:.3f}s"
+                    )
+                    self._session = session
+                    self._last_error = None
+                    backoff = self.backoff_initial_seconds
+                    self._broken.clear()
+                    self._ready.set()
+                    await self._broken.wait()
+            except Exception as ex:
+                self.stats.connect_failures += 1
+                self._last_error = ex
+                logger.warning(f"MCP connection to {params.url} failed: {ex!r}")
+            finally:
+                self._ready.clear()
+                self._session = None
+            if self._closed:
+                break
+            delay = backoff * random.uniform(0.5, 1.0)
+            backoff = min(backoff * 2, self.backoff_max_seconds)
+            await asyncio.sleep(delay)
+
+    async def _on_message(self, message: Any) -> None:
+        if isinstance(message, types.ServerNotification) and isinstance(
+            message.root, types.ToolListChangedNotification
+        ):
+            self.invalidate_tools()
+        elif isinstance(message, Exception) and self._session is not None:
+            # Requests in flight may never get a response; start over on a new session
+            self._reconnect(self._session, message)
+
+
+class ManagedMcpTool(McpTool):
+    """`McpTool` that calls through a shared `McpConnection`"""
+
+    def __init__(self, *, mcp_tool: types.Tool, connection: McpConnection):
+        # No ADK session manager: `_run_async_impl` below is the only place `McpTool`
+        # looks one up, and it goes through the connection instead
+        super().__init__(mcp_tool=mcp_tool, mcp_session_manager=None)  # type: ignore[arg-type]
+        self._connection = connection
+
+    async def _run_async_impl(self, *, args, tool_context, credential):
+        # Replaces `McpTool`'s session lookup and call: the connection holds the shared
+        # session and reconnects it when it breaks
+        result = await self._connection.call_tool(self.name, arguments=args)
+        # A plain dict, so session events hold JSON rather than MCP objects
+        return result.model_dump(mode="json", exclude_none=True)
+
+
+class ManagedMcpToolset(BaseToolset):
+    """
+    Toolset over a shared `McpConnection`, with tools built once per schema version.
+
+    Args:
+        connection: The connection to the MCP server.
+        tool_filter: Tool names or a predicate selecting the tools to expose.
+    """
+
+    def __init__(
+        self,
+        connection: McpConnection,
+        tool_filter: Optional[ToolPredicate | list[str]] = None,
+    ):
+        super().__init__(tool_filter=tool_filter)
+        self.connection = connection
+        self._tools: list[BaseTool] = []
+        self._schemas: list[types.Tool] | None = None
+
+    async def get_tools(
+        self, readonly_context: Optional[ReadonlyContext] = None
+    ) -> list[BaseTool]:
+        schemas = await self.connection.list_tools()
+        if schemas is not self._schemas:
+            self._tools = [
+                ManagedMcpTool(mcp_tool=schema, connection=self.connection)
+                for schema in schemas
+            ]
+            self._schemas = schemas
+        return [t for t in self._tools if self._is_tool_selected(t, readonly_context)]
+
+    async def close(self) -> None:
+        await self.connection.close()
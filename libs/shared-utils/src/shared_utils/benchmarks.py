@@ -0,0 +1,101 @@
+"""
+Report helpers shared by the voice-bridge and anthos-mcp benchmarks.
+
+Benchmarks print a human readable table and can write a JSON report with
+`--output`, tagged with the environment it was measured in, which `--compare`
+can diff against a report from another commit.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of `samples` (0 <= pct <= 100)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[rank]
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def environment_info(**extra: Any) -> dict[str, Any]:
+    return {
+        "revision": git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.time(),
+        **extra,
+    }
+
+
+def add_report_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--output", type=Path, help="Write a JSON report to this path")
+    parser.add_argument(
+        "--compare", type=Path, help="JSON report from another run to compare against"
+    )
+
+
+def write_report(path: Path | None, report: dict[str, Any]) -> None:
+    if path is None:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"\nWrote {path}")
+
+
+def print_table(rows: list[dict[str, Any]], columns: list[str]) -> None:
+    widths = {c: max(len(c), *(len(_format(r.get(c))) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(_format(row.get(c)).ljust(widths[c]) for c in columns))
+
+
+def print_comparison(
+    baseline_path: Path | None,
+    rows: list[dict[str, Any]],
+    key: Callable[[dict[str, Any]], tuple],
+    metrics: list[str],
+) -> None:
+    """Prints the relative change of `metrics` for rows matching rows in the baseline report"""
+    if baseline_path is None:
+        return
+    baseline = json.loads(baseline_path.read_text())
+    previous = {key(r): r for r in baseline["results"]}
+    print(f"\nCompared to {baseline_path} ({baseline['environment']['revision']}):")
+    for row in rows:
+        old = previous.get(key(row))
+        if old is None:
+            continue
+        changes = []
+        for metric in metrics:
+            if old.get(metric):
+                delta = (row[metric] - old[metric]) / old[metric] * 100
+                changes.append(f"{metric} {delta:+.1f}%")
+        print(f"  {' '.join(str(k) for k in key(row))}: {', '.join(changes)}")
+
+
+def _format(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.1f}"
+    return str(value)